@@ -0,0 +1,33 @@
+"""Benchmark daemon for the asyncio message manager.
+
+This is kept apart from the other benchmarks because it requires Python 3.5
+or later.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import itertools
+
+from daemons.message import asyncio as asyncio_message
+
+
+class Daemon(asyncio_message.AsyncioMessageManager):
+
+    """Daemon which hands out an endless stream of messages."""
+
+    def __init__(self, handler, *args, **kwargs):
+        """Initialize with the function which handles messages."""
+        super(Daemon, self).__init__(*args, **kwargs)
+        self.handler = handler
+        self.counter = itertools.count()
+
+    async def get_message(self):
+        """Get the next number."""
+        return next(self.counter)
+
+    async def handle_message(self, message):
+        """Run the handler."""
+        return self.handler(message)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+"""Compare two benchmark result files.
+
+Usage:
+
+    python benchmarks/compare.py baseline.json candidate.json [--threshold 5]
+
+Prints the change in the median of every benchmark found in both files.
+Exits with status 1 if any benchmark regressed by more than the threshold
+percentage.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    """Load results from a file keyed by benchmark name."""
+    with open(path) as results:
+
+        return dict(
+            (result["name"], result)
+            for result in json.load(results)["results"]
+        )
+
+
+def change(baseline, candidate):
+    """Get the percentage by which a result improved.
+
+    Negative values are regressions.
+    """
+    before = baseline["median"]
+    after = candidate["median"]
+    if not before:
+
+        return 0.0
+
+    percent = (after - before) / before * 100
+    if baseline["better"] == "lower":
+
+        percent = -percent
+
+    return percent
+
+
+def main(argv=None):
+    """Print a comparison of two result files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="Percentage regression which counts as a failure.",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    candidate = load(args.candidate)
+    regressed = False
+    for name in sorted(set(baseline) & set(candidate)):
+
+        percent = change(baseline[name], candidate[name])
+        flag = ""
+        if percent < -args.threshold:
+
+            flag = "  REGRESSION"
+            regressed = True
+
+        print("{0:<40} {1:>14.6g} {2:>14.6g} {3:>+8.1f}%{4}".format(
+            name,
+            baseline[name]["median"],
+            candidate[name]["median"],
+            percent,
+            flag,
+        ))
+
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
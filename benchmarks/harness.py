@@ -0,0 +1,65 @@
+"""Helpers shared by the benchmarks."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+import os
+import time
+
+
+clock = getattr(time, "perf_counter", time.time)
+
+
+def summarize(name, samples, unit, better="lower"):
+    """Reduce a list of samples into a result.
+
+    'better' is either "lower" or "higher" and tells a comparison which
+    direction is an improvement.
+    """
+    samples = sorted(samples)
+    count = len(samples)
+    mean = sum(samples) / count
+    variance = sum((sample - mean) ** 2 for sample in samples) / count
+    return {
+        "name": name,
+        "unit": unit,
+        "better": better,
+        "samples": count,
+        "min": samples[0],
+        "max": samples[-1],
+        "mean": mean,
+        "median": samples[count // 2],
+        "p95": samples[min(count - 1, int(math.ceil(count * 0.95)) - 1)],
+        "stdev": math.sqrt(variance),
+    }
+
+
+def run_forked(func):
+    """Run 'func' in a forked child and wait for the child to exit.
+
+    The child exits without running any cleanup inherited from this
+    process. Returns the exit status of the child.
+    """
+    pid = os.fork()
+    if pid == 0:
+
+        code = 0
+        try:
+
+            func()
+
+        except SystemExit as err:
+
+            code = err.code if isinstance(err.code, int) else 0
+
+        except BaseException:
+
+            code = 1
+
+        os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    return status
@@ -0,0 +1,128 @@
+"""Benchmarks for daemonizing, starting, and stopping daemons."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import time
+
+from daemons.daemonize import simple as simple_daemonize
+from daemons.pid import simple as simple_pid
+from daemons.prefab import step
+
+import harness
+
+
+class DaemonizeOnly(
+    simple_pid.SimplePidManager,
+    simple_daemonize.SimpleDaemonizeManager,
+):
+
+    """Daemon with only the daemonize and pid features."""
+
+
+class SleepyDaemon(step.StepDaemon):
+
+    """Daemon which does nothing until it is stopped."""
+
+    def step(self):
+        """Sleep until a signal arrives."""
+        time.sleep(1)
+
+
+def bench_daemonize(workdir, repeat):
+    """Measure the time from fork until the daemon reports ready.
+
+    The forked process exits only once the daemon it starts is ready.
+    """
+    pidfile = os.path.join(workdir, "daemonize.pid")
+    daemon = DaemonizeOnly(pidfile=pidfile)
+    samples = []
+    for _ in range(repeat):
+
+        started = harness.clock()
+        harness.run_forked(daemon.daemonize)
+        samples.append(harness.clock() - started)
+        os.remove(pidfile)
+
+    return [harness.summarize("daemonize.ready", samples, "seconds")]
+
+
+def bench_start_stop(workdir, repeat):
+    """Measure the time taken to start and then stop a StepDaemon."""
+    daemon = SleepyDaemon(pidfile=os.path.join(workdir, "startstop.pid"))
+    starts = []
+    stops = []
+    for _ in range(repeat):
+
+        started = harness.clock()
+        harness.run_forked(daemon.start)
+        while daemon.pid is None:
+
+            time.sleep(0.0001)
+
+        running = harness.clock()
+        daemon.stop()
+        stopped = harness.clock()
+        starts.append(running - started)
+        stops.append(stopped - running)
+
+    return [
+        harness.summarize("startstop.start", starts, "seconds"),
+        harness.summarize("startstop.stop", stops, "seconds"),
+        harness.summarize(
+            "startstop.round_trip",
+            [start + stop for start, stop in zip(starts, stops)],
+            "seconds",
+        ),
+    ]
+
+
+def bench_pid_read(workdir, repeat, reads=1000):
+    """Measure the cost of reading the 'pid' property."""
+    pidfile = os.path.join(workdir, "read.pid")
+    daemon = DaemonizeOnly(pidfile=pidfile)
+    results = []
+    for name, running in (("pid.read", True), ("pid.read_missing", False)):
+
+        if running:
+
+            daemon.pid = os.getpid()
+
+        samples = []
+        for _ in range(repeat):
+
+            started = harness.clock()
+            for _ in range(reads):
+
+                daemon.pid
+
+            samples.append((harness.clock() - started) / reads)
+
+        if running:
+
+            del daemon.pid
+
+        results.append(harness.summarize(name, samples, "seconds"))
+
+    return results
+
+
+def run(repeat):
+    """Run every lifecycle benchmark."""
+    workdir = tempfile.mkdtemp()
+    try:
+
+        results = []
+        results.extend(bench_daemonize(workdir, repeat))
+        results.extend(bench_start_stop(workdir, repeat))
+        results.extend(bench_pid_read(workdir, repeat))
+        return results
+
+    finally:
+
+        shutil.rmtree(workdir, ignore_errors=True)
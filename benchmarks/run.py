@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+"""Run the benchmark suite and print the results as JSON.
+
+Usage:
+
+    python benchmarks/run.py [--quick] [--only lifecycle|message]
+        [--backend NAME ...] [--output results.json]
+
+The installed version of daemons is measured. Set PYTHONPATH to the root of
+a checkout to measure that instead. Two result files can be compared with
+'benchmarks/compare.py'.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+
+import lifecycle
+import throughput
+
+
+def metadata():
+    """Describe the environment the benchmarks ran in."""
+    try:
+
+        import pkg_resources
+        version = pkg_resources.get_distribution("daemons").version
+
+    except Exception:
+
+        version = None
+
+    return {
+        "daemons": version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+        "timestamp": time.time(),
+    }
+
+
+def main(argv=None):
+    """Run the requested benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Take fewer samples for a fast, noisy run.",
+    )
+    parser.add_argument(
+        "--only",
+        choices=("lifecycle", "message"),
+        help="Run only one group of benchmarks.",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        help="Message backend to benchmark. May be repeated.",
+    )
+    parser.add_argument(
+        "--output",
+        help="Write the results to this file instead of stdout.",
+    )
+    args = parser.parse_args(argv)
+
+    repeat = 3 if args.quick else 20
+    results = []
+    if args.only in (None, "lifecycle"):
+
+        results.extend(lifecycle.run(repeat))
+
+    if args.only in (None, "message"):
+
+        results.extend(throughput.run(
+            3 if args.quick else 5,
+            messages=500 if args.quick else 5000,
+            backends=args.backend,
+        ))
+
+    report = json.dumps(
+        {"metadata": metadata(), "results": results},
+        indent=2,
+        sort_keys=True,
+    )
+    if args.output is None:
+
+        print(report)
+        return 0
+
+    with open(args.output, "w") as output:
+
+        output.write(report + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
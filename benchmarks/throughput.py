@@ -0,0 +1,126 @@
+"""Benchmarks for the throughput of the message loop on every backend."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import importlib
+import itertools
+
+import harness
+
+
+def noop(message):
+    """Handle a message by doing nothing."""
+    return None
+
+
+def cpu_bound(message):
+    """Handle a message with a fixed amount of computation."""
+    return sum(i * i for i in range(2000))
+
+
+HANDLERS = (("noop", noop), ("cpu", cpu_bound))
+
+
+def _synchronous(module, name):
+    """Build a benchmark daemon from a synchronous message manager."""
+    base = getattr(importlib.import_module(module), name)
+
+    class Daemon(base):
+
+        """Daemon which hands out an endless stream of messages."""
+
+        def __init__(self, handler, *args, **kwargs):
+            """Initialize with the function which handles messages."""
+            super(Daemon, self).__init__(*args, **kwargs)
+            self.handler = handler
+            self.counter = itertools.count()
+
+        def get_message(self):
+            """Get the next number."""
+            return next(self.counter)
+
+        def handle_message(self, message):
+            """Run the handler."""
+            return self.handler(message)
+
+    return Daemon
+
+
+def _asyncio():
+    """Build a benchmark daemon from the asyncio message manager."""
+    return importlib.import_module("aio").Daemon
+
+
+BACKENDS = (
+    ("gevent", lambda: _synchronous("daemons.message.gevent",
+                                    "GeventMessageManager")),
+    ("eventlet", lambda: _synchronous("daemons.message.eventlet",
+                                      "EventletMessageManager")),
+    ("thread", lambda: _synchronous("daemons.message.executor",
+                                    "ThreadPoolMessageManager")),
+    ("process", lambda: _synchronous("daemons.message.executor",
+                                     "ProcessPoolMessageManager")),
+    ("asyncio", _asyncio),
+)
+
+
+def bench_step(name, daemon_class, handler_name, handler, repeat, messages):
+    """Measure messages handled per second by calls to 'step()'.
+
+    Each sample dispatches 'messages' messages and then waits for the pool
+    to drain so the time includes handling every message.
+    """
+    samples = []
+    for _ in range(repeat):
+
+        daemon = daemon_class(handler)
+        started = harness.clock()
+        for _ in range(messages):
+
+            daemon.step()
+
+        daemon.drain(timeout=300)
+        samples.append(messages / (harness.clock() - started))
+        pool = getattr(daemon, "_pool", None)
+        if hasattr(pool, "shutdown"):
+
+            pool.shutdown()
+
+    return harness.summarize(
+        "message.step.{0}.{1}".format(name, handler_name),
+        samples,
+        "messages/second",
+        better="higher",
+    )
+
+
+def run(repeat, messages=2000, backends=None):
+    """Run the step benchmark for every available backend and handler.
+
+    Backends which cannot be imported are skipped.
+    """
+    results = []
+    for name, build in BACKENDS:
+
+        if backends and name not in backends:
+
+            continue
+
+        try:
+
+            daemon_class = build()
+
+        except (ImportError, SyntaxError):
+
+            continue
+
+        for handler_name, handler in HANDLERS:
+
+            results.append(bench_step(
+                name, daemon_class, handler_name, handler, repeat, messages
+            ))
+
+    return results
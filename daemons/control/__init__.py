@@ -0,0 +1 @@
+"""Implementations of the control manager interface."""
@@ -0,0 +1,451 @@
+"""Simple control manager implementation.
+
+The control socket accepts one JSON object per line and replies to each with
+one JSON object per line. Requests name a 'command' and give its arguments
+as the other keys. Replies have an 'ok' flag and either a 'result' or an
+'error'. This module can also be run to send a single command.
+
+    python -m daemons.control.simple /var/run/app.pid set pool_size=50
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import atexit
+import collections
+import errno
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+from ..interfaces import control
+from ..watchdog import simple as simple_watchdog
+
+
+LOG = logging.getLogger(__name__)
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
+def control_path(pidfile, worker_index=None):
+    """Get the control socket of a daemon or one of its workers."""
+    if worker_index is None:
+
+        return "{0}.sock".format(pidfile)
+
+    return "{0}.{1}.sock".format(pidfile, worker_index)
+
+
+def request(path, command, timeout=10, **arguments):
+    """Send a command to a control socket and return the result.
+
+    Raises a RuntimeError if the daemon reports an error.
+    """
+    arguments["command"] = command
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+
+        sock.connect(path)
+        sock.sendall(json.dumps(arguments).encode("utf-8") + b"\n")
+        reply = sock.makefile("rb").readline()
+
+    finally:
+
+        sock.close()
+
+    if not reply:
+
+        raise RuntimeError("The daemon closed the connection.")
+
+    reply = json.loads(reply.decode("utf-8"))
+    if not reply["ok"]:
+
+        raise RuntimeError(reply["error"])
+
+    return reply["result"]
+
+
+class PendingCommand(object):
+
+    """A command waiting to be run by the daemon's loop."""
+
+    def __init__(self, func, arguments):
+        """Initialize the command with the function which implements it."""
+        self.func = func
+        self.arguments = arguments
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def run(self):
+        """Run the command and wake whoever is waiting for it."""
+        try:
+
+            self.result = self.func(**self.arguments)
+
+        except Exception as err:
+
+            self.error = err
+
+        finally:
+
+            self.done.set()
+
+
+class SimpleControlManager(control.ControlManager):
+
+    """Control manager which serves a unix socket next to the pidfile.
+
+    This mixin must come before the other daemon bases. The socket is named
+    after the pidfile with a '.sock' extension, or '.<worker_index>.sock'
+    within supervised workers, unless a 'control_socket' path is given. Only
+    the user running the daemon may connect. Connections are served by a
+    thread. Each command is a 'control_<command>' method so subclasses add
+    commands by adding methods. These are built in:
+
+        status: the pid, pidfile, worker_index, and uptime.
+        stats: the message counters, settings, and any metrics snapshot.
+        set: change 'pool_size' or 'idle_time'.
+        drain: stop fetching messages and wait for those in flight.
+        stacks: the current stack of every thread.
+
+    Commands listed in 'loop_commands' change the daemon and so, in step
+    daemons, are queued and run by the step loop between steps. A reply
+    which does not arrive within 'control_timeout' seconds is an error.
+    Daemons which implement 'run' rather than 'step' must call
+    'start_control' themselves.
+    """
+
+    loop_commands = ("set", "drain")
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the control manager with an optional socket path."""
+        self.control_socket = kwargs.pop("control_socket", None)
+        self.control_timeout = kwargs.pop("control_timeout", 30)
+        self._control_pid = None
+        self._control_server = None
+        self._control_started = monotonic()
+        self._loop_pid = None
+        self._pending_commands = collections.deque()
+
+        super(SimpleControlManager, self).__init__(*args, **kwargs)
+
+    @property
+    def control_path(self):
+        """Get the path of the control socket for this process."""
+        if self.control_socket is not None:
+
+            return self.control_socket
+
+        return control_path(self.pidfile, getattr(self, "worker_index", None))
+
+    def run(self):
+        """Start the control socket before running the daemon."""
+        self.start_control()
+        return super(SimpleControlManager, self).run()
+
+    def checkpoint(self):
+        """Run commands queued for the loop."""
+        self._loop_pid = os.getpid()
+        while self._pending_commands:
+
+            self._pending_commands.popleft().run()
+
+        super(SimpleControlManager, self).checkpoint()
+
+    def start_control(self):
+        """Begin serving the control socket in the current process.
+
+        This does nothing if the process is already serving it.
+        """
+        if self._control_pid == os.getpid():
+
+            return None
+
+        if self._control_server is not None:
+
+            # Inherited from the parent which still serves it.
+            self._control_server.close()
+
+        path = self.control_path
+        self._remove_control_path(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        os.chmod(path, 0o600)
+        server.listen(8)
+        self._control_server = server
+        self._control_pid = os.getpid()
+        self._control_started = monotonic()
+        thread = threading.Thread(
+            target=self._serve_control, args=(server,), name="control"
+        )
+        thread.daemon = True
+        thread.start()
+        atexit.register(self.stop_control)
+
+    def stop_control(self):
+        """Stop serving the control socket and remove it."""
+        if self._control_pid != os.getpid():
+
+            return None
+
+        self._control_pid = None
+        self._control_server.close()
+        self._control_server = None
+        self._remove_control_path(self.control_path)
+
+    def control(self, command, **arguments):
+        """Run a command and return its result."""
+        func = getattr(self, "control_{0}".format(command), None)
+        if not callable(func):
+
+            raise ValueError("Unknown command {0}.".format(command))
+
+        if command not in self.loop_commands or (
+            self._loop_pid != os.getpid()
+        ):
+
+            return func(**arguments)
+
+        pending = PendingCommand(func, arguments)
+        self._pending_commands.append(pending)
+        wakeup = getattr(self, "wakeup", None)
+        if wakeup is not None:
+
+            wakeup.set()
+
+        if not pending.done.wait(self.control_timeout):
+
+            raise RuntimeError(
+                "The daemon did not run {0} within {1} seconds.".format(
+                    command, self.control_timeout
+                )
+            )
+
+        if pending.error is not None:
+
+            raise pending.error
+
+        return pending.result
+
+    def control_status(self):
+        """Get the identity and uptime of the daemon."""
+        return {
+            "pid": os.getpid(),
+            "pidfile": self.pidfile,
+            "worker_index": getattr(self, "worker_index", None),
+            "uptime": monotonic() - self._control_started,
+            "draining": getattr(self, "draining", False),
+        }
+
+    def control_stats(self):
+        """Get the message counters, settings, and metrics of the daemon."""
+        stats = {}
+        for name in (
+            "messages_dispatched",
+            "messages_completed",
+            "messages_failed",
+            "messages_abandoned",
+            "messages_timed_out",
+            "messages_inflight",
+            "pool_size",
+            "idle_time",
+            "batch_size",
+        ):
+
+            if hasattr(self, name):
+
+                stats[name] = getattr(self, name)
+
+        snapshot = getattr(getattr(self, "metrics", None), "snapshot", None)
+        if snapshot is not None:
+
+            stats["metrics"] = snapshot()
+
+        return stats
+
+    def control_set(self, **settings):
+        """Change 'pool_size' or 'idle_time' and get the new values."""
+        if not hasattr(self, "resize_pool"):
+
+            raise ValueError("This daemon does not handle messages.")
+
+        # Every setting is checked before any is changed.
+        pool_size = settings.pop("pool_size", None)
+        if pool_size is not None and int(pool_size) < 1:
+
+            raise ValueError("The pool_size must be at least one.")
+
+        idle_time = settings.pop("idle_time", self.idle_time)
+        if idle_time is not None and float(idle_time) < 0:
+
+            raise ValueError("The idle_time must not be negative.")
+
+        if settings:
+
+            raise ValueError("Unknown settings {0}.".format(
+                ", ".join(sorted(settings))
+            ))
+
+        if pool_size is not None:
+
+            self.resize_pool(int(pool_size))
+
+        self.idle_time = None if idle_time is None else float(idle_time)
+        return {"pool_size": self.pool_size, "idle_time": self.idle_time}
+
+    def control_drain(self, timeout=None):
+        """Stop fetching messages and wait for those in flight to finish.
+
+        Returns True if every message finished within the timeout.
+        """
+        drain = getattr(self, "drain", None)
+        if drain is None:
+
+            raise ValueError("This daemon does not handle messages.")
+
+        return drain(timeout)
+
+    def control_stacks(self):
+        """Get the current stack of every thread."""
+        return simple_watchdog.format_stacks()
+
+    def _serve_control(self, server):
+        """Accept connections until the server is closed."""
+        while True:
+
+            try:
+
+                conn, _ = server.accept()
+
+            except (OSError, socket.error):
+
+                return None
+
+            thread = threading.Thread(
+                target=self._serve_connection,
+                args=(conn,),
+                name="control-connection",
+            )
+            thread.daemon = True
+            thread.start()
+
+    def _serve_connection(self, conn):
+        """Reply to every request sent over a connection."""
+        try:
+
+            stream = conn.makefile("rwb")
+            for line in stream:
+
+                stream.write(
+                    json.dumps(self._reply(line)).encode("utf-8") + b"\n"
+                )
+                stream.flush()
+
+        except (OSError, socket.error):
+
+            LOG.debug("Lost a control connection.", exc_info=True)
+
+        finally:
+
+            conn.close()
+
+    def _reply(self, line):
+        """Get the reply to a single request."""
+        try:
+
+            arguments = json.loads(line.decode("utf-8"))
+            command = arguments.pop("command")
+
+        except (ValueError, AttributeError, KeyError, TypeError):
+
+            return {"ok": False, "error": "Invalid request."}
+
+        try:
+
+            return {"ok": True, "result": self.control(command, **arguments)}
+
+        except Exception as err:
+
+            if not isinstance(err, (ValueError, TypeError)):
+
+                LOG.exception("Control command {0} failed.".format(command))
+
+            return {"ok": False, "error": "{0}".format(err)}
+
+    def _remove_control_path(self, path):
+        """Remove a control socket if it exists."""
+        try:
+
+            os.remove(path)
+
+        except OSError as err:
+
+            if err.errno != errno.ENOENT:
+
+                raise
+
+
+def main(argv=None):
+    """Send a command to a daemon and print the result as JSON."""
+    parser = argparse.ArgumentParser(
+        description="Send a command to a daemon's control socket.",
+    )
+    parser.add_argument("pidfile")
+    parser.add_argument("command")
+    parser.add_argument(
+        "arguments",
+        nargs="*",
+        help="Arguments given as name=value. Values are parsed as JSON when "
+        "possible.",
+    )
+    parser.add_argument("--worker", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=10)
+    args = parser.parse_args(argv)
+
+    arguments = {}
+    for argument in args.arguments:
+
+        name, _, value = argument.partition("=")
+        try:
+
+            arguments[name] = json.loads(value)
+
+        except ValueError:
+
+            arguments[name] = value
+
+    try:
+
+        result = request(
+            control_path(args.pidfile, args.worker),
+            args.command,
+            timeout=args.timeout,
+            **arguments
+        )
+
+    except (RuntimeError, OSError, socket.error) as err:
+
+        print("{0}".format(err), file=sys.stderr)
+        return 1
+
+    if isinstance(result, str):
+
+        print(result)
+        return 0
+
+    print(json.dumps(result, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
@@ -7,12 +7,24 @@ from __future__ import unicode_literals
 
 import os
 
+from . import notify
+
 
 class NoopDaemonizeManager(object):
 
     """Daemonizer which does nothing. Useful for testing and debugging."""
 
+    manual_ready = False
+
     def daemonize(self):
-        """Do nothing."""
+        """Do nothing other than report ready."""
         self.pid = os.getpid()
+        if not self.manual_ready:
+
+            self.notify_ready()
+
         return None
+
+    def notify_ready(self):
+        """Notify systemd, if it started the process, that it is ready."""
+        notify.systemd_notify("READY=1\nMAINPID={0}".format(os.getpid()))
@@ -0,0 +1,50 @@
+"""Support for the systemd service notification protocol."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import os
+import socket
+
+
+LOG = logging.getLogger(__name__)
+
+# The socket systemd listens on for notifications from the service.
+NOTIFY_SOCKET_ENV = "NOTIFY_SOCKET"
+
+
+def systemd_notify(state):
+    """Send a state such as "READY=1" to the service manager.
+
+    Nothing is sent unless the process was started with a NOTIFY_SOCKET in
+    the environment. Returns True if the state was sent.
+    """
+    address = os.environ.get(NOTIFY_SOCKET_ENV)
+    if not address:
+
+        return False
+
+    if address.startswith("@"):
+
+        # Addresses in the abstract namespace begin with a null byte.
+        address = "\0" + address[1:]
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+
+        sock.connect(address)
+        sock.sendall(state.encode("utf-8"))
+
+    except (IOError, OSError, socket.error):
+
+        LOG.exception("Failed to notify {0}.".format(address))
+        return False
+
+    finally:
+
+        sock.close()
+
+    return True
@@ -0,0 +1,173 @@
+"""Support for CPU affinity, scheduling priority, and resource limits."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import ctypes
+import errno
+import os
+import platform
+import resource
+import struct
+import sysconfig
+
+
+# The io scheduling classes of the Linux ioprio interface.
+IOPRIO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+
+# libc does not wrap ioprio_set and ioprio_get so they are called by their
+# syscall numbers. These differ between architectures and, on a 64-bit
+# kernel, between 64-bit and 32-bit processes. The table is keyed on the
+# machine, which is the kernel's, and the pointer size of the interpreter.
+IOPRIO_SYSCALLS = {
+    ("x86_64", 8): (251, 252),
+    ("x86_64", 4): (289, 290),
+    ("i386", 4): (289, 290),
+    ("i686", 4): (289, 290),
+    ("aarch64", 8): (30, 31),
+    ("aarch64", 4): (314, 315),
+    ("armv7l", 4): (314, 315),
+    ("armv8l", 4): (314, 315),
+    ("ppc64", 8): (273, 274),
+    ("ppc64", 4): (273, 274),
+    ("ppc64le", 8): (273, 274),
+    ("s390x", 8): (282, 283),
+    ("s390x", 4): (282, 283),
+}
+
+
+def unsupported(name):
+    """Get the error raised for a setting the platform does not support."""
+    return OSError(
+        errno.ENOSYS, "{0} is not supported on this platform.".format(name)
+    )
+
+
+def set_affinity(cpus):
+    """Restrict the current process to the given CPUs."""
+    if not hasattr(os, "sched_setaffinity"):
+
+        raise unsupported("CPU affinity")
+
+    os.sched_setaffinity(0, cpus)
+
+
+def spread_cpus(index):
+    """Get the single CPU that the worker in slot 'index' should run on.
+
+    Workers are spread in turn over the CPUs the current process may use.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+
+        raise unsupported("CPU affinity")
+
+    cpus = sorted(os.sched_getaffinity(0))
+    return [cpus[index % len(cpus)]]
+
+
+def set_nice(value):
+    """Set the nice value of the current process."""
+    if hasattr(os, "setpriority"):
+
+        os.setpriority(os.PRIO_PROCESS, 0, value)
+        return None
+
+    os.nice(value - os.nice(0))
+
+
+def ioprio_syscalls():
+    """Get the ioprio_set and ioprio_get syscall numbers of this process.
+
+    Returns None if they are not known.
+    """
+    # The x32 ABI has 4 byte pointers on x86_64 but its own syscall numbers.
+    if (sysconfig.get_config_var("MULTIARCH") or "").endswith("x32"):
+
+        return None
+
+    return IOPRIO_SYSCALLS.get((platform.machine(), struct.calcsize("P")))
+
+
+def _ioprio_syscall(which):
+    """Get a function which makes one of the ioprio syscalls."""
+    numbers = ioprio_syscalls()
+    if numbers is None:
+
+        raise unsupported("ioprio")
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    number = numbers[which]
+
+    def syscall(*args):
+
+        result = libc.syscall(number, *args)
+        if result < 0:
+
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        return result
+
+    return syscall
+
+
+def set_ioprio(ioclass, level=0):
+    """Set the io scheduling class and level of the current process.
+
+    The class is one of 'realtime', 'best-effort', or 'idle' and the level
+    is from 0, the highest priority, to 7. The idle class has no levels.
+    """
+    if ioclass not in IOPRIO_CLASSES:
+
+        raise ValueError("Unknown ioprio class {0}.".format(ioclass))
+
+    if not 0 <= level <= 7:
+
+        raise ValueError("The ioprio level must be from 0 to 7.")
+
+    _ioprio_syscall(0)(
+        IOPRIO_WHO_PROCESS,
+        0,
+        IOPRIO_CLASSES[ioclass] << IOPRIO_CLASS_SHIFT | level,
+    )
+
+
+def get_ioprio():
+    """Get the io scheduling class and level of the current process.
+
+    The class is None if the process has not set one.
+    """
+    value = _ioprio_syscall(1)(IOPRIO_WHO_PROCESS, 0)
+    classes = dict((number, name) for name, number in IOPRIO_CLASSES.items())
+    return (
+        classes.get(value >> IOPRIO_CLASS_SHIFT),
+        value & ((1 << IOPRIO_CLASS_SHIFT) - 1),
+    )
+
+
+def set_rlimits(limits):
+    """Set resource limits of the current process.
+
+    'limits' maps names such as 'nofile' or 'as', or resource constants,
+    to a soft limit or to a tuple of the soft and hard limits. A single
+    value leaves the hard limit as it is.
+    """
+    for name, value in limits.items():
+
+        limit = name
+        if not isinstance(name, int):
+
+            limit = getattr(resource, "RLIMIT_{0}".format(name.upper()), None)
+            if limit is None:
+
+                raise ValueError("Unknown resource limit {0}.".format(name))
+
+        if isinstance(value, int):
+
+            value = (value, resource.getrlimit(limit)[1])
+
+        resource.setrlimit(limit, tuple(value))
@@ -5,28 +5,211 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import errno
 import logging
 import os
+import select
 import sys
+import time
 
 from ..interfaces import daemonize as daemonize_iface
 from ..interfaces import exit
+from . import notify
+from . import resources
 
 LOG = logging.getLogger(__name__)
 
+monotonic = getattr(time, "monotonic", time.time)
+
 
 class SimpleDaemonizeManager(daemonize_iface.DaemonizeManager):
 
-    """Daemonizer which does a unix double fork."""
+    """Daemonizer which does a unix double fork.
+
+    The original process does not exit until the daemon reports that it is
+    ready through a pipe shared across both forks. Its exit code is SUCCESS
+    once the daemon is ready, READY_FAILED if the daemon exits first, or
+    READY_TIMEOUT if 'ready_timeout' seconds pass. The daemon reports ready
+    as soon as it has written the pidfile unless 'manual_ready' is set, in
+    which case it must call 'notify_ready()' itself once it has warmed up.
+
+    The daemon's standard streams are redirected to the 'stdin', 'stdout',
+    and 'stderr' paths, which all default to os.devnull. Output files are
+    appended to. A stream given as None is left as it was.
+
+    Once detached the daemon applies any of these settings which are given:
+
+        cpu_affinity: the CPUs the daemon may run on.
+        nice: the nice value of the daemon.
+        ioprio: an io scheduling class of 'realtime', 'best-effort', or
+            'idle', or a tuple of the class and a level from 0 to 7.
+        rlimits: a mapping of resource names, such as 'nofile' or 'as', to a
+            soft limit or a tuple of the soft and hard limits.
+
+    A daemon which cannot apply its settings exits before it is ready.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the daemon with manual_ready and ready_timeout.
+
+        The default 'ready_timeout' of None waits for as long as the daemon
+        is alive.
+        """
+        self.manual_ready = kwargs.pop("manual_ready", False)
+        self.ready_timeout = kwargs.pop("ready_timeout", None)
+        self.stdin = kwargs.pop("stdin", os.devnull)
+        self.stdout = kwargs.pop("stdout", os.devnull)
+        self.stderr = kwargs.pop("stderr", os.devnull)
+        self.cpu_affinity = kwargs.pop("cpu_affinity", None)
+        self.nice = kwargs.pop("nice", None)
+        self.ioprio = kwargs.pop("ioprio", None)
+        self.rlimits = kwargs.pop("rlimits", None)
+        self._ready_fd = None
+
+        super(SimpleDaemonizeManager, self).__init__(*args, **kwargs)
 
     def daemonize(self):
         """Double fork and set the pid."""
         self._double_fork()
+        self.apply_resources()
+        self.redirect_stdio()
 
         # Write pidfile.
         self.pid = os.getpid()
 
         LOG.info("Succesfully daemonized process {0}.".format(self.pid))
+        if not self.manual_ready:
+
+            self.notify_ready()
+
+    def notify_ready(self):
+        """Release the original process and notify systemd if present."""
+        notify.systemd_notify("READY=1\nMAINPID={0}".format(os.getpid()))
+        if self._ready_fd is None:
+
+            return None
+
+        fd, self._ready_fd = self._ready_fd, None
+        try:
+
+            os.write(fd, b"1")
+
+        except OSError as err:
+
+            # The original process is gone if nobody is left to read.
+            if err.errno != errno.EPIPE:
+
+                raise
+
+        finally:
+
+            os.close(fd)
+
+    def apply_resources(self):
+        """Apply the affinity, priority, and resource limit settings."""
+        try:
+
+            if self.rlimits:
+
+                resources.set_rlimits(self.rlimits)
+
+            if self.cpu_affinity is not None:
+
+                resources.set_affinity(self.cpu_affinity)
+
+            if self.nice is not None:
+
+                resources.set_nice(self.nice)
+
+            if self.ioprio is not None:
+
+                ioprio = self.ioprio
+                if not isinstance(ioprio, (tuple, list)):
+
+                    ioprio = (ioprio,)
+
+                resources.set_ioprio(*ioprio)
+
+        except (OSError, ValueError) as err:
+
+            LOG.exception(
+                "Failed to apply the resource settings: {0}".format(err)
+            )
+            sys.exit(exit.DAEMONIZE_FAILED)
+
+    def redirect_stdio(self):
+        """Point the standard streams at their configured paths.
+
+        This may be called again to reopen the files after they are rotated.
+        """
+        for stream in (sys.stdout, sys.stderr):
+
+            try:
+
+                stream.flush()
+
+            except (AttributeError, ValueError, IOError, OSError):
+
+                pass
+
+        output = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        for path, target, flags in (
+            (self.stdin, 0, os.O_RDONLY),
+            (self.stdout, 1, output),
+            (self.stderr, 2, output),
+        ):
+
+            if path is None:
+
+                continue
+
+            fd = os.open(path, flags, 0o644)
+            os.dup2(fd, target)
+            os.close(fd)
+
+    def _wait_ready(self, fd):
+        """Wait for the daemon to report ready.
+
+        Returns the exit code for the original process.
+        """
+        deadline = None
+        if self.ready_timeout is not None:
+
+            deadline = monotonic() + self.ready_timeout
+
+        while True:
+
+            remaining = None
+            if deadline is not None:
+
+                remaining = max(0, deadline - monotonic())
+
+            try:
+
+                readable, _, _ = select.select([fd], [], [], remaining)
+
+            except (IOError, OSError, select.error) as err:
+
+                if err.args[0] == errno.EINTR:
+
+                    continue
+
+                raise
+
+            if not readable:
+
+                LOG.error(
+                    "The daemon did not report ready within {0} "
+                    "seconds.".format(self.ready_timeout)
+                )
+                return exit.READY_TIMEOUT
+
+            if os.read(fd, 1):
+
+                return exit.SUCCESS
+
+            LOG.error("The daemon exited before reporting ready.")
+            return exit.READY_FAILED
 
     def _double_fork(self):
         """Do the UNIX double-fork magic.
@@ -35,13 +218,17 @@ class SimpleDaemonizeManager(daemonize_iface.DaemonizeManager):
         (ISBN 0201563177)
         http://www.erlenstar.demon.co.uk/unix/faq_2.html#SEC16
         """
+        read_fd, write_fd = os.pipe()
         try:
 
             pid = os.fork()
             if pid > 0:
 
-                # Exit first parent.
-                sys.exit(0)
+                # Exit first parent once the daemon is ready.
+                os.close(write_fd)
+                code = self._wait_ready(read_fd)
+                os.close(read_fd)
+                sys.exit(code)
                 return None
 
         except OSError as err:
@@ -52,6 +239,9 @@ class SimpleDaemonizeManager(daemonize_iface.DaemonizeManager):
             sys.exit(exit.DAEMONIZE_FAILED)
             return None
 
+        os.close(read_fd)
+        self._ready_fd = write_fd
+
         # Decouple from parent environment.
         os.chdir("/")
         os.setsid()
@@ -0,0 +1,109 @@
+"""Daemonize manager which spawns a fresh interpreter instead of forking."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import os
+import subprocess
+import sys
+
+from ..interfaces import exit
+from ..reload import simple as simple_reload
+from . import simple as simple_daemonize
+
+
+LOG = logging.getLogger(__name__)
+
+# Set in the environment of a spawned daemon to the descriptor of the pipe
+# used to report readiness to the launching process.
+SPAWNED_ENV = "DAEMONS_SPAWNED"
+
+
+class SpawnDaemonizeManager(simple_daemonize.SimpleDaemonizeManager):
+
+    """Daemonizer which launches the daemon as a new interpreter.
+
+    Rather than forking the calling process, which copies its page tables
+    and touches its memory, the daemon is started by running the command
+    line of the calling process again in a new session. The new process
+    re-enters the program at its entry point and, when it calls 'start()',
+    recognises that it was spawned and carries on as the daemon. The cost
+    of starting a daemon is then the same no matter how large the process
+    which launches it.
+
+    The launching process waits for the daemon to report ready exactly as it
+    would after a double fork. The command line may be replaced by passing
+    'spawn_argv'.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the daemon with a spawn_argv."""
+        self.spawn_argv = kwargs.pop("spawn_argv", None)
+
+        super(SpawnDaemonizeManager, self).__init__(*args, **kwargs)
+
+    def daemonize(self):
+        """Spawn the daemon or, within the spawned process, set the pid."""
+        ready_fd = os.environ.pop(SPAWNED_ENV, None)
+        if ready_fd is None:
+
+            self._spawn()
+            return None
+
+        self._ready_fd = int(ready_fd)
+        if hasattr(os, "set_inheritable"):
+
+            os.set_inheritable(self._ready_fd, False)
+
+        os.chdir("/")
+        os.umask(0)
+        self.apply_resources()
+        self.redirect_stdio()
+
+        # Write pidfile.
+        self.pid = os.getpid()
+
+        LOG.info("Succesfully spawned process {0}.".format(self.pid))
+        if not self.manual_ready:
+
+            self.notify_ready()
+
+    def _spawn(self):
+        """Launch the daemon and exit once it is ready."""
+        argv = self.spawn_argv or simple_reload.launch_argv()
+        read_fd, write_fd = os.pipe()
+        env = dict(os.environ)
+        env[SPAWNED_ENV] = "{0}".format(write_fd)
+        options = {"env": env}
+        if sys.version_info >= (3, 2):
+
+            options["pass_fds"] = (write_fd,)
+            options["start_new_session"] = True
+
+        else:
+
+            options["close_fds"] = False
+            options["preexec_fn"] = os.setsid
+
+        try:
+
+            subprocess.Popen(argv, **options)
+
+        except OSError as err:
+
+            LOG.exception(
+                "Spawn failed: {0} ({1})".format(err.errno, err.strerror)
+            )
+            sys.exit(exit.DAEMONIZE_FAILED)
+            return None
+
+        finally:
+
+            os.close(write_fd)
+
+        code = self._wait_ready(read_fd)
+        os.close(read_fd)
+        sys.exit(code)
@@ -0,0 +1,267 @@
+"""Control many daemons at once by their pidfiles.
+
+This module provides both the 'Fleet' API and the 'daemons' command.
+
+    daemons status /var/run/myapp/
+    daemons stop --timeout 10 /var/run/myapp/*.pid
+    daemons restart --command "python /srv/{name}.py start" /var/run/myapp/
+
+Every action runs against all of the daemons concurrently and one JSON
+object is printed for each daemon as its action completes. A directory only
+names the daemons whose pidfiles it contains so starting daemons which are
+not running requires the paths of their pidfiles.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+from concurrent import futures
+import glob
+import json
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+from .interfaces import exit
+from .pid import simple as simple_pid
+from .startstop import simple as simple_startstop
+
+
+LOG = logging.getLogger(__name__)
+
+ACTIONS = ("status", "start", "stop", "restart")
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
+def find_pidfiles(paths):
+    """Expand directories into the '*.pid' files they contain.
+
+    Other paths are kept as they are. Duplicates are removed.
+    """
+    pidfiles = []
+    for path in paths:
+
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+
+            pidfiles.extend(sorted(glob.glob(os.path.join(path, "*.pid"))))
+            continue
+
+        pidfiles.append(path)
+
+    unique = []
+    for pidfile in pidfiles:
+
+        if pidfile not in unique:
+
+            unique.append(pidfile)
+
+    return unique
+
+
+class Controller(
+    simple_pid.SimplePidManager, simple_startstop.SimpleStartStopManager
+):
+
+    """Controls a daemon through its pidfile from another process."""
+
+
+class Fleet(object):
+
+    """A set of daemons identified by their pidfiles.
+
+    Actions run against every daemon at once using a pool of no more than
+    'workers' threads. Each action returns one result per daemon as a
+    dictionary with these keys:
+
+        pidfile: the pidfile of the daemon.
+        action: the name of the action.
+        ok: whether the action succeeded.
+        pid: the pid of the daemon once the action finished, if running.
+        code: the exit code of the action, 0 on success.
+        error: a description of the failure, if any.
+        elapsed: the number of seconds the action took.
+
+    Daemons are stopped with SIGTERM. If 'stop_timeout' is given, any daemon
+    still running after that many seconds is sent SIGKILL. Starting a daemon
+    requires a 'command' which is a template for the command line that
+    starts it. '{pidfile}' in the template is replaced with the path of the
+    pidfile and '{name}' with its name without the '.pid' extension.
+    """
+
+    def __init__(self, pidfiles, workers=32, stop_timeout=None, command=None):
+        """Initialize the fleet with the pidfiles of its daemons."""
+        self.pidfiles = find_pidfiles(pidfiles)
+        self.workers = workers
+        self.stop_timeout = stop_timeout
+        self.command = command
+
+    def status(self):
+        """Get the pid of every daemon."""
+        return list(self.run("status"))
+
+    def start(self):
+        """Start every daemon which is not running."""
+        return list(self.run("start"))
+
+    def stop(self):
+        """Stop every running daemon."""
+        return list(self.run("stop"))
+
+    def restart(self):
+        """Stop and then start every daemon."""
+        return list(self.run("restart"))
+
+    def run(self, action):
+        """Run an action against every daemon.
+
+        Results are yielded in the order that the daemons finish.
+        """
+        if action not in ACTIONS:
+
+            raise ValueError("Unknown action {0}.".format(action))
+
+        if not self.pidfiles:
+
+            return
+
+        workers = max(1, min(self.workers, len(self.pidfiles)))
+        with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+
+            pending = [
+                pool.submit(self.apply, action, pidfile)
+                for pidfile in self.pidfiles
+            ]
+            for future in futures.as_completed(pending):
+
+                yield future.result()
+
+    def apply(self, action, pidfile):
+        """Run an action against a single daemon and get the result."""
+        started = monotonic()
+        result = {
+            "pidfile": pidfile,
+            "action": action,
+            "ok": True,
+            "pid": None,
+            "code": exit.SUCCESS,
+            "error": None,
+        }
+        controller = Controller(
+            pidfile=pidfile, stop_timeout=self.stop_timeout
+        )
+        try:
+
+            if action in ("stop", "restart"):
+
+                controller.stop()
+
+            if action in ("start", "restart") and controller.pid is None:
+
+                self.launch(pidfile)
+
+        except SystemExit as err:
+
+            result["code"] = err.code
+            result["error"] = "{0} exited with code {1}.".format(
+                action, err.code
+            )
+
+        except Exception as err:
+
+            LOG.exception("Failed to {0} {1}.".format(action, pidfile))
+            result["code"] = None
+            result["error"] = "{0}".format(err)
+
+        result["ok"] = result["error"] is None
+        result["pid"] = controller.pid
+        result["elapsed"] = monotonic() - started
+        return result
+
+    def launch(self, pidfile):
+        """Run the start command for a daemon.
+
+        Exits with the code of the command if it fails.
+        """
+        if not self.command:
+
+            raise ValueError("A command is required to start daemons.")
+
+        name = os.path.basename(pidfile)
+        if name.endswith(".pid"):
+
+            name = name[:-len(".pid")]
+
+        argv = [
+            part.format(pidfile=pidfile, name=name)
+            for part in shlex.split(self.command)
+        ]
+        with open(os.devnull, "r+b") as devnull:
+
+            code = subprocess.call(
+                argv, stdin=devnull, stdout=devnull, stderr=devnull
+            )
+
+        if code != exit.SUCCESS:
+
+            sys.exit(code)
+
+
+def main(argv=None):
+    """Run the 'daemons' command."""
+    parser = argparse.ArgumentParser(
+        prog="daemons",
+        description="Control many daemons at once by their pidfiles.",
+    )
+    parser.add_argument("action", choices=ACTIONS)
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="Pidfiles or directories containing '*.pid' files.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=32,
+        help="Number of daemons to act on at once.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds to wait for a daemon to stop before sending SIGKILL.",
+    )
+    parser.add_argument(
+        "--command",
+        help="Command line which starts a daemon. '{pidfile}' and '{name}' "
+        "are replaced with the pidfile and its name.",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    fleet = Fleet(
+        args.paths,
+        workers=args.workers,
+        stop_timeout=args.timeout,
+        command=args.command,
+    )
+    failed = False
+    for result in fleet.run(args.action):
+
+        failed = failed or not result["ok"]
+        print(json.dumps(result, sort_keys=True))
+        sys.stdout.flush()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
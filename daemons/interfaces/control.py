@@ -0,0 +1,26 @@
+"""Standard interface for controlling a running daemon."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class ControlManager(object):
+
+    """Implementations of this mixin accept commands from other processes."""
+
+    def start_control(self):
+        """Begin accepting commands in the current process."""
+        raise NotImplementedError()
+
+    def stop_control(self):
+        """Stop accepting commands."""
+        raise NotImplementedError()
+
+    def control(self, command, **arguments):
+        """Run a command and return its result.
+
+        Unknown commands and invalid arguments must raise a ValueError.
+        """
+        raise NotImplementedError()
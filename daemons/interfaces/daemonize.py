@@ -17,3 +17,12 @@ class DaemonizeManager(object):
         and error in daemonization the exit code should be DAEMONIZE_FAILED.
         """
         raise NotImplementedError()
+
+    def notify_ready(self):
+        """Report that the daemon has finished initializing.
+
+        Implementations which make the caller of 'start' wait for the daemon
+        to be ready must release it here. Calling this more than once must
+        have no further effect.
+        """
+        raise NotImplementedError()
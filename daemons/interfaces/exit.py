@@ -14,3 +14,7 @@ RUN_FAILURE = 4
 STOP_FAILED = 5
 PIDFILE_INACCESSIBLE = 6
 PIDFILE_ERROR = 7
+RELOAD_FAILED = 8
+READY_FAILED = 9
+READY_TIMEOUT = 10
+RECYCLED = 11
@@ -0,0 +1,23 @@
+"""Standard interface for handling the log output of a daemon."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class LogManager(object):
+
+    """Implementations of this mixin keep logging off the daemon's loop."""
+
+    def start_logging(self):
+        """Begin writing log records from the current process."""
+        raise NotImplementedError()
+
+    def stop_logging(self):
+        """Write any records still waiting and restore the handlers."""
+        raise NotImplementedError()
+
+    def reopen_logs(self):
+        """Reopen every log file so that rotated files are released."""
+        raise NotImplementedError()
@@ -5,9 +5,17 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import logging
+import select
+import threading
 import time
 
 
+LOG = logging.getLogger(__name__)
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
 class MessageManager(object):
 
     """Implementations provide management of messages to the process."""
@@ -15,23 +23,407 @@ class MessageManager(object):
     # This alias for sleep is placed here to allow extensions to change the
     # idle behaviour of the loop without monkey patching the time library.
     sleep = staticmethod(time.sleep)
+    # Similarly, this alias is used to wait on a wakeup when idle.
+    select = staticmethod(select.select)
+    metrics = None
+    # Green thread implementations set this to a timeout class which, like
+    # gevent.Timeout, raises itself within the running handler once it
+    # expires. Without one, handlers cannot be cancelled.
+    Timeout = None
+    # Green thread implementations set this because their signal handlers
+    # run within the hub, where the handlers cannot be waited on. Shutdown
+    # signals then only set the 'shutdown_wakeup', if there is one, and the
+    # next step shuts down.
+    defer_shutdown_signals = False
+    shutdown_wakeup = None
 
     def __init__(self, *args, **kwargs):
-        """Initialize the daemon with an idle_time and pool_size."""
+        """Initialize the daemon with an idle_time and pool_size.
+
+        Messages may also be fetched and dispatched in batches by passing a
+        'batch_size' greater than one. 'batch_linger' is the number of
+        seconds to wait for a batch to fill once its first message arrives.
+
+        How long to wait after finding no messages is decided by the
+        'idle_strategy'. With no strategy the wait is always 'idle_time'. If
+        a 'wakeup' is given the wait ends early once the wakeup is set.
+
+        On shutdown the daemon stops fetching messages and waits up to
+        'drain_timeout' seconds for those already dispatched to finish.
+
+        Measurements of the loop are sent to the 'metrics' sink if one is
+        given.
+
+        A 'pool_controller', such as the 'AIMDController' from
+        'daemons.message.autoscale', resizes the pool between steps based on
+        how the handlers perform.
+
+        Handlers still running 'message_timeout' seconds after they were
+        dispatched are cancelled by implementations which can cancel them.
+        """
         self.idle_time = kwargs.pop("idle_time", 0.1)
         self.pool_size = kwargs.pop("pool_size", 100)
+        self.batch_size = kwargs.pop("batch_size", 1)
+        self.batch_linger = kwargs.pop("batch_linger", 0)
+        self.idle_strategy = kwargs.pop("idle_strategy", None)
+        self.wakeup = kwargs.pop("wakeup", None)
+        self.drain_timeout = kwargs.pop("drain_timeout", 10)
+        self.metrics = kwargs.pop("metrics", self.metrics)
+        self.pool_controller = kwargs.pop("pool_controller", None)
+        self.message_timeout = kwargs.pop("message_timeout", None)
+        self.draining = False
+        self.messages_dispatched = 0
+        self.messages_completed = 0
+        self.messages_failed = 0
+        self.messages_abandoned = 0
+        self.messages_timed_out = 0
+        self._outcomes = threading.Lock()
+        self._abandoned = False
+        self._shutdown_signum = None
 
         super(MessageManager, self).__init__(*args, **kwargs)
 
+    @property
+    def messages_inflight(self):
+        """Get the number of dispatched messages which have not finished."""
+        return (
+            self.messages_dispatched
+            - self.messages_completed
+            - self.messages_failed
+            - self.messages_abandoned
+        )
+
     @property
     def pool(self):
         """Get a pool used to dispatch requests."""
         raise NotImplementedError()
 
+    def resize_pool(self, size):
+        """Change the number of messages which may be handled at once.
+
+        Implementations must apply the new size to a pool which already
+        exists. A smaller size may take effect only as running handlers
+        finish.
+        """
+        self.pool_size = size
+
     def dispatch(self, message):
         """Execute handle_message within a context from the pool."""
         raise NotImplementedError()
 
+    def dispatch_batch(self, messages):
+        """Execute handle_batch within a single context from the pool."""
+        raise NotImplementedError()
+
+    def timeout_for(self, message):
+        """Get the number of seconds a message may be handled for.
+
+        The default is the 'message_timeout'. Override this to derive the
+        timeout from the message. None allows the handler to run forever.
+        """
+        return self.message_timeout
+
+    def batch_timeout(self, messages):
+        """Get the number of seconds a batch may be handled for.
+
+        This is the longest timeout of any message in the batch.
+        """
+        timeouts = [self.timeout_for(message) for message in messages]
+        if not timeouts or None in timeouts:
+
+            return None
+
+        return max(timeouts)
+
+    def consume(self, handler, payload, count, timeout=None):
+        """Run a handler for dispatched work and record the outcome.
+
+        Implementations call this from within the pool with either
+        'handle_message' and a message or 'handle_batch' and a list of
+        'count' messages, along with the timeout of the work. Returns False
+        if the handler raised or timed out.
+        """
+        succeeded = self.run_handler(handler, payload, timeout)
+        if succeeded is None:
+
+            self.record_timeout(payload, count)
+            return False
+
+        self.record_outcome(count, failed=not succeeded)
+        return succeeded
+
+    def run_handler(self, handler, payload, timeout=None):
+        """Run a handler and log any exception it raises.
+
+        The handler is cancelled after 'timeout' seconds if the
+        implementation provides a 'Timeout'. The duration of the handler is
+        recorded under its name. Returns False if the handler raised and
+        None if it was cancelled.
+        """
+        timer = None
+        if timeout is not None and self.Timeout is not None:
+
+            timer = self.Timeout(timeout)
+
+        started = monotonic()
+        failed = True
+        try:
+
+            if timer is None:
+
+                handler(payload)
+
+            else:
+
+                with timer:
+
+                    handler(payload)
+
+            failed = False
+
+        except Exception:
+
+            LOG.exception("Uncaught exception in {0}().".format(
+                handler.__name__
+            ))
+
+        except BaseException as err:
+
+            if timer is None or err is not timer:
+
+                raise
+
+            return None
+
+        finally:
+
+            self.record_latency(
+                handler.__name__, monotonic() - started, failed
+            )
+
+        return not failed
+
+    def record_latency(self, name, seconds, failed=False):
+        """Report how long a handler took to the metrics and controller."""
+        if self.metrics is not None:
+
+            self.metrics.timing(name, seconds)
+
+        if self.pool_controller is not None:
+
+            self.pool_controller.record(seconds, failed)
+
+    def record_dispatch(self, count):
+        """Count 'count' messages as dispatched to the pool."""
+        self.messages_dispatched += count
+        if self.pool_controller is not None:
+
+            self.pool_controller.sample(self.messages_inflight)
+
+        if self.metrics is not None:
+
+            self.metrics.increment("messages.dispatched", count)
+            self.metrics.gauge("pool.inflight", self.messages_inflight)
+            self.metrics.gauge("pool.size", self.pool_size)
+
+    def record_timeout(self, payload, count):
+        """Count 'count' messages as timed out and run 'handle_timeout'.
+
+        Timed out messages are also counted as failed.
+        """
+        with self._outcomes:
+
+            if not self._abandoned:
+
+                self.messages_timed_out += count
+
+        if self.metrics is not None:
+
+            self.metrics.increment("messages.timed_out", count)
+
+        self.record_outcome(count, failed=True)
+        try:
+
+            self.handle_timeout(payload)
+
+        except Exception:
+
+            LOG.exception("Uncaught exception in handle_timeout().")
+
+    def record_outcome(self, count, failed=False):
+        """Count 'count' dispatched messages as finished."""
+        with self._outcomes:
+
+            if self._abandoned:
+
+                # Anything finishing now was already counted as abandoned.
+                return None
+
+            if failed:
+
+                self.messages_failed += count
+
+            else:
+
+                self.messages_completed += count
+
+        if self.metrics is None:
+
+            return None
+
+        if failed:
+
+            self.metrics.increment("messages.failed", count)
+            self.metrics.increment("errors")
+            return None
+
+        self.metrics.increment("messages.completed", count)
+
+    def measure(self, name, func, *args):
+        """Call 'func' with 'args' and record its duration as 'name'."""
+        if self.metrics is None:
+
+            return func(*args)
+
+        started = monotonic()
+        try:
+
+            return func(*args)
+
+        finally:
+
+            self.metrics.timing(name, monotonic() - started)
+
+    def drain(self, timeout=None):
+        """Stop fetching messages and wait for dispatched ones to finish.
+
+        The wait lasts up to 'timeout' seconds which defaults to the
+        'drain_timeout'. Messages still in flight after that are counted as
+        abandoned. Returns True if every message finished in time. Draining
+        more than once does nothing.
+        """
+        if self.draining:
+
+            return self.messages_abandoned == 0
+
+        self.draining = True
+        if timeout is None:
+
+            timeout = self.drain_timeout
+
+        return self.drained(self.wait_drained(timeout))
+
+    def drained(self, finished):
+        """Record the end of a drain.
+
+        'finished' must be False if messages were still in flight when the
+        drain ended. Returns 'finished'.
+        """
+        if not finished:
+
+            with self._outcomes:
+
+                self.messages_abandoned += self.messages_inflight
+                self._abandoned = True
+
+        LOG.info(
+            "Drained messages: {0} completed, {1} failed, "
+            "{2} abandoned.".format(
+                self.messages_completed,
+                self.messages_failed,
+                self.messages_abandoned,
+            )
+        )
+        return finished
+
+    def defer_shutdown(self, signum):
+        """Leave a shutdown signal to be handled by the next step.
+
+        The signal manager calls this from its signal handler. Returns True
+        if the shutdown was deferred, which is only the case when
+        'defer_shutdown_signals' is set.
+        """
+        if not self.defer_shutdown_signals:
+
+            return False
+
+        wakeup = self.shutdown_wakeup
+        self._shutdown_signum = signum
+        if wakeup is not None:
+
+            wakeup.set()
+
+        return True
+
+    def autoscale(self):
+        """Resize the pool if the pool_controller decides to."""
+        if self.pool_controller is None:
+
+            return None
+
+        size = self.pool_controller.resize(self.pool_size)
+        if size != self.pool_size:
+
+            LOG.info("Resizing the pool from {0} to {1}.".format(
+                self.pool_size, size
+            ))
+            self.resize_pool(size)
+
+    def wait_drained(self, timeout):
+        """Wait up to 'timeout' seconds for all dispatched work to finish.
+
+        Returns True if nothing is left in flight.
+        """
+        raise NotImplementedError()
+
+    def wait_available(self):
+        """Block until the pool can accept another message.
+
+        This is called before every 'get_message()' so that implementations
+        can apply backpressure rather than pulling messages they have no
+        capacity to handle. The default implementation does not block.
+        """
+        return None
+
+    def idle(self, seconds):
+        """Wait for up to 'seconds' or until the wakeup is set.
+
+        The wait also ends when a signal arrives if the signal manager
+        provides a 'signal_wakeup'. A value of None waits until woken.
+        """
+        wakeups = [
+            wakeup
+            for wakeup in (
+                self.wakeup,
+                getattr(self, "signal_wakeup", None),
+                self.shutdown_wakeup,
+            )
+            if wakeup is not None
+        ]
+        if not wakeups:
+
+            self.sleep(seconds)
+            return None
+
+        self.select(wakeups, [], [], seconds)
+        if self.wakeup is not None:
+
+            self.wakeup.clear()
+
+    def idle_delay(self):
+        """Get the number of seconds to wait after finding no messages."""
+        if self.idle_strategy is None:
+
+            return self.idle_time
+
+        return self.idle_strategy.delay(self.idle_time)
+
+    def idle_reset(self):
+        """Note that messages were found after an idle period."""
+        if self.idle_strategy is not None:
+
+            self.idle_strategy.reset()
+
     def step(self):
         """Grab a new message and dispatch it to the handler.
 
@@ -39,12 +431,42 @@ class MessageManager(object):
         implementations of this daemon should implement the 'get_message()'
         and 'handle_message()' methods.
         """
-        message = self.get_message()
+        if self._shutdown_signum is not None:
+
+            signum, self._shutdown_signum = self._shutdown_signum, None
+            return self.shutdown(signum)
+
+        if self.draining:
+
+            self.idle(self.idle_time)
+            return None
+
+        self.autoscale()
+        self.wait_available()
+        if self.batch_size > 1:
+
+            messages = self.measure(
+                "get_message", self.get_messages, self.batch_size
+            )
+            if not messages:
+
+                self.measure("idle", self.idle, self.idle_delay())
+                return None
+
+            self.idle_reset()
+            self.record_dispatch(len(messages))
+            self.dispatch_batch(messages)
+            self.sleep(0)
+            return None
+
+        message = self.measure("get_message", self.get_message)
         if message is None:
 
-            self.sleep(self.idle_time)
+            self.measure("idle", self.idle, self.idle_delay())
             return None
 
+        self.idle_reset()
+        self.record_dispatch(1)
         self.dispatch(message)
         # In non-greenthread environments this does nothing. In green-thread
         # environments this yields the context so messages can be acted upon
@@ -68,6 +490,68 @@ class MessageManager(object):
         """
         raise NotImplementedError()
 
+    def get_messages(self, max_batch):
+        """Get up to 'max_batch' messages from some source.
+
+        The default implementation calls 'get_message()' until it returns
+        'None', 'max_batch' messages are collected, or 'batch_linger' seconds
+        pass after the first message. Sources with a bulk fetch should
+        override this to pull the whole batch in one round-trip.
+
+        An empty list must be returned when there are no messages.
+        """
+        messages = []
+        deadline = None
+        while len(messages) < max_batch:
+
+            message = self.get_message()
+            if message is not None:
+
+                messages.append(message)
+                if deadline is None:
+
+                    deadline = monotonic() + self.batch_linger
+
+                continue
+
+            if not messages:
+
+                break
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+
+                break
+
+            self.sleep(min(remaining, self.idle_time))
+
+        return messages
+
     def handle_message(self, message):
         """Do something with a message."""
         raise NotImplementedError()
+
+    def handle_timeout(self, payload):
+        """Do something with a message, or batch, whose handler timed out.
+
+        The handler has already been cancelled. The default implementation
+        logs the timeout. This runs in the pool and must not block.
+        """
+        LOG.error("Cancelled the handler of a message after it timed out.")
+
+    def handle_batch(self, messages):
+        """Do something with a batch of messages.
+
+        The default implementation calls 'handle_message()' for each message
+        in turn. A failure to handle one message does not prevent the rest
+        of the batch from being handled.
+        """
+        for message in messages:
+
+            try:
+
+                self.handle_message(message)
+
+            except Exception:
+
+                LOG.exception("Uncaught exception in handle_message().")
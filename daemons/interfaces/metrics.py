@@ -0,0 +1,57 @@
+"""Standard interface for recording daemon metrics."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class MetricsSink(object):
+
+    """Implementations of this interface receive measurements from a daemon.
+
+    A sink is given to a daemon as the 'metrics' kwarg. The daemon then
+    reports on its loop using the following names:
+
+        step: timing of every call to 'step()'.
+        get_message: timing of every call to 'get_message()' or
+            'get_messages()'.
+        handle_message, handle_batch: timing of every handler.
+        idle: timing of every wait after finding no messages.
+        messages.dispatched, messages.completed, messages.failed: counters
+            of the messages passing through the loop.
+        errors: counter of handlers which raised.
+        pool.inflight, pool.size: gauges of the pool occupancy.
+
+    Sinks are called from every thread that handles messages so they must be
+    thread safe. They are also called for every message so they must be
+    cheap. Sinks which buffer measurements are given the chance to send them
+    between steps, through 'tick', and when the daemon shuts down, through
+    'flush'.
+    """
+
+    def increment(self, name, value=1):
+        """Add 'value' to a counter."""
+        raise NotImplementedError()
+
+    def gauge(self, name, value):
+        """Set a gauge to 'value'."""
+        raise NotImplementedError()
+
+    def timing(self, name, seconds):
+        """Record a duration of 'seconds'."""
+        raise NotImplementedError()
+
+    def tick(self):
+        """Send buffered measurements which are due.
+
+        This is called between steps. The default does nothing.
+        """
+        return None
+
+    def flush(self):
+        """Send every buffered measurement.
+
+        This is called when the daemon shuts down. The default does nothing.
+        """
+        return None
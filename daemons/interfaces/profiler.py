@@ -0,0 +1,18 @@
+"""Standard interface for profiling a running daemon."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class ProfilerManager(object):
+
+    """Implementations of this mixin profile a daemon without restarting it."""
+
+    def profile(self, mode=None, duration=None):
+        """Begin profiling the daemon, or finish a profile in progress.
+
+        Returns the path the profile is written to once it is finished.
+        """
+        raise NotImplementedError()
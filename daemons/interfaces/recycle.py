@@ -0,0 +1,22 @@
+"""Standard interface for replacing a daemon before it grows too large."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class RecycleManager(object):
+
+    """Implementations of this mixin periodically replace the daemon."""
+
+    def recycle_reason(self):
+        """Get a description of why the daemon should be replaced.
+
+        Returns None if the daemon should keep running.
+        """
+        raise NotImplementedError()
+
+    def recycle(self, reason):
+        """Finish outstanding work and replace the daemon."""
+        raise NotImplementedError()
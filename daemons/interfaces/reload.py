@@ -0,0 +1,26 @@
+"""Standard interface for reloading a running daemon."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class ReloadManager(object):
+
+    """Implementations of this mixin replace a daemon without downtime."""
+
+    def reload(self):
+        """Start a new generation of the daemon alongside this one.
+
+        The new generation must take over the pidfile and any listening
+        sockets and then ask this process to shut down.
+        """
+        raise NotImplementedError()
+
+    def reexec(self):
+        """Replace this process with a new generation of the daemon.
+
+        Unlike 'reload' the new generation keeps the pid of this process.
+        """
+        raise NotImplementedError()
@@ -0,0 +1,44 @@
+"""Standard interface for running jobs on a schedule."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class SchedulerManager(object):
+
+    """Implementations of this mixin run many timed jobs in one daemon.
+
+    The scheduler is driven by the step loop so implementations provide the
+    'step' method.
+    """
+
+    def every(self, interval, func, policy="coalesce", delay=None, name=None):
+        """Run 'func' every 'interval' seconds and return the new job.
+
+        The first run is after 'delay' seconds which defaults to the
+        interval. The 'policy' decides what happens to runs which are missed
+        because the daemon fell behind. It must be one of:
+
+            catchup: run once for every missed run.
+            coalesce: run once in place of all the missed runs.
+            skip: drop the missed runs and run once for the current one.
+        """
+        raise NotImplementedError()
+
+    def cron(self, expression, func, policy="coalesce", name=None):
+        """Run 'func' whenever the cron 'expression' matches.
+
+        The expression has the five standard fields of minute, hour, day of
+        month, month, and day of week. Returns the new job.
+        """
+        raise NotImplementedError()
+
+    def cancel(self, job):
+        """Stop running a job."""
+        raise NotImplementedError()
+
+    def run_job(self, job):
+        """Run a job which is due."""
+        raise NotImplementedError()
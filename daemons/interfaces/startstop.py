@@ -5,11 +5,19 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import time
+
+
+monotonic = getattr(time, "monotonic", time.time)
+
 
 class StartStopManager(object):
 
     """Implementations of this mixin provide process start/stop management."""
 
+    # A MetricsSink which receives measurements of the daemon.
+    metrics = None
+
     def start(self):
         """Start the process with daemonization.
 
@@ -47,10 +55,36 @@ class StartStopStepManager(StartStopManager):
     """
 
     def run(self):
-        """Loop forever and call 'step'."""
+        """Loop forever and call 'step' followed by 'checkpoint'.
+
+        The duration of every step is recorded if there is a metrics sink.
+        """
+        metrics = self.metrics
+        if metrics is None:
+
+            while True:
+
+                self.step()
+                self.checkpoint()
+
         while True:
 
+            started = monotonic()
             self.step()
+            metrics.timing("step", monotonic() - started)
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Hook run between steps while no step is in progress.
+
+        Mixins may extend this to act at a point where the daemon is known
+        to be making progress. Extensions must call the parent method. The
+        metrics sink, if any, sends the measurements which are due.
+        """
+        tick = getattr(self.metrics, "tick", None)
+        if tick is not None:
+
+            tick()
 
     def step(self):
         """Perform the daemon logic."""
@@ -0,0 +1,35 @@
+"""Standard interface for worker process supervision."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class SupervisorManager(object):
+
+    """Implementations of this mixin run the daemon in worker processes."""
+
+    def preload(self):
+        """Hook run once in the supervisor before any worker is forked.
+
+        Subclasses may extend this to import modules and build read only
+        state which every worker then shares with the supervisor.
+        """
+        return None
+
+    def spawn_worker(self, index):
+        """Fork a worker process to fill the given worker slot.
+
+        Like 'os.fork' this must return 0 in the new worker and the pid of
+        the worker in the supervisor.
+        """
+        raise NotImplementedError()
+
+    def supervise(self):
+        """Watch the workers until they have all exited.
+
+        Workers which crash must be replaced. This must return immediately
+        in any worker spawned while supervising.
+        """
+        raise NotImplementedError()
@@ -0,0 +1,27 @@
+"""Standard interface for detecting a daemon which has stopped progressing."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class WatchdogManager(object):
+
+    """Implementations of this mixin detect and replace hung daemons."""
+
+    def heartbeat(self):
+        """Record that the daemon is making progress.
+
+        Step daemons call this after every step. Daemons which implement
+        their own loop must call it regularly.
+        """
+        raise NotImplementedError()
+
+    def start_watchdog(self):
+        """Begin watching the heartbeat of the current process."""
+        raise NotImplementedError()
+
+    def hung(self, age):
+        """Handle a daemon whose last heartbeat was 'age' seconds ago."""
+        raise NotImplementedError()
@@ -0,0 +1 @@
+"""Implementations of the log manager interface."""
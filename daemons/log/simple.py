@@ -0,0 +1,226 @@
+"""Simple log manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import atexit
+import logging
+import logging.handlers
+import os
+import signal
+
+try:
+
+    import queue
+
+except ImportError:
+
+    import Queue as queue
+
+from ..interfaces import log
+
+
+LOG = logging.getLogger(__name__)
+
+POLICIES = ("drop", "block")
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+
+    """Queue handler which drops or waits when the queue is full."""
+
+    def __init__(self, records, block=False):
+        """Initialize the handler with the queue and the policy."""
+        logging.handlers.QueueHandler.__init__(self, records)
+        self.block = block
+        self.dropped = 0
+
+    def enqueue(self, record):
+        """Add a record to the queue unless it is full and may be dropped."""
+        if self.block:
+
+            self.queue.put(record)
+            return None
+
+        try:
+
+            self.queue.put_nowait(record)
+
+        except queue.Full:
+
+            self.dropped += 1
+
+
+class LogListener(logging.handlers.QueueListener):
+
+    """Queue listener which can stop while the queue is full."""
+
+    def enqueue_sentinel(self):
+        """Wait for room rather than fail to stop."""
+        self.queue.put(self._sentinel)
+
+
+class SimpleLogManager(log.LogManager):
+
+    """Log manager which writes records from a background thread.
+
+    This mixin must come before the other daemon bases. When the daemon
+    runs, the handlers of the root logger are moved behind a queue of at
+    most 'log_queue_size' records which a thread writes out. Logging then
+    never waits on a slow disk or network. When the queue is full a
+    'log_policy' of "drop" discards the record and counts it in
+    'log_dropped' while "block" waits for room. The records still waiting
+    are written when the process exits.
+
+    On 'reopen_signal' every log file, and the redirected standard streams,
+    are reopened at the next checkpoint so that the files may be rotated.
+    The signal handler itself only records the request since it may
+    interrupt a thread which holds a handler's lock. Daemons which implement
+    'run' rather than 'step' must call 'start_logging' themselves and call
+    'checkpoint' regularly for the files to be reopened.
+    """
+
+    reopen_signal = signal.SIGHUP
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the manager and register the reopen signal."""
+        self.log_queue_size = kwargs.pop("log_queue_size", 10000)
+        self.log_policy = kwargs.pop("log_policy", "drop")
+        if self.log_policy not in POLICIES:
+
+            raise ValueError(
+                "The log_policy must be one of {0}.".format(
+                    ", ".join(POLICIES)
+                )
+            )
+
+        self._log_pid = None
+        self._log_handlers = None
+        self._log_handler = None
+        self._log_listener = None
+        self._log_reopen = False
+
+        super(SimpleLogManager, self).__init__(*args, **kwargs)
+
+        self.handle(self.reopen_signal, self.request_reopen)
+
+    @property
+    def log_dropped(self):
+        """Get the number of records dropped because the queue was full."""
+        if self._log_handler is None:
+
+            return 0
+
+        return self._log_handler.dropped
+
+    def checkpoint(self):
+        """Reopen the log files if it has been asked for."""
+        if self._log_reopen:
+
+            self._log_reopen = False
+            self.reopen_logs()
+
+        super(SimpleLogManager, self).checkpoint()
+
+    def request_reopen(self):
+        """Reopen the log files at the next checkpoint."""
+        self._log_reopen = True
+        wakeup = getattr(self, "wakeup", None)
+        if wakeup is not None:
+
+            wakeup.set()
+
+    def run(self):
+        """Start logging from a thread before running the daemon."""
+        self.start_logging()
+        return super(SimpleLogManager, self).run()
+
+    def start_logging(self):
+        """Begin writing log records from a thread in the current process.
+
+        This does nothing if the process is already doing so.
+        """
+        if self._log_pid == os.getpid():
+
+            return None
+
+        root = logging.getLogger()
+        if self._log_handlers is None:
+
+            self._log_handlers = list(root.handlers)
+
+        if self._log_handler is not None:
+
+            # Inherited from the parent whose thread did not survive the fork.
+            root.removeHandler(self._log_handler)
+
+        for handler in self._log_handlers:
+
+            root.removeHandler(handler)
+
+        records = queue.Queue(self.log_queue_size)
+        self._log_handler = BoundedQueueHandler(
+            records, block=self.log_policy == "block"
+        )
+        self._log_listener = LogListener(
+            records, *self._log_handlers, respect_handler_level=True
+        )
+        self._log_listener.start()
+        root.addHandler(self._log_handler)
+        self._log_pid = os.getpid()
+        atexit.register(self.stop_logging)
+
+    def stop_logging(self):
+        """Write the records still waiting and restore the handlers."""
+        if self._log_pid != os.getpid():
+
+            return None
+
+        self._log_pid = None
+        root = logging.getLogger()
+        root.removeHandler(self._log_handler)
+        self._log_listener.stop()
+        for handler in self._log_handlers:
+
+            root.addHandler(handler)
+
+        if self._log_handler.dropped:
+
+            LOG.warning(
+                "Dropped {0} log records while the queue was full.".format(
+                    self._log_handler.dropped
+                )
+            )
+
+    def reopen_logs(self):
+        """Reopen the log files and standard streams after rotation."""
+        redirect = getattr(self, "redirect_stdio", None)
+        if redirect is not None:
+
+            redirect()
+
+        handlers = self._log_handlers
+        if handlers is None:
+
+            handlers = logging.getLogger().handlers
+
+        for handler in handlers:
+
+            if not isinstance(handler, logging.FileHandler):
+
+                continue
+
+            handler.acquire()
+            try:
+
+                # Handlers opened lazily open on their next record.
+                if handler.stream is not None:
+
+                    handler.stream.close()
+                    handler.stream = handler._open()
+
+            finally:
+
+                handler.release()
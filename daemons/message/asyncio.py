@@ -0,0 +1,407 @@
+"""Message manager implementation powered by asyncio.
+
+This module requires Python 3.5 or later.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import asyncio
+import logging
+
+from ..interfaces import message as message_iface
+
+
+LOG = logging.getLogger(__name__)
+
+current_task = getattr(asyncio, "current_task", None) or (
+    asyncio.Task.current_task
+)
+
+
+class AsyncioMessageManager(message_iface.MessageManager):
+
+    """MessageManager that uses an asyncio event loop for message dispatching.
+
+    Both 'get_message()' and 'handle_message()' must be coroutines. Every
+    call to 'step()' runs the event loop until one message has been fetched
+    and dispatched so handlers already in flight make progress while the
+    next message is being fetched. No more than 'pool_size' handlers run at
+    once.
+    """
+
+    _loop = None
+    _pool = None
+    # Slots to withhold from the pool after it was made smaller.
+    _pool_debt = 0
+
+    @property
+    def loop(self):
+        """Get the event loop used to run the daemon.
+
+        The loop is created on first use so that it is never shared across
+        the fork performed during daemonization.
+        """
+        if self._loop is None:
+
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._tasks = set()
+            self.attach_loop(self._loop)
+
+        return self._loop
+
+    def attach_loop(self, loop):
+        """Hook run once when the event loop is created."""
+        return None
+
+    @property
+    def pool(self):
+        """Get a semaphore which caps the number of running handlers."""
+        if self._pool is None:
+
+            # Older versions of asyncio bind the semaphore to the current
+            # loop when it is created so the daemon's loop must exist first.
+            self.loop
+            self._pool = asyncio.Semaphore(self.pool_size)
+
+        return self._pool
+
+    def resize_pool(self, size):
+        """Change the number of handlers which may run at once.
+
+        A smaller size takes effect as slots are next acquired or released.
+        """
+        change = size - self.pool_size
+        super(AsyncioMessageManager, self).resize_pool(size)
+        if self._pool is None:
+
+            return None
+
+        if change < 0:
+
+            self._pool_debt -= change
+            return None
+
+        repaid = min(change, self._pool_debt)
+        self._pool_debt -= repaid
+        for _ in range(change - repaid):
+
+            self._pool.release()
+
+    async def acquire_slot(self):
+        """Wait for a slot from the pool.
+
+        Slots acquired while the pool owes slots after being made smaller
+        are kept from the pool rather than used.
+        """
+        await self.pool.acquire()
+        while self._pool_debt > 0:
+
+            self._pool_debt -= 1
+            await self.pool.acquire()
+
+    def release_slot(self):
+        """Return a slot to the pool unless the pool has been made smaller."""
+        if self._pool_debt > 0:
+
+            self._pool_debt -= 1
+            return None
+
+        self.pool.release()
+
+    def dispatch(self, message):
+        """Schedule handle_message as a task on the event loop.
+
+        The caller must already hold a slot from the pool. It is released
+        when the handler completes.
+        """
+        self._spawn(self._handle(message))
+
+    def dispatch_batch(self, messages):
+        """Schedule handle_batch as a single task on the event loop.
+
+        The caller must already hold a slot from the pool. It is released
+        when the batch completes.
+        """
+        self._spawn(self._handle_batch(messages))
+
+    def _spawn(self, coro):
+        """Run a coroutine as a task and keep a reference until it ends."""
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, message):
+        """Run handle_message and release its pool slot."""
+        await self._consume(
+            self.handle_message, message, 1, self.timeout_for(message)
+        )
+
+    async def _handle_batch(self, messages):
+        """Run handle_batch and release its pool slot."""
+        await self._consume(
+            self.handle_batch,
+            messages,
+            len(messages),
+            self.batch_timeout(messages),
+        )
+
+    async def _consume(self, handler, payload, count, timeout=None):
+        """Await a handler for dispatched work and record the outcome.
+
+        The handler is cancelled if it runs for longer than 'timeout'.
+        """
+        started = self.loop.time()
+        failed = True
+        expired = []
+        timer = None
+        if timeout is not None:
+
+            task = current_task()
+
+            def expire():
+
+                expired.append(True)
+                task.cancel()
+
+            timer = self.loop.call_later(timeout, expire)
+
+        try:
+
+            await handler(payload)
+            failed = False
+
+        except asyncio.CancelledError:
+
+            if not expired:
+
+                raise
+
+            uncancel = getattr(task, "uncancel", None)
+            if uncancel is not None:
+
+                uncancel()
+
+        except Exception:
+
+            LOG.exception("Uncaught exception in {0}().".format(
+                handler.__name__
+            ))
+
+        finally:
+
+            if timer is not None:
+
+                timer.cancel()
+
+            self.release_slot()
+            self.record_latency(
+                handler.__name__, self.loop.time() - started, failed
+            )
+
+        if expired:
+
+            self.record_timeout(payload, count)
+            return None
+
+        self.record_outcome(count, failed=failed)
+
+    async def measure_async(self, name, coro):
+        """Await a coroutine and record its duration as 'name'."""
+        if self.metrics is None:
+
+            return await coro
+
+        started = self.loop.time()
+        try:
+
+            return await coro
+
+        finally:
+
+            self.metrics.timing(name, self.loop.time() - started)
+
+    def wait_drained(self, timeout):
+        """Run the loop for up to 'timeout' seconds until handlers finish.
+
+        This must not be called while the loop is running. Use
+        'drain_async()' from within the loop instead.
+        """
+        if self._loop is None:
+
+            return True
+
+        return self.loop.run_until_complete(self.wait_drained_async(timeout))
+
+    async def wait_drained_async(self, timeout):
+        """Wait up to 'timeout' seconds for handlers to finish.
+
+        Handlers still running after that are cancelled.
+        """
+        if not self._tasks:
+
+            return True
+
+        _, pending = await asyncio.wait(list(self._tasks), timeout=timeout)
+        for task in pending:
+
+            task.cancel()
+
+        return not pending
+
+    async def drain_async(self, timeout=None):
+        """Stop fetching messages and wait for dispatched ones to finish.
+
+        This is the coroutine equivalent of 'drain()'.
+        """
+        if self.draining:
+
+            return self.messages_abandoned == 0
+
+        self.draining = True
+        if timeout is None:
+
+            timeout = self.drain_timeout
+
+        return self.drained(await self.wait_drained_async(timeout))
+
+    def step(self):
+        """Run the event loop for one iteration of the message loop."""
+        self.loop.run_until_complete(self.step_async())
+
+    async def step_async(self):
+        """Grab a new message and dispatch it to the handler."""
+        if self.draining:
+
+            await self.idle_async(self.idle_time)
+            return None
+
+        self.autoscale()
+        await self.acquire_slot()
+        try:
+
+            if self.batch_size > 1:
+
+                messages = await self.measure_async(
+                    "get_message", self.get_messages(self.batch_size)
+                )
+
+            else:
+
+                message = await self.measure_async(
+                    "get_message", self.get_message()
+                )
+                messages = None if message is None else [message]
+
+        except BaseException:
+
+            self.release_slot()
+            raise
+
+        if not messages:
+
+            self.release_slot()
+            await self.measure_async(
+                "idle", self.idle_async(self.idle_delay())
+            )
+            return None
+
+        self.idle_reset()
+        self.record_dispatch(len(messages))
+        if self.batch_size > 1:
+
+            self.dispatch_batch(messages)
+
+        else:
+
+            self.dispatch(messages[0])
+
+        # Yield to the loop so the new handler can start before the next
+        # message is fetched.
+        await asyncio.sleep(0)
+
+    async def idle_async(self, seconds):
+        """Wait for up to 'seconds' or until the wakeup is set.
+
+        A value of None waits until the wakeup is set.
+        """
+        if self.wakeup is None:
+
+            await asyncio.sleep(seconds)
+            return None
+
+        woken = self.loop.create_future()
+        fd = self.wakeup.fileno()
+        self.loop.add_reader(fd, lambda: woken.done() or woken.set_result(1))
+        try:
+
+            await asyncio.wait([woken], timeout=seconds)
+
+        finally:
+
+            self.loop.remove_reader(fd)
+            self.wakeup.clear()
+
+    async def get_message(self):
+        """Get a message from some source.
+
+        This is a coroutine. Otherwise it carries the same contract as the
+        synchronous 'get_message()'.
+        """
+        raise NotImplementedError()
+
+    async def get_messages(self, max_batch):
+        """Get up to 'max_batch' messages from some source.
+
+        This is a coroutine. Otherwise it carries the same contract as the
+        synchronous 'get_messages()'.
+        """
+        messages = []
+        deadline = None
+        while len(messages) < max_batch:
+
+            message = await self.get_message()
+            if message is not None:
+
+                messages.append(message)
+                if deadline is None:
+
+                    deadline = self.loop.time() + self.batch_linger
+
+                continue
+
+            if not messages:
+
+                break
+
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+
+                break
+
+            await asyncio.sleep(min(remaining, self.idle_time))
+
+        return messages
+
+    async def handle_message(self, message):
+        """Do something with a message."""
+        raise NotImplementedError()
+
+    async def handle_batch(self, messages):
+        """Do something with a batch of messages.
+
+        The default implementation awaits 'handle_message()' for each
+        message in turn.
+        """
+        for message in messages:
+
+            try:
+
+                await self.handle_message(message)
+
+            except Exception:
+
+                LOG.exception("Uncaught exception in handle_message().")
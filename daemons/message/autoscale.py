@@ -0,0 +1,138 @@
+"""Pool controllers which size the message pool to match the load."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
+class AIMDController(object):
+
+    """Size the pool with additive increase and multiplicative decrease.
+
+    Every 'interval' seconds the controller looks at the handlers which
+    finished since its last decision. The pool is multiplied by 'decrease'
+    if more than 'max_error_rate' of them failed or their mean latency was
+    over the latency limit. Otherwise the pool grows by 'increase' if every
+    slot was in use at some point. The size always stays between 'min_size'
+    and 'max_size'.
+
+    The latency limit is 'target_latency' if one is given. Otherwise it is
+    'tolerance' times the baseline latency. The baseline is the lowest mean
+    latency seen and creeps towards higher means by 'baseline_drift' so that
+    the controller adjusts when handlers become slower for good.
+    """
+
+    def __init__(
+        self,
+        min_size=1,
+        max_size=1000,
+        interval=1.0,
+        increase=1,
+        decrease=0.75,
+        target_latency=None,
+        tolerance=2.0,
+        max_error_rate=0.05,
+        baseline_drift=0.01,
+    ):
+        """Initialize the controller with its limits."""
+        self.min_size = max(1, min_size)
+        self.max_size = max_size
+        self.interval = interval
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.tolerance = tolerance
+        self.max_error_rate = max_error_rate
+        self.baseline_drift = baseline_drift
+        self.baseline = None
+        self._lock = threading.Lock()
+        self._decided = None
+        self._reset()
+
+    def record(self, seconds, failed=False):
+        """Note that a handler finished after 'seconds'.
+
+        This may be called from any thread.
+        """
+        with self._lock:
+
+            self._finished += 1
+            self._failed += 1 if failed else 0
+            self._latency += seconds
+
+    def sample(self, inflight):
+        """Note the number of messages in flight."""
+        with self._lock:
+
+            self._peak = max(self._peak, inflight)
+
+    def resize(self, size, now=None):
+        """Get the pool size to use in place of 'size'."""
+        now = monotonic() if now is None else now
+        if self._decided is None:
+
+            self._decided = now
+            return self.clamp(size)
+
+        if now - self._decided < self.interval:
+
+            return size
+
+        with self._lock:
+
+            finished, failed = self._finished, self._failed
+            latency, peak = self._latency, self._peak
+            self._reset()
+
+        self._decided = now
+        if not finished:
+
+            return self.clamp(size)
+
+        mean = latency / finished
+        if (
+            failed / finished > self.max_error_rate
+            or mean > self.latency_limit(mean)
+        ):
+
+            return self.clamp(int(size * self.decrease))
+
+        if peak >= size:
+
+            return self.clamp(size + self.increase)
+
+        return self.clamp(size)
+
+    def latency_limit(self, mean):
+        """Update the baseline with a mean latency and get the limit."""
+        if self.target_latency is not None:
+
+            return self.target_latency
+
+        if self.baseline is None or mean < self.baseline:
+
+            self.baseline = mean
+
+        else:
+
+            self.baseline += (mean - self.baseline) * self.baseline_drift
+
+        return self.baseline * self.tolerance
+
+    def clamp(self, size):
+        """Keep a size between the minimum and maximum."""
+        return max(self.min_size, min(self.max_size, size))
+
+    def _reset(self):
+        """Forget the measurements taken since the last decision."""
+        self._finished = 0
+        self._failed = 0
+        self._latency = 0.0
+        self._peak = 0
@@ -6,20 +6,102 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import eventlet
+from eventlet.green import select as green_select
 
 from ..interfaces import message
+from . import idle
 
 
-class EventletMessageManager(message.MessageManager):
+class EventletMessageManager(idle.ShutdownWakeup, message.MessageManager):
 
     """MessageManager that uses eventlet for message dispatching."""
 
+    _pool = None
+    # Green threads waiting for permits to keep from the pool after it was
+    # made smaller.
+    _withholders = None
+    sleep = staticmethod(eventlet.sleep)
+    Timeout = eventlet.Timeout
+    select = staticmethod(green_select.select)
+
     @property
     def pool(self):
         """Get an eventlet pool used to dispatch requests."""
-        self._pool = self._pool or eventlet.GreenPool(size=self.pool_size)
+        if self._pool is None:
+
+            self._pool = eventlet.GreenPool(size=self.pool_size)
+            self._withholders = []
+
         return self._pool
 
+    def resize_pool(self, size):
+        """Change the number of green threads which may run at once.
+
+        GreenPool.resize() does not wake green threads waiting for a slot so
+        slots are instead taken away by holding permits of the pool's
+        semaphore, waiting in a green thread for any which are in use, and
+        given back by releasing them.
+        """
+        change = size - self.pool_size
+        super(EventletMessageManager, self).resize_pool(size)
+        if self._pool is None:
+
+            return None
+
+        self._pool.size = size
+        semaphore = self._pool.sem
+        while change < 0:
+
+            change += 1
+            if not semaphore.acquire(blocking=False):
+
+                withholder = eventlet.spawn(self._withhold, semaphore)
+                self._withholders.append(withholder)
+
+        while change > 0:
+
+            change -= 1
+            if self._withholders:
+
+                # Withholders still in the list are waiting without a permit.
+                self._withholders.pop().kill()
+                continue
+
+            semaphore.release()
+
+    def _withhold(self, semaphore):
+        """Wait for a permit and keep it from the pool."""
+        semaphore.acquire()
+        self._withholders.remove(eventlet.getcurrent())
+
     def dispatch(self, message):
         """Execute handle_message within a context from the pool."""
-        self.pool.spawn_n(self.handle_message, message)
+        self.pool.spawn_n(
+            self.consume,
+            self.handle_message,
+            message,
+            1,
+            self.timeout_for(message),
+        )
+
+    def dispatch_batch(self, messages):
+        """Execute handle_batch within a single context from the pool."""
+        self.pool.spawn_n(
+            self.consume,
+            self.handle_batch,
+            messages,
+            len(messages),
+            self.batch_timeout(messages),
+        )
+
+    def wait_drained(self, timeout):
+        """Wait up to 'timeout' seconds for the pool to empty."""
+        if self._pool is None:
+
+            return True
+
+        with eventlet.Timeout(timeout, False):
+
+            self._pool.waitall()
+
+        return self._pool.running() == 0
@@ -0,0 +1,318 @@
+"""Message manager implementations powered by concurrent.futures."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from concurrent import futures
+import functools
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+
+from ..interfaces import message
+
+
+LOG = logging.getLogger(__name__)
+
+# The daemon instance whose handle_message is run by process pool workers.
+# Workers are forked from the daemon so they inherit this reference rather
+# than having to pickle the daemon for every message.
+_DAEMON = None
+
+
+def _handle(message):
+    """Run handle_message for the daemon that forked this worker."""
+    return _DAEMON.run_handler(_DAEMON.handle_message, message)
+
+
+def _handle_batch(messages):
+    """Run handle_batch for the daemon that forked this worker."""
+    return _DAEMON.run_handler(_DAEMON.handle_batch, messages)
+
+
+def _init_worker():
+    """Restore default signal handling in a process pool worker.
+
+    Workers inherit the daemon's handlers. Left in place, a signal delivered
+    to a worker would run the daemon's shutdown logic and remove its pidfile.
+    """
+    signums = set(getattr(_DAEMON, "kill_signals", ()))
+    signums.update(getattr(_DAEMON, "_handlers", {}).keys())
+    for signum in signums:
+
+        signal.signal(signum, signal.SIG_DFL)
+
+
+class ExecutorMessageManager(message.MessageManager):
+
+    """MessageManager that dispatches messages to a futures executor.
+
+    No more than 'max_pending' messages are in flight at any time. Once that
+    limit is reached 'step()' blocks until a message finishes rather than
+    calling 'get_message()'. The limit defaults to twice the pool_size so
+    that workers always have a message waiting when they finish one.
+    """
+
+    _pool = None
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the daemon with a max_pending limit."""
+        self.max_pending = kwargs.pop("max_pending", None)
+        self._inflight = 0
+        self._capacity = threading.Condition()
+
+        super(ExecutorMessageManager, self).__init__(*args, **kwargs)
+
+    @property
+    def pending_limit(self):
+        """Get the maximum number of messages allowed in flight."""
+        return self.max_pending or self.pool_size * 2
+
+    @property
+    def pool(self):
+        """Get an executor used to dispatch requests."""
+        if self._pool is None:
+
+            self._pool = self.create_pool()
+
+        return self._pool
+
+    def create_pool(self):
+        """Create the executor backing the pool."""
+        raise NotImplementedError()
+
+    def resize_pool(self, size):
+        """Change the pool_size and with it the default 'pending_limit'."""
+        super(ExecutorMessageManager, self).resize_pool(size)
+        with self._capacity:
+
+            self._capacity.notify_all()
+
+    def submit(self, message):
+        """Submit handle_message for the message to the executor."""
+        raise NotImplementedError()
+
+    def submit_batch(self, messages):
+        """Submit handle_batch for the messages to the executor."""
+        raise NotImplementedError()
+
+    def wait_available(self):
+        """Block until fewer than 'pending_limit' messages are in flight."""
+        with self._capacity:
+
+            while self._inflight >= self.pending_limit:
+
+                self._capacity.wait()
+
+    def dispatch(self, message):
+        """Execute handle_message within a context from the pool."""
+        self._acquire()
+        self.submit(message).add_done_callback(
+            functools.partial(self._release, 1)
+        )
+
+    def dispatch_batch(self, messages):
+        """Execute handle_batch within a single context from the pool.
+
+        A batch occupies a single slot of the 'max_pending' limit.
+        """
+        self._acquire()
+        self.submit_batch(messages).add_done_callback(
+            functools.partial(self._release, len(messages))
+        )
+
+    def wait_drained(self, timeout):
+        """Wait up to 'timeout' seconds for in flight messages to finish.
+
+        Messages which have not started by then are cancelled.
+        """
+        deadline = time.time() + timeout
+        with self._capacity:
+
+            while self._inflight:
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+
+                    break
+
+                self._capacity.wait(remaining)
+
+            drained = self._inflight == 0
+
+        if not drained:
+
+            self.abandon()
+
+        return drained
+
+    def abandon(self):
+        """Give up on messages still in the pool.
+
+        Messages which have not started are cancelled. Those already being
+        handled cannot be interrupted.
+        """
+        if sys.version_info >= (3, 9):
+
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            return None
+
+        self.pool.shutdown(wait=False)
+
+    def _acquire(self):
+        """Take a slot for a unit of work about to be submitted."""
+        with self._capacity:
+
+            self._inflight += 1
+
+    def _release(self, count, future):
+        """Free the slot held by a finished unit of work."""
+        with self._capacity:
+
+            self._inflight -= 1
+            self._capacity.notify_all()
+
+
+class ThreadPoolMessageManager(ExecutorMessageManager):
+
+    """MessageManager that uses a pool of threads for message dispatching.
+
+    The executor is created with 'max_pool_size' threads, which defaults to
+    the 'max_size' of the pool_controller if there is one and otherwise to
+    the pool_size. No more than pool_size of them handle messages at once
+    so the pool may be resized up to that ceiling while it runs.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the daemon with a max_pool_size."""
+        self.max_pool_size = kwargs.pop("max_pool_size", None)
+        self._running = 0
+        self._slots = threading.Condition()
+
+        super(ThreadPoolMessageManager, self).__init__(*args, **kwargs)
+
+        if self.max_pool_size is None:
+
+            self.max_pool_size = max(
+                self.pool_size,
+                getattr(self.pool_controller, "max_size", 0),
+            )
+
+    def create_pool(self):
+        """Create a thread pool with max_pool_size threads."""
+        return futures.ThreadPoolExecutor(
+            max_workers=max(self.pool_size, self.max_pool_size)
+        )
+
+    def resize_pool(self, size):
+        """Change the number of threads which may handle messages.
+
+        A smaller size takes effect as running handlers finish. Sizes above
+        the 'max_pool_size' only raise the 'pending_limit'.
+        """
+        super(ThreadPoolMessageManager, self).resize_pool(size)
+        with self._slots:
+
+            self._slots.notify_all()
+
+    def run_handler(self, handler, payload, timeout=None):
+        """Wait for one of the pool_size slots and run the handler in it."""
+        with self._slots:
+
+            while self._running >= self.pool_size:
+
+                self._slots.wait()
+
+            self._running += 1
+
+        try:
+
+            return super(ThreadPoolMessageManager, self).run_handler(
+                handler, payload, timeout
+            )
+
+        finally:
+
+            with self._slots:
+
+                self._running -= 1
+                self._slots.notify()
+
+    def submit(self, message):
+        """Submit handle_message for the message to the thread pool."""
+        return self.pool.submit(self.consume, self.handle_message, message, 1)
+
+    def submit_batch(self, messages):
+        """Submit handle_batch for the messages to the thread pool."""
+        return self.pool.submit(
+            self.consume, self.handle_batch, messages, len(messages)
+        )
+
+
+class ProcessPoolMessageManager(ExecutorMessageManager):
+
+    """MessageManager that uses a pool of processes for message dispatching.
+
+    Each message is handled in a worker process forked from the daemon so
+    messages must be picklable. The pool_size defaults to the number of CPUs
+    rather than the usual 100. Once the pool exists resizing it changes only
+    the 'pending_limit' and not the number of worker processes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the daemon with a pool_size defaulting to CPU count."""
+        kwargs.setdefault("pool_size", multiprocessing.cpu_count())
+
+        super(ProcessPoolMessageManager, self).__init__(*args, **kwargs)
+
+    def create_pool(self):
+        """Create a process pool sized by pool_size."""
+        global _DAEMON
+        _DAEMON = self
+
+        options = {"max_workers": self.pool_size}
+        if sys.version_info >= (3, 7):
+
+            options["mp_context"] = multiprocessing.get_context("fork")
+            options["initializer"] = _init_worker
+
+        return futures.ProcessPoolExecutor(**options)
+
+    def submit(self, message):
+        """Submit handle_message for the message to the process pool."""
+        return self.pool.submit(_handle, message)
+
+    def submit_batch(self, messages):
+        """Submit handle_batch for the messages to the process pool."""
+        return self.pool.submit(_handle_batch, messages)
+
+    def abandon(self):
+        """Give up on messages still in the pool.
+
+        Messages which have not started are cancelled and the worker
+        processes handling the rest are terminated.
+        """
+        processes = getattr(self.pool, "_processes", None) or {}
+        processes = list(processes.values())
+        super(ProcessPoolMessageManager, self).abandon()
+        for process in processes:
+
+            process.terminate()
+
+    def _release(self, count, future):
+        """Record the outcome reported by the worker and free the slot.
+
+        Workers are separate processes so the outcome is recorded here
+        rather than by the worker.
+        """
+        if not future.cancelled():
+
+            failed = future.exception() is not None or not future.result()
+            self.record_outcome(count, failed=failed)
+
+        super(ProcessPoolMessageManager, self)._release(count, future)
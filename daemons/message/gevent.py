@@ -6,20 +6,98 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import gevent
+import gevent.pool
+import gevent.select
 
 from ..interfaces import message
+from . import idle
 
 
-class GeventMessageManager(message.MessageManager):
+class GeventMessageManager(idle.ShutdownWakeup, message.MessageManager):
 
     """MessageManager that uses gevent for message dispatching."""
 
+    _pool = None
+    # Greenlets waiting for permits to keep from the pool after it was made
+    # smaller.
+    _withholders = None
+    sleep = staticmethod(gevent.sleep)
+    Timeout = gevent.Timeout
+    select = staticmethod(gevent.select.select)
+
     @property
     def pool(self):
         """Get an gevent pool used to dispatch requests."""
-        self._pool = self._pool or gevent.pool.Pool(size=self.pool_size)
+        if self._pool is None:
+
+            self._pool = gevent.pool.Pool(size=self.pool_size)
+            self._withholders = []
+
         return self._pool
 
+    def resize_pool(self, size):
+        """Change the number of greenlets which may run at once.
+
+        Slots are taken away by holding permits of the pool's semaphore,
+        waiting in a greenlet for any which are in use, and given back by
+        releasing them.
+        """
+        change = size - self.pool_size
+        super(GeventMessageManager, self).resize_pool(size)
+        if self._pool is None:
+
+            return None
+
+        self._pool.size = size
+        semaphore = self._pool._semaphore
+        while change < 0:
+
+            change += 1
+            if not semaphore.acquire(blocking=False):
+
+                withholder = gevent.spawn(self._withhold, semaphore)
+                self._withholders.append(withholder)
+
+        while change > 0:
+
+            change -= 1
+            if self._withholders:
+
+                # Withholders still in the list are waiting without a permit.
+                self._withholders.pop().kill()
+                continue
+
+            semaphore.release()
+
+    def _withhold(self, semaphore):
+        """Wait for a permit and keep it from the pool."""
+        semaphore.acquire()
+        self._withholders.remove(gevent.getcurrent())
+
     def dispatch(self, message):
         """Execute handle_message within a context from the pool."""
-        self.pool.spawn(self.handle_message, message)
+        self.pool.spawn(
+            self.consume,
+            self.handle_message,
+            message,
+            1,
+            self.timeout_for(message),
+        )
+
+    def dispatch_batch(self, messages):
+        """Execute handle_batch within a single context from the pool."""
+        self.pool.spawn(
+            self.consume,
+            self.handle_batch,
+            messages,
+            len(messages),
+            self.batch_timeout(messages),
+        )
+
+    def wait_drained(self, timeout):
+        """Wait up to 'timeout' seconds for the pool to empty."""
+        if self._pool is None:
+
+            return True
+
+        return self._pool.join(timeout=timeout)
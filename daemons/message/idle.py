@@ -0,0 +1,149 @@
+"""Idle strategies and wakeups for message managers."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import errno
+import fcntl
+import os
+import random
+
+
+class FixedIdle(object):
+
+    """Idle strategy which always waits for the manager's idle_time."""
+
+    def delay(self, idle_time):
+        """Get the number of seconds to wait after an empty poll."""
+        return idle_time
+
+    def reset(self):
+        """Forget any previous empty polls."""
+        return None
+
+
+class BackoffIdle(object):
+
+    """Idle strategy which backs off exponentially while the source is empty.
+
+    The first empty poll waits for the manager's idle_time, or 'minimum'
+    seconds if that is longer or the idle_time is zero or None. Every
+    following empty poll multiplies the wait by 'factor' up to 'maximum'
+    seconds. Each wait is reduced by a random amount of up to 'jitter' times
+    its length so that a fleet of idle daemons does not poll in lockstep.
+    The wait starts over as soon as a message arrives.
+    """
+
+    def __init__(self, maximum=2.0, factor=2.0, jitter=0.5, minimum=0.01):
+        """Initialize the strategy with its growth and jitter settings."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self._current = None
+
+    def delay(self, idle_time):
+        """Get the number of seconds to wait after an empty poll."""
+        if self._current is None:
+
+            self._current = max(idle_time or 0, self.minimum)
+
+        else:
+
+            self._current = min(self.maximum, self._current * self.factor)
+
+        return self._current * (1 - self.jitter * random.random())
+
+    def reset(self):
+        """Forget any previous empty polls."""
+        self._current = None
+
+
+class Wakeup(object):
+
+    """Self-pipe which ends an idle wait as soon as work may be available.
+
+    Message managers given a wakeup wait on it rather than sleeping when
+    idle. Anything that knows a message has arrived, such as a consumer
+    thread or a callback from a client library, calls 'set()' to end the
+    wait early. The manager's idle_time may then be None to wait until
+    woken with no polling at all.
+    """
+
+    def __init__(self):
+        """Create the pipe backing the wakeup."""
+        self._read, self._write = os.pipe()
+        for fd in (self._read, self._write):
+
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            flags = fcntl.fcntl(fd, fcntl.F_GETFD)
+            fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
+
+    def fileno(self):
+        """Get the descriptor which becomes readable once set."""
+        return self._read
+
+    def set(self):
+        """Wake any waiter. Safe to call from threads and signal handlers."""
+        try:
+
+            os.write(self._write, b"\0")
+
+        except OSError as err:
+
+            # A full pipe already guarantees the waiter will wake.
+            if err.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+
+                raise
+
+    def clear(self):
+        """Consume all pending wakeups."""
+        try:
+
+            while os.read(self._read, 4096):
+
+                continue
+
+        except OSError as err:
+
+            if err.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+
+                raise
+
+    def close(self):
+        """Close both ends of the pipe."""
+        os.close(self._read)
+        os.close(self._write)
+
+
+class ShutdownWakeup(object):
+
+    """Mixin which defers shutdown signals to a message manager's loop.
+
+    This mixin must come before the message manager. A shutdown signal
+    only sets a self-pipe, which ends an idle wait, and the next step shuts
+    down. Each process gets its own pipe so that forked workers do not shut
+    down on each other's signals.
+    """
+
+    defer_shutdown_signals = True
+    _shutdown_pid = None
+    _shutdown_pipe = None
+
+    @property
+    def shutdown_wakeup(self):
+        """Get the self-pipe which becomes readable when a shutdown is due."""
+        if self._shutdown_pid != os.getpid():
+
+            if self._shutdown_pipe is not None:
+
+                self._shutdown_pipe.close()
+
+            self._shutdown_pipe = Wakeup()
+            self._shutdown_pid = os.getpid()
+            self._shutdown_signum = None
+
+        return self._shutdown_pipe
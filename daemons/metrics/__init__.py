@@ -0,0 +1 @@
+"""Implementations of the metrics sink interface."""
@@ -0,0 +1,148 @@
+"""Metrics sink which keeps every measurement in memory."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import bisect
+import threading
+import time
+
+from ..interfaces import metrics
+
+
+monotonic = getattr(time, "monotonic", time.time)
+
+# Upper bounds, in seconds, of the histogram buckets used for timings.
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram(object):
+
+    """Cumulative histogram of durations with fixed bucket bounds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize an empty histogram with the given bucket bounds."""
+        self.buckets = tuple(buckets)
+        # The final count is for values above the largest bound.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Add a value to the histogram."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Get (bound, count) pairs of values less than or equal to bound.
+
+        The final pair has a bound of infinity and counts every value.
+        """
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+
+            total += count
+            pairs.append((bound, total))
+
+        return pairs
+
+    def quantile(self, q):
+        """Estimate the value below which a fraction 'q' of values fall.
+
+        The estimate is the upper bound of the bucket holding the quantile
+        which is accurate to within the bucket width.
+        """
+        if not self.count:
+
+            return None
+
+        rank = q * self.count
+        for bound, total in self.cumulative():
+
+            if total >= rank:
+
+                return bound
+
+
+class MemoryMetrics(metrics.MetricsSink):
+
+    """Sink which aggregates counters, gauges, and timings in memory.
+
+    Timings are kept as histograms so the cost of recording one does not
+    grow with the number recorded.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize an empty sink with the histogram bucket bounds."""
+        self.buckets = buckets
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = monotonic()
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        """Add 'value' to a counter."""
+        with self._lock:
+
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        """Set a gauge to 'value'."""
+        self.gauges[name] = value
+
+    def timing(self, name, seconds):
+        """Record a duration of 'seconds'."""
+        with self._lock:
+
+            histogram = self.histograms.get(name)
+            if histogram is None:
+
+                histogram = self.histograms[name] = Histogram(self.buckets)
+
+            histogram.observe(seconds)
+
+    def rate(self, name):
+        """Get the average per second rate of a counter since creation."""
+        elapsed = monotonic() - self.started
+        if elapsed <= 0:
+
+            return 0.0
+
+        return self.counters.get(name, 0) / elapsed
+
+    def idle_ratio(self):
+        """Get the fraction of time spent in 'step()' which was idle."""
+        step = self.histograms.get("step")
+        idle = self.histograms.get("idle")
+        if step is None or not step.sum or idle is None:
+
+            return 0.0
+
+        return min(idle.sum / step.sum, 1.0)
+
+    def snapshot(self):
+        """Get a copy of every measurement as plain data."""
+        with self._lock:
+
+            return {
+                "uptime": monotonic() - self.started,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timings": dict(
+                    (name, {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "p50": histogram.quantile(0.5),
+                        "p99": histogram.quantile(0.99),
+                    })
+                    for name, histogram in self.histograms.items()
+                ),
+            }
@@ -0,0 +1,190 @@
+"""Metrics sink which serves the Prometheus text format over HTTP."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import re
+import socket
+import threading
+
+try:
+
+    import socketserver
+
+except ImportError:
+
+    import SocketServer as socketserver
+
+from . import memory
+
+
+LOG = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def metric_name(prefix, name):
+    """Convert a dotted metric name into a valid Prometheus name."""
+    return _INVALID.sub("_", prefix + name)
+
+
+def _format(value):
+    """Format a sample value."""
+    if value == float("inf"):
+
+        return "+Inf"
+
+    return repr(float(value))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    """Answer any request with the current metrics."""
+
+    def handle(self):
+        """Read the request headers and write the metrics."""
+        while self.rfile.readline().strip():
+
+            pass
+
+        body = self.server.sink.render().encode("utf-8")
+        self.wfile.write(
+            "HTTP/1.0 200 OK\r\n"
+            "Content-Type: {0}\r\n"
+            "Content-Length: {1}\r\n"
+            "\r\n".format(CONTENT_TYPE, len(body)).encode("ascii")
+        )
+        self.wfile.write(body)
+
+
+class _TCPServer(socketserver.TCPServer):
+
+    allow_reuse_address = True
+
+
+class PrometheusMetrics(memory.MemoryMetrics):
+
+    """Sink which serves in memory metrics for Prometheus to scrape.
+
+    The 'address' is either a (host, port) pair or the path of a unix
+    socket. The server runs in a background thread which is started by the
+    first measurement so that it is created after daemonization. Every
+    process forked after that point, such as process pool workers, records
+    into its own copy of the sink which is never served.
+    """
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 9464),
+        prefix="daemons_",
+        buckets=memory.DEFAULT_BUCKETS,
+    ):
+        """Initialize the sink with the address to serve metrics on."""
+        super(PrometheusMetrics, self).__init__(buckets=buckets)
+        self.address = address
+        self.prefix = prefix
+        self._server = None
+
+    def increment(self, name, value=1):
+        """Add 'value' to a counter."""
+        if self._server is None:
+
+            self.serve()
+
+        super(PrometheusMetrics, self).increment(name, value)
+
+    def gauge(self, name, value):
+        """Set a gauge to 'value'."""
+        if self._server is None:
+
+            self.serve()
+
+        super(PrometheusMetrics, self).gauge(name, value)
+
+    def timing(self, name, seconds):
+        """Record a duration of 'seconds'."""
+        if self._server is None:
+
+            self.serve()
+
+        super(PrometheusMetrics, self).timing(name, seconds)
+
+    def serve(self):
+        """Start serving metrics in a background thread.
+
+        A failure to bind the address is logged and not retried.
+        """
+        if self._server is not None:
+
+            return self._server
+
+        server_class = _TCPServer
+        if not isinstance(self.address, tuple):
+
+            server_class = socketserver.UnixStreamServer
+
+        try:
+
+            self._server = server_class(self.address, _Handler)
+
+        except (IOError, OSError, socket.error):
+
+            LOG.exception(
+                "Failed to serve metrics on {0}.".format(self.address)
+            )
+            self._server = False
+            return self._server
+
+        self._server.sink = self
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self._server
+
+    def close(self):
+        """Stop serving metrics."""
+        if self._server:
+
+            self._server.shutdown()
+            self._server.server_close()
+
+        self._server = None
+
+    def render(self):
+        """Get every measurement in the Prometheus text format."""
+        lines = []
+        with self._lock:
+
+            for name, value in sorted(self.counters.items()):
+
+                name = metric_name(self.prefix, name) + "_total"
+                lines.append("# TYPE {0} counter".format(name))
+                lines.append("{0} {1}".format(name, _format(value)))
+
+            for name, value in sorted(self.gauges.items()):
+
+                name = metric_name(self.prefix, name)
+                lines.append("# TYPE {0} gauge".format(name))
+                lines.append("{0} {1}".format(name, _format(value)))
+
+            for name, histogram in sorted(self.histograms.items()):
+
+                name = metric_name(self.prefix, name) + "_seconds"
+                lines.append("# TYPE {0} histogram".format(name))
+                for bound, total in histogram.cumulative():
+
+                    lines.append('{0}_bucket{{le="{1}"}} {2}'.format(
+                        name, _format(bound), total
+                    ))
+
+                lines.append("{0}_sum {1}".format(
+                    name, _format(histogram.sum)
+                ))
+                lines.append("{0}_count {1}".format(name, histogram.count))
+
+        return "\n".join(lines) + "\n"
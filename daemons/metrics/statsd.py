@@ -0,0 +1,124 @@
+"""Metrics sink which emits the StatsD protocol over UDP."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import socket
+import threading
+import time
+
+from ..interfaces import metrics
+
+
+monotonic = getattr(time, "monotonic", time.time)
+
+# Largest payload which fits in a single packet on common networks.
+MAX_PACKET = 1432
+
+
+class StatsdMetrics(metrics.MetricsSink):
+
+    """Sink which sends measurements to a StatsD compatible server.
+
+    Measurements are buffered and sent together once the buffer would grow
+    larger than 'max_packet' bytes or 'flush_interval' seconds have passed
+    since the last send. The interval is checked as measurements arrive and
+    between steps, so an idle daemon still sends its last measurements, and
+    the buffer is sent when the daemon shuts down. Sending never blocks and
+    errors are ignored so an unavailable server cannot slow down the daemon.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8125,
+        prefix="daemons",
+        max_packet=MAX_PACKET,
+        flush_interval=1.0,
+    ):
+        """Initialize the sink with the address of the StatsD server."""
+        self.address = (host, port)
+        self.prefix = prefix + "." if prefix else ""
+        self.max_packet = max_packet
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._size = 0
+        self._flushed = monotonic()
+        self._lock = threading.Lock()
+        self._socket = None
+        self._pid = None
+
+    @property
+    def transport(self):
+        """Get a non-blocking UDP socket owned by the current process."""
+        if self._pid != os.getpid():
+
+            family = socket.getaddrinfo(*self.address)[0][0]
+            self._socket = socket.socket(family, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+            self._pid = os.getpid()
+
+        return self._socket
+
+    def increment(self, name, value=1):
+        """Add 'value' to a counter."""
+        self.send("{0}{1}:{2}|c".format(self.prefix, name, value))
+
+    def gauge(self, name, value):
+        """Set a gauge to 'value'."""
+        self.send("{0}{1}:{2}|g".format(self.prefix, name, value))
+
+    def timing(self, name, seconds):
+        """Record a duration of 'seconds'."""
+        self.send(
+            "{0}{1}:{2:.3f}|ms".format(self.prefix, name, seconds * 1000)
+        )
+
+    def send(self, line):
+        """Buffer a line of the StatsD protocol and flush if needed."""
+        with self._lock:
+
+            if self._size + len(line) + 1 > self.max_packet:
+
+                self._flush()
+
+            self._buffer.append(line)
+            self._size += len(line) + 1
+            if monotonic() - self._flushed >= self.flush_interval:
+
+                self._flush()
+
+    def tick(self):
+        """Send the buffer if 'flush_interval' seconds have passed."""
+        with self._lock:
+
+            if monotonic() - self._flushed >= self.flush_interval:
+
+                self._flush()
+
+    def flush(self):
+        """Send any buffered measurements."""
+        with self._lock:
+
+            self._flush()
+
+    def _flush(self):
+        """Send the buffer. The lock must be held."""
+        self._flushed = monotonic()
+        if not self._buffer:
+
+            return None
+
+        payload = "\n".join(self._buffer).encode("utf-8")
+        self._buffer = []
+        self._size = 0
+        try:
+
+            self.transport.sendto(payload, self.address)
+
+        except (IOError, OSError, socket.error):
+
+            pass
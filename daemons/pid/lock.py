@@ -0,0 +1,368 @@
+"""Pid manager which holds a lock on the pidfile while the daemon runs."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import errno
+import fcntl
+import logging
+import os
+import sys
+import tempfile
+
+from ..interfaces import pid
+from ..interfaces import exit
+
+
+LOG = logging.getLogger(__name__)
+
+
+def process_start_time(pidnum):
+    """Get the start time of a process in clock ticks after boot.
+
+    Returns None if the start time is unavailable, for example because the
+    process does not exist or the system has no /proc filesystem.
+    """
+    try:
+
+        with open("/proc/{0}/stat".format(pidnum), "rb") as stat:
+
+            data = stat.read()
+
+    except (IOError, OSError):
+
+        return None
+
+    # The command name may contain spaces and parentheses so the fields are
+    # counted from the final closing parenthesis. Start time is field 22.
+    fields = data[data.rfind(b")") + 2:].split()
+    try:
+
+        return int(fields[19])
+
+    except (IndexError, ValueError):
+
+        return None
+
+
+class LockPidManager(pid.PidManager):
+
+    """PidManager which locks the pidfile for the lifetime of the daemon.
+
+    The daemon holds an exclusive flock on the pidfile from the moment it is
+    written until the daemon exits, at which point the kernel releases it.
+    Checking whether the daemon is running is then a single non-blocking
+    lock probe which cannot be fooled by a stale pidfile.
+
+    The pidfile contains the pid on the first line, for compatibility with
+    other tools, and the start time of the process on the second. A pid
+    whose start time does not match belongs to some other process which was
+    given a recycled pid.
+    """
+
+    _lockfd = None
+    _lockpid = None
+
+    @property
+    def pid(self):
+        """Get the pid which represents a daemonized process.
+
+        The result should be None if the process is not running.
+        """
+        if self._lockpid == os.getpid() and self._holds_pidfile():
+
+            return self._lockpid
+
+        try:
+
+            fd = os.open(self.pidfile, os.O_RDONLY)
+
+        except OSError as err:
+
+            if err.errno == errno.ENOENT:
+
+                return None
+
+            LOG.exception("Failed to read pidfile {0}.".format(self.pidfile))
+            sys.exit(exit.PIDFILE_INACCESSIBLE)
+
+        try:
+
+            if not self._locked(fd):
+
+                return None
+
+            content = os.read(fd, 64).decode("ascii", "replace").split()
+
+        finally:
+
+            os.close(fd)
+
+        try:
+
+            pidnum = int(content[0])
+            starttime = int(content[1]) if len(content) > 1 else None
+
+        except (IndexError, ValueError):
+
+            return None
+
+        if not self._alive(pidnum, starttime):
+
+            return None
+
+        return pidnum
+
+    @pid.setter
+    def pid(self, pidnum):
+        """Set the pid for a running process.
+
+        The pid of this process is written through a descriptor which holds
+        an exclusive lock on the pidfile itself, so only one process can own
+        the pidfile at a time. If another process holds the lock this exits
+        with ALREADY_RUNNING unless the pidfile names this process or its
+        parent, as it does when a new generation of a reloaded daemon takes
+        over. The lock is then taken on a new file which is renamed over the
+        pidfile.
+
+        The pid of any other process is written to a temporary file which is
+        renamed over the pidfile so that readers never see a partial write.
+        """
+        starttime = process_start_time(pidnum)
+        content = "{0}\n".format(pidnum)
+        if starttime is not None:
+
+            content += "{0}\n".format(starttime)
+
+        if pidnum != os.getpid():
+
+            os.close(self._replace(content, own=False))
+            return None
+
+        fd = self._lockfd
+        if self._lockpid != os.getpid() or not self._holds_pidfile():
+
+            fd = self._lock()
+
+        if fd is None:
+
+            holder = self.pid
+            if holder not in (os.getpid(), os.getppid()):
+
+                LOG.error(
+                    "The process is already running with pid {0}.".format(
+                        holder
+                    )
+                )
+                sys.exit(exit.ALREADY_RUNNING)
+
+            fd = self._replace(content, own=True)
+
+        else:
+
+            try:
+
+                # The new content is written over the old before the old is
+                # truncated. Readers only use the leading fields so they see
+                # either the old pid or the new one.
+                data = content.encode("ascii")
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, data)
+                os.ftruncate(fd, len(data))
+                os.fchmod(fd, 0o644)
+
+            except (IOError, OSError):
+
+                LOG.exception(
+                    "Failed to write pidfile {0}).".format(self.pidfile)
+                )
+                sys.exit(exit.PIDFILE_INACCESSIBLE)
+
+        if fd != self._lockfd:
+
+            self._release()
+
+        self._lockfd = fd
+        self._lockpid = pidnum
+
+    @pid.deleter
+    def pid(self):
+        """Stop managing the current pid."""
+        try:
+
+            self._remove(self.pidfile)
+
+        except OSError:
+
+            LOG.exception("Failed to clear pidfile {0}).".format(self.pidfile))
+            sys.exit(exit.PIDFILE_INACCESSIBLE)
+
+        finally:
+
+            self._release()
+
+    def _holds_pidfile(self):
+        """Check whether the locked file is still the one at the pidfile path.
+
+        The pidfile may have been replaced, for example by a new generation
+        of the daemon, while this process still holds the old lock.
+        """
+        try:
+
+            return (
+                os.fstat(self._lockfd).st_ino == os.stat(self.pidfile).st_ino
+            )
+
+        except OSError:
+
+            return False
+
+    def _locked(self, fd):
+        """Check whether any process holds the lock on an open pidfile."""
+        try:
+
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+
+        except (IOError, OSError):
+
+            # Either the lock is held or the filesystem does not support
+            # locks, in which case the pid is checked on its own.
+            return True
+
+        # The shared lock is released when the caller closes the file.
+        return False
+
+    def _alive(self, pidnum, starttime):
+        """Check whether the process which wrote the pidfile is running."""
+        current = process_start_time(pidnum)
+        if current is not None:
+
+            return starttime is None or current == starttime
+
+        try:
+
+            os.kill(pidnum, 0)
+
+        except OSError as err:
+
+            if err.errno == errno.EPERM:
+
+                return True
+
+            if err.errno == errno.ESRCH:
+
+                return False
+
+            LOG.exception(
+                "os.kill returned unhandled error {0}".format(err.strerror)
+            )
+            sys.exit(exit.PIDFILE_ERROR)
+
+        return True
+
+    def _lock(self):
+        """Open and exclusively lock the pidfile.
+
+        Returns the locked descriptor or None if another process holds the
+        lock.
+        """
+        while True:
+
+            fd = None
+            try:
+
+                fd = os.open(self.pidfile, os.O_RDWR | os.O_CREAT, 0o644)
+                self._cloexec(fd)
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if os.fstat(fd).st_ino == os.stat(self.pidfile).st_ino:
+
+                    return fd
+
+            except (IOError, OSError) as err:
+
+                if fd is not None:
+
+                    os.close(fd)
+
+                if err.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+
+                    return None
+
+                if err.errno == errno.ENOENT:
+
+                    continue
+
+                LOG.exception(
+                    "Failed to lock pidfile {0}).".format(self.pidfile)
+                )
+                sys.exit(exit.PIDFILE_INACCESSIBLE)
+
+            # The previous owner removed the pidfile after it was opened.
+            os.close(fd)
+
+    def _replace(self, content, own):
+        """Write a new pidfile and rename it over the old one.
+
+        If 'own' is set the new file is locked before it is renamed. Returns
+        the descriptor of the new file.
+        """
+        fd, path = None, None
+        try:
+
+            fd, path = tempfile.mkstemp(
+                dir=os.path.dirname(self.pidfile),
+                prefix=".{0}.".format(os.path.basename(self.pidfile)),
+            )
+            self._cloexec(fd)
+            if own:
+
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            os.write(fd, content.encode("ascii"))
+            os.fchmod(fd, 0o644)
+            os.rename(path, self.pidfile)
+
+        except (IOError, OSError):
+
+            LOG.exception("Failed to write pidfile {0}).".format(self.pidfile))
+            if fd is not None:
+
+                os.close(fd)
+                self._remove(path)
+
+            sys.exit(exit.PIDFILE_INACCESSIBLE)
+
+        return fd
+
+    @staticmethod
+    def _cloexec(fd):
+        """Keep a descriptor from leaking into executed programs."""
+        fcntl.fcntl(
+            fd,
+            fcntl.F_SETFD,
+            fcntl.fcntl(fd, fcntl.F_GETFD) | fcntl.FD_CLOEXEC,
+        )
+
+    def _release(self):
+        """Release the lock held on the pidfile, if any."""
+        if self._lockfd is not None:
+
+            os.close(self._lockfd)
+
+        self._lockfd = None
+        self._lockpid = None
+
+    @staticmethod
+    def _remove(path):
+        """Remove a file which may already be gone."""
+        try:
+
+            os.remove(path)
+
+        except OSError as err:
+
+            if err.errno != errno.ENOENT:
+
+                raise
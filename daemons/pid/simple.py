@@ -9,6 +9,7 @@ import logging
 import os
 import sys
 import errno
+import tempfile
 
 from ..interfaces import pid
 from ..interfaces import exit
@@ -25,7 +26,9 @@ class SimplePidManager(pid.PidManager):
     def pid(self):
         """Get the pid which represents a daemonized process.
 
-        The result should be None if the process is not running.
+        The result should be None if the process is not running. Only the
+        first line of the pidfile is read so that pidfiles which record more
+        than the pid may be read as well.
         """
         try:
 
@@ -33,7 +36,7 @@ class SimplePidManager(pid.PidManager):
 
                 try:
 
-                    pid = int(pidfile.read().strip())
+                    pid = int(pidfile.readline().strip())
 
                 except ValueError:
 
@@ -72,14 +75,25 @@ class SimplePidManager(pid.PidManager):
 
     @pid.setter
     def pid(self, pidnum):
-        """Set the pid for a running process."""
+        """Set the pid for a running process.
+
+        The pidfile is written to a temporary file which is then renamed
+        over the pidfile so that readers never see a partial write.
+        """
         try:
 
-            with open(self.pidfile, "w+") as pidfile:
+            fd, path = tempfile.mkstemp(
+                dir=os.path.dirname(self.pidfile),
+                prefix=".{0}.".format(os.path.basename(self.pidfile)),
+            )
+            with os.fdopen(fd, "w") as pidfile:
 
                 pidfile.write("{0}\n".format(pidnum))
 
-        except IOError:
+            os.chmod(path, 0o644)
+            os.rename(path, self.pidfile)
+
+        except (IOError, OSError):
 
             LOG.exception("Failed to write pidfile {0}).".format(self.pidfile))
             sys.exit(exit.PIDFILE_INACCESSIBLE)
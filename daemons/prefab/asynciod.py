@@ -0,0 +1,23 @@
+"""Asyncio message daemon missing get_message and handle_message."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from ..daemonize import simple as simple_daemonize
+from ..pid import simple as simple_pid
+from ..signal import asyncio as asyncio_signal
+from ..startstop import simple as simple_startstop
+from ..message import asyncio as asynciod
+
+
+class AsyncioDaemon(
+    simple_pid.SimplePidManager,
+    asyncio_signal.AsyncioSignalManager,
+    simple_daemonize.SimpleDaemonizeManager,
+    asynciod.AsyncioMessageManager,
+    simple_startstop.SimpleStartStopStepManager,
+):
+
+    """Message daemon which leverages asyncio."""
@@ -16,8 +16,8 @@ class EventletDaemon(
     simple_pid.SimplePidManager,
     simple_signal.SimpleSignalManager,
     simple_daemonize.SimpleDaemonizeManager,
-    simple_startstop.SimpleStartStopStepManager,
     eventletd.EventletMessageManager,
+    simple_startstop.SimpleStartStopStepManager,
 ):
 
     """Message daemon which leverages eventlet."""
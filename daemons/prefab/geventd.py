@@ -16,8 +16,8 @@ class GeventDaemon(
     simple_pid.SimplePidManager,
     simple_signal.SimpleSignalManager,
     simple_daemonize.SimpleDaemonizeManager,
-    simple_startstop.SimpleStartStopStepManager,
     geventd.GeventMessageManager,
+    simple_startstop.SimpleStartStopStepManager,
 ):
 
     """Message daemon which leverages gevent."""
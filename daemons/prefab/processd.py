@@ -0,0 +1,23 @@
+"""Process pool message daemon missing get_message and handle_message."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from ..daemonize import simple as simple_daemonize
+from ..pid import simple as simple_pid
+from ..signal import simple as simple_signal
+from ..startstop import simple as simple_startstop
+from ..message import executor
+
+
+class ProcessPoolDaemon(
+    simple_pid.SimplePidManager,
+    simple_signal.SimpleSignalManager,
+    simple_daemonize.SimpleDaemonizeManager,
+    executor.ProcessPoolMessageManager,
+    simple_startstop.SimpleStartStopStepManager,
+):
+
+    """Message daemon which leverages a process pool."""
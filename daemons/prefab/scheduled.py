@@ -0,0 +1,23 @@
+"""Scheduling daemon which needs only its jobs registered."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from ..daemonize import simple as simple_daemonize
+from ..pid import simple as simple_pid
+from ..scheduler import simple as simple_scheduler
+from ..signal import simple as simple_signal
+from ..startstop import simple as simple_startstop
+
+
+class ScheduledDaemon(
+    simple_pid.SimplePidManager,
+    simple_signal.SimpleSignalManager,
+    simple_daemonize.SimpleDaemonizeManager,
+    simple_scheduler.SimpleSchedulerManager,
+    simple_startstop.SimpleStartStopStepManager,
+):
+
+    """Daemon which runs jobs registered with 'every' and 'cron'."""
@@ -0,0 +1,34 @@
+"""Supervised daemons that are missing the run or step logic."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from ..daemonize import simple as simple_daemonize
+from ..pid import simple as simple_pid
+from ..signal import simple as simple_signal
+from ..startstop import simple as simple_startstop
+from ..supervisor import simple as simple_supervisor
+
+
+class SupervisedRunDaemon(
+    simple_supervisor.SimpleSupervisorManager,
+    simple_pid.SimplePidManager,
+    simple_signal.SimpleSignalManager,
+    simple_daemonize.SimpleDaemonizeManager,
+    simple_startstop.SimpleStartStopManager,
+):
+
+    """RunDaemon which runs in several supervised worker processes."""
+
+
+class SupervisedStepDaemon(
+    simple_supervisor.SimpleSupervisorManager,
+    simple_pid.SimplePidManager,
+    simple_signal.SimpleSignalManager,
+    simple_daemonize.SimpleDaemonizeManager,
+    simple_startstop.SimpleStartStopStepManager,
+):
+
+    """StepDaemon which runs in several supervised worker processes."""
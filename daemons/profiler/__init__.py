@@ -0,0 +1 @@
+"""Implementations of the profiler manager interface."""
@@ -0,0 +1,269 @@
+"""Simple profiler manager implementation.
+
+Stack samples are written in the collapsed format read by flame graph tools
+such as flamegraph.pl and speedscope. Each line holds the frames of a stack
+from the outermost to the innermost, separated by ';', followed by the
+number of times the stack was seen.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import cProfile
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+from ..interfaces import profiler
+
+
+LOG = logging.getLogger(__name__)
+
+MODES = ("sample", "cprofile")
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
+def profile_path(pidfile, extension, worker_index=None):
+    """Get a new profile file for a daemon or one of its workers."""
+    if worker_index is not None:
+
+        pidfile = "{0}.{1}".format(pidfile, worker_index)
+
+    return "{0}.{1}.{2}.{3}".format(
+        pidfile, time.strftime("%Y%m%d-%H%M%S"), os.getpid(), extension
+    )
+
+
+def collapse_stack(root, frame):
+    """Get a stack as a single line of frames beginning with 'root'."""
+    names = []
+    while frame is not None:
+
+        code = frame.f_code
+        names.append("{0} ({1}:{2})".format(
+            code.co_name, code.co_filename, frame.f_lineno
+        ))
+        frame = frame.f_back
+
+    names.append(root)
+    return ";".join(reversed(names))
+
+
+def write_collapsed(path, counts):
+    """Write the number of times each collapsed stack was seen."""
+    with open(path, "w") as output:
+
+        for stack, count in sorted(counts.items()):
+
+            output.write("{0} {1}\n".format(stack, count))
+
+
+class SimpleProfilerManager(profiler.ProfilerManager):
+
+    """Profiler manager which writes profiles next to the pidfile.
+
+    This mixin must come before the other daemon bases. On 'profile_signal'
+    the daemon is profiled with the 'profile_mode':
+
+        sample: a thread records the stack of every thread, and of every
+            waiting greenlet in a gevent or eventlet pool, each
+            'profile_interval' seconds for 'profile_duration' seconds. The
+            stacks are written to a '.collapsed' file.
+        cprofile: the first signal starts cProfile around the step loop and
+            the next writes the statistics to a '.pstats' file.
+
+    The signal handler only records the request, which is acted on at the
+    next checkpoint, so profiling needs the step loop. Profiles are named
+    after the pidfile followed by the time and the pid. Daemons with a
+    control socket may also be profiled with the 'profile' command, which
+    accepts the mode and duration.
+    """
+
+    profile_signal = signal.SIGUSR1
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the profiler and register the profile signal."""
+        self.profile_mode = kwargs.pop("profile_mode", "sample")
+        self.profile_duration = kwargs.pop("profile_duration", 30)
+        self.profile_interval = kwargs.pop("profile_interval", 0.01)
+        if self.profile_mode not in MODES:
+
+            raise ValueError(
+                "The profile_mode must be one of {0}.".format(", ".join(MODES))
+            )
+
+        self._profile_lock = threading.Lock()
+        self._sampler = None
+        self._sample_path = None
+        self._profiler = None
+        self._profiler_path = None
+        self._profile_toggle = False
+        self._profile_requested = False
+
+        super(SimpleProfilerManager, self).__init__(*args, **kwargs)
+
+        self.handle(self.profile_signal, self.request_profile)
+
+    def checkpoint(self):
+        """Start profiling, or start or stop cProfile, if asked to."""
+        if self._profile_requested:
+
+            self._profile_requested = False
+            self.profile()
+
+        if self._profile_toggle:
+
+            self._profile_toggle = False
+            self.toggle_cprofile()
+
+        super(SimpleProfilerManager, self).checkpoint()
+
+    def request_profile(self):
+        """Begin or finish profiling with the defaults at the next checkpoint.
+
+        This only sets a flag so that it is safe to call from a signal
+        handler which may interrupt a thread holding the profile lock.
+        """
+        self._profile_requested = True
+        wakeup = getattr(self, "wakeup", None)
+        if wakeup is not None:
+
+            wakeup.set()
+
+    def profile(self, mode=None, duration=None):
+        """Begin profiling the daemon, or finish a cProfile in progress.
+
+        Returns the path the profile is written to once it is finished.
+        """
+        mode = mode or self.profile_mode
+        if mode == "sample":
+
+            return self.start_sampling(duration)
+
+        if mode != "cprofile":
+
+            raise ValueError("Unknown profile mode {0}.".format(mode))
+
+        with self._profile_lock:
+
+            if self._profiler_path is None:
+
+                self._profiler_path = self._profile_path("pstats")
+
+            self._profile_toggle = True
+            return self._profiler_path
+
+    def control_profile(self, mode=None, duration=None):
+        """Profile the daemon and get the path of the profile."""
+        return self.profile(mode, duration)
+
+    def start_sampling(self, duration=None):
+        """Sample stacks from a thread for 'duration' seconds.
+
+        Returns the path of the profile. This does nothing but return the
+        path if the process is already sampling.
+        """
+        with self._profile_lock:
+
+            if self._sampler is not None and self._sampler.is_alive():
+
+                return self._sample_path
+
+            self._sample_path = self._profile_path("collapsed")
+            self._sampler = threading.Thread(
+                target=self._sample,
+                args=(self._sample_path, duration or self.profile_duration),
+                name="profiler",
+            )
+            self._sampler.daemon = True
+            self._sampler.start()
+            LOG.info("Sampling stacks into {0}.".format(self._sample_path))
+            return self._sample_path
+
+    def toggle_cprofile(self):
+        """Start cProfile in this thread, or stop it and write the stats."""
+        if self._profiler is None:
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            LOG.info("Started cProfile.")
+            return None
+
+        profile, self._profiler = self._profiler, None
+        profile.disable()
+        with self._profile_lock:
+
+            path, self._profiler_path = self._profiler_path, None
+
+        profile.dump_stats(path)
+        LOG.info("Wrote cProfile statistics to {0}.".format(path))
+
+    def task_frames(self):
+        """Get the frames of the greenlets waiting in the message pool."""
+        pool = getattr(self, "_pool", None)
+        try:
+
+            # Eventlet pools track their greenlets while gevent pools are
+            # themselves collections of greenlets.
+            greenlets = list(getattr(pool, "coroutines_running", pool))
+
+        except TypeError:
+
+            return []
+
+        frames = []
+        for greenlet in greenlets:
+
+            frame = getattr(greenlet, "gr_frame", None)
+            if frame is not None:
+
+                frames.append(frame)
+
+        return frames
+
+    def _profile_path(self, extension):
+        """Get a new profile file for this process."""
+        return profile_path(
+            self.pidfile, extension, getattr(self, "worker_index", None)
+        )
+
+    def _sample(self, path, duration):
+        """Count the stacks seen until the duration passes and write them."""
+        counts = collections.Counter()
+        sampler = threading.current_thread().ident
+        deadline = monotonic() + duration
+        while monotonic() < deadline:
+
+            names = dict(
+                (thread.ident, thread.name) for thread in threading.enumerate()
+            )
+            for ident, frame in sys._current_frames().items():
+
+                if ident != sampler:
+
+                    root = names.get(ident, "thread")
+                    counts[collapse_stack(root, frame)] += 1
+
+            for frame in self.task_frames():
+
+                counts[collapse_stack("greenlet", frame)] += 1
+
+            time.sleep(self.profile_interval)
+
+        try:
+
+            write_collapsed(path, counts)
+
+        except (IOError, OSError):
+
+            LOG.exception("Could not write the profile {0}.".format(path))
+            return None
+
+        LOG.info("Wrote stack samples to {0}.".format(path))
@@ -0,0 +1 @@
+"""Implementations of the recycle manager interface."""
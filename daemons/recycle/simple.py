@@ -0,0 +1,164 @@
+"""Simple recycle manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import mmap
+import os
+import random
+import sys
+import time
+
+from ..interfaces import exit
+from ..interfaces import recycle
+
+
+LOG = logging.getLogger(__name__)
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
+def resident_memory():
+    """Get the resident set size of this process in bytes.
+
+    Returns None where '/proc/self/statm' is not available.
+    """
+    try:
+
+        with open("/proc/self/statm", "rb") as statm:
+
+            return int(statm.read().split()[1]) * mmap.PAGESIZE
+
+    except (IOError, OSError, IndexError, ValueError):
+
+        return None
+
+
+class SimpleRecycleManager(recycle.RecycleManager):
+
+    """Recycler which replaces the daemon after enough work, time, or memory.
+
+    This mixin must come before the other daemon bases. After every step the
+    daemon is checked against three optional limits:
+
+        recycle_messages: the number of messages handled, or of steps for
+            daemons which do not handle messages.
+        recycle_age: the number of seconds the process has been running.
+        recycle_rss: the resident set size in bytes. This is read from
+            '/proc/self/statm' at most every 'recycle_check_interval'
+            seconds.
+
+    Each process lowers its limits by a random fraction of up to
+    'recycle_jitter' so that daemons started together are not all recycled
+    at once. Once a limit is reached the daemon drains its pool. A daemon
+    with a reload manager then re-executes itself in place and so keeps its
+    pid, pidfile, and listening sockets. Supervised workers, and daemons
+    without a reload manager, exit with code RECYCLED instead so that the
+    supervisor, or whatever started them, replaces them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the recycler with its limits."""
+        self.recycle_messages = kwargs.pop("recycle_messages", None)
+        self.recycle_age = kwargs.pop("recycle_age", None)
+        self.recycle_rss = kwargs.pop("recycle_rss", None)
+        self.recycle_jitter = kwargs.pop("recycle_jitter", 0.1)
+        self.recycle_check_interval = kwargs.pop(
+            "recycle_check_interval", 1.0
+        )
+        self._recycle_pid = None
+        self._recycle_limits = None
+        self._recycle_started = None
+        self._recycle_checked = None
+        self._steps = 0
+        self._reset_limits()
+
+        super(SimpleRecycleManager, self).__init__(*args, **kwargs)
+
+    def checkpoint(self):
+        """Recycle the daemon after a step which reaches a limit.
+
+        A forked process, such as the daemonized process or a supervised
+        worker, chooses its own limits before its first step is counted.
+        """
+        super(SimpleRecycleManager, self).checkpoint()
+        if self._recycle_pid != os.getpid():
+
+            self._reset_limits()
+
+        self._steps += 1
+        reason = self.recycle_reason()
+        if reason is not None:
+
+            self.recycle(reason)
+
+    def recycle_reason(self):
+        """Get the limit the daemon has reached, if any."""
+        messages, age, rss = self._recycle_limits
+        now = monotonic()
+        if messages is not None and self.processed() >= messages:
+
+            return "handled {0} messages".format(self.processed())
+
+        if age is not None and now - self._recycle_started >= age:
+
+            return "ran for {0:.0f} seconds".format(
+                now - self._recycle_started
+            )
+
+        if rss is None or now - self._recycle_checked < (
+            self.recycle_check_interval
+        ):
+
+            return None
+
+        self._recycle_checked = now
+        resident = resident_memory()
+        if resident is not None and resident >= rss:
+
+            return "resident memory of {0} bytes".format(resident)
+
+        return None
+
+    def processed(self):
+        """Get the number of messages, or steps, handled by this process."""
+        if hasattr(self, "messages_completed"):
+
+            return self.messages_completed + self.messages_failed
+
+        return self._steps
+
+    def recycle(self, reason):
+        """Drain the daemon and replace it."""
+        LOG.info("Recycling the daemon after it {0}.".format(reason))
+        if hasattr(self, "drain"):
+
+            self.drain()
+
+        worker = getattr(self, "worker_index", None) is not None
+        if not worker and hasattr(self, "reexec"):
+
+            self.reexec()
+            LOG.error("Failed to recycle the daemon in place.")
+
+        if not worker and self.pid == os.getpid():
+
+            del self.pid
+
+        sys.exit(exit.RECYCLED)
+
+    def _reset_limits(self):
+        """Choose the limits for the current process and restart its clock."""
+        scale = 1 - random.uniform(0, self.recycle_jitter)
+        self._recycle_limits = tuple(
+            None if limit is None else limit * scale
+            for limit in (
+                self.recycle_messages, self.recycle_age, self.recycle_rss
+            )
+        )
+        self._recycle_pid = os.getpid()
+        self._recycle_started = self._recycle_checked = monotonic()
+        self._steps = 0
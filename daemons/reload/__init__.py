@@ -0,0 +1 @@
+"""Implementations of the reload manager interface."""
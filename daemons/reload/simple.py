@@ -0,0 +1,256 @@
+"""Simple reload manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import errno
+import logging
+import os
+import signal
+import socket
+import sys
+
+from ..interfaces import exit
+from ..interfaces import reload
+
+
+LOG = logging.getLogger(__name__)
+
+# The pid of the generation being replaced by this process.
+RELOAD_PID_ENV = "DAEMONS_RELOAD_PID"
+# Comma separated list of listening socket descriptors passed to this process.
+LISTEN_FDS_ENV = "DAEMONS_LISTEN_FDS"
+
+
+def launch_argv():
+    """Get the command line which started the current interpreter."""
+    argv = getattr(sys, "orig_argv", None)
+    if argv:
+
+        return [sys.executable] + list(argv[1:])
+
+    return [sys.executable] + list(sys.argv)
+
+
+def bound_to(sock, address):
+    """Check whether a socket is bound to the address.
+
+    Internet addresses are resolved first so that a host name, or the empty
+    host which binds every interface, matches the numeric address reported
+    by the socket.
+    """
+    name = sock.getsockname()
+    if sock.family not in (socket.AF_INET, socket.AF_INET6):
+
+        return name == address
+
+    try:
+
+        infos = socket.getaddrinfo(
+            address[0] or None,
+            address[1],
+            sock.family,
+            socket.SOCK_STREAM,
+            0,
+            socket.AI_PASSIVE,
+        )
+
+    except socket.gaierror:
+
+        return False
+
+    return any(info[4][:2] == name[:2] for info in infos)
+
+
+class SimpleReloadManager(reload.ReloadManager):
+
+    """Reload manager which re-executes the daemon's own command line.
+
+    This mixin must come before the other daemon bases. On 'reload_signal'
+    the daemon forks and executes the command line that originally started
+    it. The new process recognises itself as a new generation when it calls
+    'start()'. Rather than daemonizing again it takes over the pidfile,
+    inherits any registered listening sockets and, once it is ready, sends
+    SIGTERM to the old generation which then shuts down as it normally
+    would, draining any work in progress. The listening sockets stay open
+    throughout.
+
+    The command line may be replaced by passing 'reload_argv'.
+    """
+
+    reload_signal = signal.SIGUSR2
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the manager and register the reload signal."""
+        self.reload_argv = kwargs.pop("reload_argv", None)
+        self._launch = None
+        self._previous = None
+        self._sockets = []
+        fds = os.environ.pop(LISTEN_FDS_ENV, "")
+        for fd in fds.split(","):
+
+            if fd:
+
+                self._sockets.append(socket.socket(fileno=int(fd)))
+
+        super(SimpleReloadManager, self).__init__(*args, **kwargs)
+
+        self.handle(self.reload_signal, self.reload)
+
+    @property
+    def inherited_sockets(self):
+        """Get the listening sockets passed on by the previous generation."""
+        return list(self._sockets)
+
+    def register_socket(self, sock):
+        """Pass a listening socket on to every future generation."""
+        if sock not in self._sockets:
+
+            self._sockets.append(sock)
+
+    def listen(self, address, family=socket.AF_INET, backlog=128):
+        """Get a listening socket bound to the address.
+
+        An inherited socket bound to the same address is reused. Otherwise a
+        new socket is bound. Either way the socket is registered so that it
+        is passed on to the next generation.
+        """
+        for sock in self._sockets:
+
+            if sock.family == family and bound_to(sock, address):
+
+                return sock
+
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(address)
+        sock.listen(backlog)
+        self.register_socket(sock)
+        return sock
+
+    def start(self):
+        """Start the daemon or take over from the previous generation."""
+        previous = os.environ.pop(RELOAD_PID_ENV, None)
+        self._launch = (self.reload_argv or launch_argv(), os.getcwd())
+        if previous is None:
+
+            return super(SimpleReloadManager, self).start()
+
+        self.takeover(int(previous))
+
+    def stop(self):
+        """Stop the daemonized process.
+
+        A new generation started by 'reload' leaves the old generation to
+        'takeover' so that a command line which restarts the daemon does not
+        stop it without a replacement ready.
+        """
+        if RELOAD_PID_ENV in os.environ:
+
+            return None
+
+        return super(SimpleReloadManager, self).stop()
+
+    def takeover(self, previous):
+        """Replace the previous generation and run the daemon.
+
+        The pidfile is taken over and the previous generation retired once
+        this one is ready which, with 'manual_ready' set, is when
+        'notify_ready()' is called. Until then the pidfile still names the
+        previous generation.
+        """
+        os.chdir("/")
+        LOG.info(
+            "Generation {0} took over from {1}.".format(os.getpid(), previous)
+        )
+        self._previous = previous
+        if not getattr(self, "manual_ready", False):
+
+            self.notify_ready()
+
+        try:
+
+            self.run()
+
+        except Exception:
+
+            LOG.exception("Uncaught exception in the daemon run() method.")
+            if self._previous is None:
+
+                self.stop()
+
+            sys.exit(exit.RUN_FAILURE)
+
+    def notify_ready(self):
+        """Report ready and retire the previous generation, if any.
+
+        A new generation writes its own pid to the pidfile just before the
+        previous generation is asked to shut down.
+        """
+        super(SimpleReloadManager, self).notify_ready()
+        previous, self._previous = self._previous, None
+        if previous is None:
+
+            return None
+
+        self.pid = os.getpid()
+        if previous != os.getpid():
+
+            self.retire(previous)
+
+    def retire(self, previous):
+        """Ask the previous generation to shut down."""
+        try:
+
+            os.kill(previous, signal.SIGTERM)
+
+        except OSError as err:
+
+            if err.errno != errno.ESRCH:
+
+                raise
+
+    def reload(self):
+        """Start a new generation of the daemon alongside this one."""
+        pid = os.fork()
+        if pid > 0:
+
+            LOG.info("Started generation {0}.".format(pid))
+            return None
+
+        self._exec(os.getppid())
+        os._exit(exit.RELOAD_FAILED)
+
+    def reexec(self):
+        """Replace this process with a new generation of the daemon.
+
+        If the new generation cannot be executed this process carries on.
+        """
+        self._exec(os.getpid())
+        os.chdir("/")
+
+    def _exec(self, previous):
+        """Execute the launch command as a replacement for 'previous'.
+
+        This only returns if the command could not be executed.
+        """
+        argv, cwd = self._launch
+        env = dict(os.environ)
+        env[RELOAD_PID_ENV] = "{0}".format(previous)
+        env[LISTEN_FDS_ENV] = ",".join(
+            "{0}".format(sock.fileno()) for sock in self._sockets
+        )
+        try:
+
+            for sock in self._sockets:
+
+                sock.set_inheritable(True)
+
+            os.chdir(cwd)
+            os.execve(argv[0], argv, env)
+
+        except OSError:
+
+            LOG.exception("Failed to execute a new generation.")
@@ -0,0 +1 @@
+"""Implementations of the scheduler manager interface."""
@@ -0,0 +1,389 @@
+"""Simple scheduler manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from concurrent import futures
+import datetime
+import functools
+import heapq
+import itertools
+import logging
+import select
+import time
+
+from ..interfaces import scheduler
+
+
+LOG = logging.getLogger(__name__)
+
+POLICIES = ("catchup", "coalesce", "skip")
+
+# The name and range of each field in a cron expression. A day of week of
+# seven is accepted as another name for Sunday.
+CRON_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+# How far ahead to look for a time matching a cron expression.
+CRON_HORIZON = datetime.timedelta(days=366 * 5)
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
+def parse_cron_field(text, name, low, high):
+    """Get the set of values matched by one field of a cron expression.
+
+    Fields are lists of '*', a single value, or a range 'a-b', each of which
+    may be followed by '/n' to match only every nth value.
+    """
+    values = set()
+    for part in text.split(","):
+
+        step = 1
+        if "/" in part:
+
+            part, step = part.split("/", 1)
+            step = int(step)
+
+        if part == "*":
+
+            start, end = low, high
+
+        elif "-" in part:
+
+            start, end = (int(value) for value in part.split("-", 1))
+
+        else:
+
+            start = int(part)
+            end = high if step > 1 else start
+
+        if step < 1 or start < low or end > high or start > end:
+
+            raise ValueError(
+                "Invalid {0} field in cron expression: {1}".format(name, text)
+            )
+
+        values.update(range(start, end + 1, step))
+
+    return frozenset(values)
+
+
+class CronSchedule(object):
+
+    """The minutes matched by a five field cron expression in local time.
+
+    As with cron, a day matches if either the day of month or the day of
+    week matches unless one of them is '*'.
+    """
+
+    def __init__(self, expression):
+        """Parse the expression."""
+        fields = expression.split()
+        if len(fields) != len(CRON_FIELDS):
+
+            raise ValueError(
+                "Cron expressions have five fields: {0}".format(expression)
+            )
+
+        self.expression = expression
+        (
+            self.minutes,
+            self.hours,
+            self.days,
+            self.months,
+            weekdays,
+        ) = (
+            parse_cron_field(text, name, low, high)
+            for text, (name, low, high) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def matches_day(self, moment):
+        """Check whether the date of a datetime matches."""
+        day = moment.day in self.days
+        weekday = moment.isoweekday() % 7 in self.weekdays
+        if self._any_day:
+
+            return weekday
+
+        if self._any_weekday:
+
+            return day
+
+        return day or weekday
+
+    def next(self, after):
+        """Get the first matching minute after the datetime 'after'."""
+        moment = after.replace(second=0, microsecond=0)
+        moment += datetime.timedelta(minutes=1)
+        limit = moment + CRON_HORIZON
+        while moment < limit:
+
+            if moment.month not in self.months:
+
+                moment = moment.replace(day=1, hour=0, minute=0)
+                moment = (moment + datetime.timedelta(days=32)).replace(day=1)
+                continue
+
+            if not self.matches_day(moment):
+
+                moment = moment.replace(hour=0, minute=0)
+                moment += datetime.timedelta(days=1)
+                continue
+
+            if moment.hour not in self.hours:
+
+                moment = moment.replace(minute=0)
+                moment += datetime.timedelta(hours=1)
+                continue
+
+            if moment.minute not in self.minutes:
+
+                moment += datetime.timedelta(minutes=1)
+                continue
+
+            return moment
+
+        raise ValueError("Cron expression never matches: {0}".format(
+            self.expression
+        ))
+
+
+class Job(object):
+
+    """A function run by the scheduler.
+
+    Jobs run either every 'interval' seconds or on a cron 'schedule'. The
+    'due' time is on the scheduler's monotonic clock. Interval jobs are due
+    a whole number of intervals after their first run however long each run
+    takes so they do not drift.
+    """
+
+    def __init__(self, func, name, policy, due, interval=None, schedule=None):
+        """Initialize the job with its first due time."""
+        if policy not in POLICIES:
+
+            raise ValueError("Unknown policy {0}.".format(policy))
+
+        self.func = func
+        self.name = name
+        self.policy = policy
+        self.due = due
+        self.interval = interval
+        self.schedule = schedule
+        self.tick = None
+        self.runs = 0
+        self.missed = 0
+        self.running = False
+        self.cancelled = False
+
+    def advance(self, clock):
+        """Move the job on to its next due time."""
+        if self.schedule is None:
+
+            self.due += self.interval
+            return None
+
+        if self.tick is None:
+
+            self.tick = datetime.datetime.now()
+
+        self.tick = self.schedule.next(self.tick)
+        # Cron times are in local time so the due time is recalculated from
+        # the wall clock each time in case the wall clock has been changed.
+        self.due = clock() + time.mktime(self.tick.timetuple()) - time.time()
+
+
+class SimpleSchedulerManager(scheduler.SchedulerManager):
+
+    """Scheduler which runs jobs from the step loop.
+
+    Jobs are kept in a heap ordered by when they are due. Each step runs
+    every job which is due and then sleeps until the next one, or for no
+    more than 'scheduler_max_wait' seconds so that the step loop keeps
+    turning. Jobs run within the step unless 'job_pool_size' is given in
+    which case they run on a pool of that many threads. A job never runs
+    more than once at a time. A run which is due while the previous run is
+    still going on the pool is counted as missed.
+    """
+
+    # These aliases allow extensions to change how the scheduler waits and
+    # tells the time without monkey patching the time library.
+    sleep = staticmethod(time.sleep)
+    select = staticmethod(select.select)
+    clock = staticmethod(monotonic)
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the scheduler with no jobs."""
+        self.scheduler_max_wait = kwargs.pop("scheduler_max_wait", 1.0)
+        self.job_pool_size = kwargs.pop("job_pool_size", None)
+        self._job_pool = None
+        self._queue = []
+        self._order = itertools.count()
+
+        super(SimpleSchedulerManager, self).__init__(*args, **kwargs)
+
+    @property
+    def job_pool(self):
+        """Get the pool which runs jobs or None to run them in the step."""
+        if self.job_pool_size is None:
+
+            return None
+
+        self._job_pool = self._job_pool or self.create_job_pool()
+        return self._job_pool
+
+    def create_job_pool(self):
+        """Create a thread pool sized by job_pool_size."""
+        return futures.ThreadPoolExecutor(max_workers=self.job_pool_size)
+
+    @property
+    def jobs(self):
+        """Get every scheduled job in the order they are due."""
+        return [job for _, _, job in sorted(self._queue) if not job.cancelled]
+
+    def every(self, interval, func, policy="coalesce", delay=None, name=None):
+        """Run 'func' every 'interval' seconds and return the new job."""
+        if interval <= 0:
+
+            raise ValueError("The interval must be positive.")
+
+        job = Job(
+            func,
+            name or func.__name__,
+            policy,
+            self.clock() + (interval if delay is None else delay),
+            interval=interval,
+        )
+        self._push(job)
+        return job
+
+    def cron(self, expression, func, policy="coalesce", name=None):
+        """Run 'func' whenever the cron 'expression' matches."""
+        job = Job(
+            func,
+            name or func.__name__,
+            policy,
+            None,
+            schedule=CronSchedule(expression),
+        )
+        job.advance(self.clock)
+        self._push(job)
+        return job
+
+    def cancel(self, job):
+        """Stop running a job.
+
+        A run already in progress on the pool carries on.
+        """
+        job.cancelled = True
+
+    def step(self):
+        """Run every job which is due and wait for the next one."""
+        now = self.clock()
+        while self._queue and self._queue[0][0] <= now:
+
+            job = heapq.heappop(self._queue)[2]
+            if job.cancelled:
+
+                continue
+
+            due = 0
+            while job.due <= now:
+
+                due += 1
+                job.advance(self.clock)
+
+            # Other than with 'catchup' the missed ticks are dropped and the
+            # job runs once for the current one so it is never starved.
+            runs = 1
+            if job.policy == "catchup":
+
+                runs = due
+
+            job.missed += due - runs
+            for _ in range(runs):
+
+                self.run_job(job)
+
+            if not job.cancelled:
+
+                self._push(job)
+
+        delay = self.scheduler_max_wait
+        if self._queue:
+
+            delay = min(delay, self._queue[0][0] - self.clock())
+
+        if delay <= 0:
+
+            return None
+
+        # Wait on the signal manager's wakeup, if it has one, so that a
+        # signal is handled without waiting for the next job.
+        wakeup = getattr(self, "signal_wakeup", None)
+        if wakeup is None:
+
+            self.sleep(delay)
+            return None
+
+        self.select([wakeup], [], [], delay)
+
+    def run_job(self, job):
+        """Run a job in the step or submit it to the pool."""
+        pool = self.job_pool
+        if pool is None:
+
+            return self._call(job)
+
+        if job.running:
+
+            LOG.warning("Job {0} is still running. Missing a run.".format(
+                job.name
+            ))
+            job.missed += 1
+            return None
+
+        job.running = True
+        pool.submit(self._call, job).add_done_callback(
+            functools.partial(self._finished, job)
+        )
+
+    def _call(self, job):
+        """Run a job and log any exception it raises."""
+        metrics = getattr(self, "metrics", None)
+        started = self.clock()
+        try:
+
+            job.func()
+
+        except Exception:
+
+            LOG.exception("Uncaught exception in job {0}.".format(job.name))
+
+        finally:
+
+            job.runs += 1
+            if metrics is not None:
+
+                metrics.timing(
+                    "job.{0}".format(job.name), self.clock() - started
+                )
+
+    def _finished(self, job, future):
+        """Allow a job which ran on the pool to run again."""
+        job.running = False
+
+    def _push(self, job):
+        """Add a job to the heap."""
+        heapq.heappush(self._queue, (job.due, next(self._order), job))
@@ -0,0 +1,65 @@
+"""Signal manager implementation powered by asyncio.
+
+This module requires Python 3.5 or later.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from . import simple
+
+
+class AsyncioSignalManager(simple.SimpleSignalManager):
+
+    """SignalManager which delivers signals through an asyncio event loop.
+
+    Until an event loop is attached signals are handled with the python
+    signal module exactly like the SimpleSignalManager. Once 'attach_loop()'
+    is called every signal is moved to 'loop.add_signal_handler()' so that
+    handlers only ever run as callbacks on the loop rather than interrupting
+    whatever coroutine happens to be executing.
+    """
+
+    _loop = None
+
+    def attach_loop(self, loop):
+        """Route all handled signals through the given event loop."""
+        self._loop = loop
+        for signum in set(self.kill_signals) | set(self._handlers):
+
+            self._add_loop_handler(signum)
+
+    def handle(self, signum, handler):
+        """Set a function to run when the given signal is recieved."""
+        super(AsyncioSignalManager, self).handle(signum, handler)
+        if self._loop is not None:
+
+            self._add_loop_handler(signum)
+
+    def _add_loop_handler(self, signum):
+        """Replace the python signal handler with a loop signal handler."""
+        self._loop.add_signal_handler(signum, self._loop_signal, signum)
+
+    def _loop_signal(self, signum):
+        """Handle a signal delivered by the event loop.
+
+        Shutdown signals are handled by a task so that in flight messages
+        can finish on the loop before the process exits.
+        """
+        if signum in self.kill_signals:
+
+            self._loop.create_task(self._shutdown_async(signum))
+            return None
+
+        self._handle_signals(signum, None)
+
+    async def _shutdown_async(self, signum):
+        """Drain on the loop and then shut down."""
+        drain = getattr(self, "drain_async", None)
+        if drain is not None:
+
+            await drain()
+
+        self.shutdown(signum)
@@ -0,0 +1,90 @@
+"""Signal manager which handles signals at safe points in the loop."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+from ..message import idle
+from . import simple
+
+
+class DeferredSignalManager(simple.SimpleSignalManager):
+
+    """SignalManager which handles signals between steps rather than at once.
+
+    This mixin must come before the other daemon bases. The Python signal
+    handler only records the signal and writes to a self-pipe. Recorded
+    signals are handled at the next checkpoint of the step loop, when no
+    step is in progress, so handlers and the shutdown never interrupt the
+    daemon's own code. A signal which arrives several times before it is
+    handled is handled once.
+
+    The self-pipe is available as 'signal_wakeup'. Message daemons and
+    schedulers wait on it when idle so a signal ends the wait at once and
+    an idle_time of None waits without polling. A daemon stuck within a step
+    may still be stopped by sending a second shutdown signal, which shuts
+    down at once as SimpleSignalManager would. Daemons which implement 'run'
+    rather than 'step' must call 'process_signals' themselves.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the manager with no pending signals."""
+        self._pending = []
+        self._signal_pid = None
+        self._signal_wakeup = None
+
+        super(DeferredSignalManager, self).__init__(*args, **kwargs)
+
+    @property
+    def signal_wakeup(self):
+        """Get the self-pipe which becomes readable when a signal arrives.
+
+        Each process gets its own pipe so that forked workers do not handle
+        each other's signals.
+        """
+        if self._signal_pid != os.getpid():
+
+            if self._signal_wakeup is not None:
+
+                self._signal_wakeup.close()
+
+            self._signal_wakeup = idle.Wakeup()
+            self._signal_pid = os.getpid()
+            self._pending = []
+
+        return self._signal_wakeup
+
+    def checkpoint(self):
+        """Handle the signals received during the last step."""
+        self.process_signals()
+        super(DeferredSignalManager, self).checkpoint()
+
+    def process_signals(self):
+        """Handle every signal received since the last call."""
+        if not self._pending:
+
+            return None
+
+        self.signal_wakeup.clear()
+        pending, self._pending = self._pending, []
+        for signum in pending:
+
+            super(DeferredSignalManager, self)._handle_signals(signum, None)
+
+    def _handle_signals(self, signum, frame):
+        """Record a signal to be handled at the next checkpoint."""
+        wakeup = self.signal_wakeup
+        if signum in self.kill_signals and any(
+            pending in self.kill_signals for pending in self._pending
+        ):
+
+            return self.shutdown(signum)
+
+        if signum not in self._pending:
+
+            self._pending.append(signum)
+
+        wakeup.set()
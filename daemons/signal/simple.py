@@ -93,9 +93,18 @@ class SimpleSignalManager(signal_iface.SignalManager):
         responsible for runnin the appropriate signal handlers registered with
         the 'handle' method unless they are shutdown signals. Shutdown signals
         must trigger the 'shutdown' method.
+
+        Daemons which cannot shut down from within a signal handler, such as
+        the green thread message daemons, provide a 'defer_shutdown' method
+        which leaves the shutdown to their own loop.
         """
         if signum in self.kill_signals:
 
+            defer = getattr(self, "defer_shutdown", None)
+            if defer is not None and defer(signum):
+
+                return None
+
             return self.shutdown(signum)
 
         for handler in self._handlers[signum]:
@@ -109,7 +118,17 @@ class SimpleSignalManager(signal_iface.SignalManager):
         through the 'handle' method. At the end it should cause the process
         to exit with a status code. If any of the handlers raise an exception
         the exit code should be SHUTDOWN_FAILED otherwise SUCCESS.
+
+        Daemons with work in flight, such as the message daemons, provide a
+        'drain' method. It runs before the handlers so that the work can
+        finish while the resources it needs are still available. Any
+        measurements buffered by the 'metrics' sink are sent after them.
         """
+        drain = getattr(self, "drain", None)
+        if drain is not None:
+
+            drain()
+
         dirty = False
         for handler in self._handlers[signum]:
 
@@ -125,7 +144,16 @@ class SimpleSignalManager(signal_iface.SignalManager):
                 LOG.exception("A shutdown handler failed to execute:")
                 dirty = True
 
-        del self.pid
+        flush = getattr(getattr(self, "metrics", None), "flush", None)
+        if flush is not None:
+
+            flush()
+
+        # Only clean up the pidfile if it belongs to this process. Worker
+        # processes forked from a daemon share its pidfile but do not own it.
+        if self.pid == os.getpid():
+
+            del self.pid
 
         if dirty:
 
@@ -5,7 +5,10 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import errno
 import logging
+import os
+import select
 import signal
 import sys
 import time
@@ -16,16 +19,184 @@ from ..interfaces import startstop
 
 LOG = logging.getLogger(__name__)
 
-SUCCESS_MSG = "an integer is required"
+# Seconds to wait for a process to disappear after it has been sent SIGKILL.
+KILL_TIMEOUT = 5.0
 
-if sys.version_info >= (3, 10, 0):
-    SUCCESS_MSG = "object cannot be interpreted as an integer"
+monotonic = getattr(time, "monotonic", time.time)
+
+
+class ExitWatcher(object):
+
+    """Wait for an arbitrary process to exit without repeatedly signalling it.
+
+    On Linux systems which support it a pidfd is opened when the watcher is
+    created. The pidfd becomes readable the moment the process exits and it
+    always refers to the original process even if the pid is later reused.
+    Everywhere else the watcher falls back to polling the pid with an
+    exponential backoff.
+    """
+
+    backoff_start = 0.001
+    backoff_max = 0.1
+
+    def __init__(self, pid):
+        """Initialize the watcher and open a pidfd if possible."""
+        self.pid = pid
+        self._exited = False
+        self._fd = None
+
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is None or not hasattr(select, "poll"):
+
+            return None
+
+        try:
+
+            self._fd = pidfd_open(pid)
+
+        except OSError as err:
+
+            if err.errno == errno.ESRCH:
+
+                self._exited = True
+
+    def close(self):
+        """Release the pidfd if one was opened."""
+        if self._fd is not None:
+
+            os.close(self._fd)
+            self._fd = None
+
+    def wait(self, timeout=None):
+        """Block until the process exits.
+
+        Returns True if the process exited and False if 'timeout' seconds
+        elapsed first. A timeout of None waits forever.
+        """
+        if self._exited:
+
+            return True
+
+        deadline = None
+        if timeout is not None:
+
+            deadline = monotonic() + timeout
+
+        if self._fd is not None:
+
+            self._exited = self._wait_pidfd(deadline)
+
+        else:
+
+            self._exited = self._wait_backoff(deadline)
+
+        if self._exited:
+
+            self._reap()
+
+        return self._exited
+
+    def _wait_pidfd(self, deadline):
+        """Wait for the pidfd to become readable."""
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        while True:
+
+            wait_ms = None
+            if deadline is not None:
+
+                wait_ms = max(0, int((deadline - monotonic()) * 1000))
+
+            try:
+
+                if poller.poll(wait_ms):
+
+                    return True
+
+            except (OSError, select.error) as err:
+
+                if err.args[0] != errno.EINTR:
+
+                    raise
+
+                continue
+
+            if deadline is not None and monotonic() >= deadline:
+
+                return False
+
+    def _wait_backoff(self, deadline):
+        """Poll the pid with exponentially growing sleeps."""
+        delay = self.backoff_start
+        while self._alive():
+
+            if deadline is not None:
+
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+
+                    return False
+
+                delay = min(delay, remaining)
+
+            time.sleep(delay)
+            delay = min(delay * 2, self.backoff_max)
+
+        return True
+
+    def _alive(self):
+        """Check whether the process still exists."""
+        # A child of the current process lingers as a zombie until it is
+        # reaped so it must be collected here or it will never look dead.
+        if self._reap():
+
+            return False
+
+        try:
+
+            os.kill(self.pid, 0)
+
+        except OSError as err:
+
+            if err.errno == errno.ESRCH:
+
+                return False
+
+        return True
+
+    def _reap(self):
+        """Collect the exit status if the process is a child of this one."""
+        try:
+
+            pid, _ = os.waitpid(self.pid, os.WNOHANG)
+
+        except OSError:
+
+            # Not a child of this process.
+            return False
+
+        return pid == self.pid
 
 
 class SimpleStartStopManager(startstop.StartStopManager):
 
     """Relies on other interfaces to provide functionality."""
 
+    def __init__(self, *args, **kwargs):
+        """Initialize the manager with a stop_timeout.
+
+        The stop_timeout is the number of seconds 'stop' waits after sending
+        SIGTERM before escalating to SIGKILL. The default of None waits for
+        as long as the process takes to shut down.
+
+        A 'metrics' sink may also be given to receive measurements of the
+        daemon.
+        """
+        self.stop_timeout = kwargs.pop("stop_timeout", None)
+        self.metrics = kwargs.pop("metrics", self.metrics)
+
+        super(SimpleStartStopManager, self).__init__(*args, **kwargs)
+
     def start(self):
         """Start the process with daemonization.
 
@@ -59,38 +230,65 @@ class SimpleStartStopManager(startstop.StartStopManager):
         If the process is already stopped this call should exit successfully.
         If the process cannot be stopped this call should exit with code
         STOP_FAILED.
+
+        SIGTERM is sent exactly once. If the process is still running after
+        'stop_timeout' seconds it is sent SIGKILL and the pidfile, which the
+        process had no chance to clean up, is removed.
         """
-        if self.pid is None:
+        pid = self.pid
+        if pid is None:
 
             return None
 
+        watcher = ExitWatcher(pid)
         try:
 
-            while True:
-
-                self.send(signal.SIGTERM)
-                time.sleep(0.1)
+            if not self._kill(pid, signal.SIGTERM) or watcher.wait(
+                self.stop_timeout
+            ):
 
-        except RuntimeError as err:
+                LOG.info("Succesfully stopped the process.")
+                return None
 
-            if "No such process" in str(err):
+            LOG.warning(
+                "Process {0} did not stop within {1} seconds. "
+                "Sending SIGKILL.".format(pid, self.stop_timeout)
+            )
+            if not self._kill(pid, signal.SIGKILL) or watcher.wait(
+                KILL_TIMEOUT
+            ):
 
-                LOG.info("Succesfully stopped the process.")
+                del self.pid
+                LOG.info("Succesfully killed the process.")
                 return None
 
-            LOG.exception("Failed to stop the process:")
+            LOG.error("Failed to kill process {0}.".format(pid))
             sys.exit(exit.STOP_FAILED)
 
-        except TypeError as err:
+        finally:
 
-            if SUCCESS_MSG in str(err):
+            watcher.close()
 
-                LOG.info("Succesfully stopped the process.")
-                return None
+    def _kill(self, pid, signum):
+        """Send a signal to a pid.
+
+        Returns False if the process no longer exists.
+        """
+        try:
+
+            os.kill(pid, signum)
+
+        except OSError as err:
+
+            if err.errno == errno.ESRCH:
+
+                return False
 
             LOG.exception("Failed to stop the process:")
             sys.exit(exit.STOP_FAILED)
 
+        return True
+
     def restart(self):
         """Restart a runnin daemon."""
         self.stop()
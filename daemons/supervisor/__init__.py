@@ -0,0 +1 @@
+"""Implementations of the supervisor manager interface."""
@@ -0,0 +1,396 @@
+"""Simple supervisor manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import errno
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from ..daemonize import resources
+from ..interfaces import exit
+from ..interfaces import supervisor
+from ..startstop import simple as simple_startstop
+
+
+LOG = logging.getLogger(__name__)
+
+
+class SimpleSupervisorManager(supervisor.SupervisorManager):
+
+    """Supervisor which pre-forks workers after daemonizing.
+
+    This mixin must come before the daemonize manager in the list of bases.
+    Daemonization happens once. The resulting process writes the pidfile and
+    then forks 'workers' copies of itself which go on to call 'run()' as a
+    normal daemon would. The original process stays behind to supervise.
+
+    Workers which crash, by exiting with a non-zero code or being killed by
+    a signal, are replaced, as are workers which exit with code RECYCLED.
+    If a worker slot has been respawned 'respawn_limit' times within
+    'respawn_window' seconds further respawns of that slot are delayed
+    until the window allows them.
+
+    Signals registered through 'handle()' are forwarded to every worker and
+    the handlers run there. A shutdown signal is forwarded as well and the
+    supervisor waits up to 'worker_stop_timeout' seconds for the workers to
+    exit before killing them.
+
+    Unless 'gc_freeze' is False, the supervisor disables the garbage
+    collector, runs 'preload', and then collects garbage and freezes every
+    remaining object with 'gc.freeze' right before each fork. Objects
+    created by 'preload' are then never touched by the garbage collectors of
+    the workers, which keeps their memory pages shared with the supervisor.
+    Workers set 'worker_gc_threshold', if given, as their garbage collection
+    thresholds before enabling the collector. The supervisor unfreezes its
+    own objects once the workers are forked. Only supervisor workers are
+    frozen this way, not the processes of a ProcessPoolMessageManager.
+
+    With 'spread_workers' each worker is pinned to a single CPU, taking the
+    CPUs the supervisor may use in turn.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the supervisor with worker and respawn settings."""
+        self.workers = kwargs.pop("workers", multiprocessing.cpu_count())
+        self.respawn_limit = kwargs.pop("respawn_limit", 5)
+        self.respawn_window = kwargs.pop("respawn_window", 60)
+        self.worker_stop_timeout = kwargs.pop("worker_stop_timeout", 10)
+        self.gc_freeze = kwargs.pop("gc_freeze", True)
+        self.worker_gc_threshold = kwargs.pop("worker_gc_threshold", None)
+        self.spread_workers = kwargs.pop("spread_workers", False)
+        self.worker_index = None
+        self._children = {}
+        self._spawns = collections.defaultdict(collections.deque)
+        self._delayed = {}
+
+        super(SimpleSupervisorManager, self).__init__(*args, **kwargs)
+
+    def daemonize(self):
+        """Daemonize once and then fork the workers.
+
+        This only returns within a worker. The supervisor exits once there
+        are no workers left.
+        """
+        super(SimpleSupervisorManager, self).daemonize()
+
+        if self._freezes():
+
+            gc.disable()
+
+        self.preload()
+        for index in range(self.workers):
+
+            if self.spawn_worker(index) == 0:
+
+                return None
+
+        self.thaw()
+        self.supervise()
+        if self.worker_index is not None:
+
+            return None
+
+        LOG.info("All workers have exited.")
+        del self.pid
+        sys.exit(exit.SUCCESS)
+
+    def freeze(self):
+        """Collect garbage and move the survivors out of the collector's reach.
+
+        This does nothing if 'gc_freeze' is False or 'gc.freeze' is missing.
+        """
+        if not self._freezes():
+
+            return None
+
+        gc.collect()
+        gc.freeze()
+        LOG.debug("Froze {0} objects.".format(gc.get_freeze_count()))
+
+    def thaw(self):
+        """Unfreeze the supervisor's objects and enable the collector."""
+        if not self._freezes():
+
+            return None
+
+        gc.unfreeze()
+        gc.enable()
+
+    def _freezes(self):
+        """Check whether the heap is frozen before forking."""
+        return self.gc_freeze and hasattr(gc, "freeze")
+
+    def spawn_worker(self, index):
+        """Fork a worker process to fill the given worker slot.
+
+        If the fork fails the attempt counts towards the slot's respawn limit
+        and the slot is retried by 'supervise'.
+        """
+        # Signals are blocked until the new worker is recorded. Otherwise a
+        # shutdown could run in the middle of the fork, miss the new worker
+        # and have its exit swallowed by the interpreter's at-fork hooks.
+        blocked = self._block_signals()
+        enabled = gc.isenabled()
+        self.freeze()
+        try:
+
+            pid = os.fork()
+
+        except OSError as err:
+
+            LOG.exception(
+                "Failed to fork worker {0}: {1} ({2})".format(
+                    index, err.errno, err.strerror
+                )
+            )
+            now = simple_startstop.monotonic()
+            self._spawns[index].append(now)
+            due = self._respawn_due(index)
+            self._delayed[index] = now if due is None else due
+            if enabled:
+
+                self.thaw()
+
+            self._unblock_signals(blocked)
+            return None
+
+        if pid == 0:
+
+            self.worker_index = index
+            self._children = {}
+            self._delayed = {}
+            if self.worker_gc_threshold is not None:
+
+                gc.set_threshold(*self.worker_gc_threshold)
+
+            if self._freezes():
+
+                gc.enable()
+
+            if self.spread_workers:
+
+                self._pin_worker(index)
+
+            self._unblock_signals(blocked)
+            return 0
+
+        if enabled:
+
+            self.thaw()
+
+        self._children[pid] = index
+        self._spawns[index].append(simple_startstop.monotonic())
+        self._unblock_signals(blocked)
+        LOG.info("Started worker {0} with pid {1}.".format(index, pid))
+        return pid
+
+    def _pin_worker(self, index):
+        """Pin the current worker to its share of the CPUs."""
+        try:
+
+            resources.set_affinity(resources.spread_cpus(index))
+
+        except OSError:
+
+            LOG.exception("Failed to pin worker {0} to a CPU.".format(index))
+
+    def _block_signals(self):
+        """Block every handled signal and return the signals blocked."""
+        if not hasattr(signal, "pthread_sigmask"):
+
+            return None
+
+        signums = set(self.kill_signals) | set(self._handlers)
+        signal.pthread_sigmask(signal.SIG_BLOCK, signums)
+        return signums
+
+    def _unblock_signals(self, signums):
+        """Unblock signals blocked by '_block_signals'."""
+        if signums:
+
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, signums)
+
+    def supervise(self):
+        """Watch the workers and replace any which crash."""
+        delayed = self._delayed
+        while self._children or delayed:
+
+            now = simple_startstop.monotonic()
+            for index, due in list(delayed.items()):
+
+                if due <= now:
+
+                    del delayed[index]
+                    if self.spawn_worker(index) == 0:
+
+                        return None
+
+            options = os.WNOHANG if delayed else 0
+            try:
+
+                pid, status = os.waitpid(-1, options)
+
+            except OSError as err:
+
+                if err.errno != errno.ECHILD:
+
+                    raise
+
+                pid, status = 0, 0
+
+            if pid == 0:
+
+                if delayed:
+
+                    time.sleep(max(0, min(delayed.values()) - now))
+
+                continue
+
+            index = self._children.pop(pid, None)
+            if index is None:
+
+                continue
+
+            if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+
+                LOG.info("Worker {0} exited.".format(index))
+                continue
+
+            if os.WIFEXITED(status) and os.WEXITSTATUS(status) == (
+                exit.RECYCLED
+            ):
+
+                LOG.info("Worker {0} was recycled.".format(index))
+
+            else:
+
+                LOG.error(
+                    "Worker {0} with pid {1} crashed with status {2}.".format(
+                        index, pid, status
+                    )
+                )
+
+            due = self._respawn_due(index)
+            if due is not None:
+
+                LOG.warning(
+                    "Worker {0} is respawning too quickly. Delaying for "
+                    "{1:.1f} seconds.".format(
+                        index, due - simple_startstop.monotonic()
+                    )
+                )
+                delayed[index] = due
+                continue
+
+            if self.spawn_worker(index) == 0:
+
+                return None
+
+    def _respawn_due(self, index):
+        """Get the time a slot may respawn or None if it may respawn now."""
+        spawns = self._spawns[index]
+        cutoff = simple_startstop.monotonic() - self.respawn_window
+        while spawns and spawns[0] < cutoff:
+
+            spawns.popleft()
+
+        if len(spawns) < self.respawn_limit:
+
+            return None
+
+        return spawns[0] + self.respawn_window
+
+    def stop(self):
+        """Stop the daemonized process.
+
+        A worker whose run method fails exits on its own to be respawned
+        rather than stopping the whole daemon.
+        """
+        if self.worker_index is not None:
+
+            return None
+
+        return super(SimpleSupervisorManager, self).stop()
+
+    def _handle_signals(self, signum, frame):
+        """Forward signals from the supervisor to the workers."""
+        if self.worker_index is not None:
+
+            return super(SimpleSupervisorManager, self)._handle_signals(
+                signum, frame
+            )
+
+        if signum in self.kill_signals:
+
+            return self.shutdown(signum)
+
+        self._signal_workers(signum)
+
+    def shutdown(self, signum):
+        """Stop all workers and then exit the supervisor.
+
+        Workers run the shutdown handlers themselves. The supervisor exits
+        with SHUTDOWN_FAILED if any worker has to be killed.
+        """
+        if self.worker_index is not None:
+
+            return super(SimpleSupervisorManager, self).shutdown(signum)
+
+        watchers = dict(
+            (pid, simple_startstop.ExitWatcher(pid)) for pid in self._children
+        )
+        self._signal_workers(signum)
+
+        deadline = simple_startstop.monotonic() + self.worker_stop_timeout
+        dirty = False
+        for pid, watcher in watchers.items():
+
+            remaining = max(0, deadline - simple_startstop.monotonic())
+            if not watcher.wait(remaining):
+
+                LOG.error(
+                    "Worker {0} did not stop. Sending SIGKILL.".format(pid)
+                )
+                self._signal_worker(pid, signal.SIGKILL)
+                watcher.wait()
+                dirty = True
+
+            watcher.close()
+            self._children.pop(pid, None)
+
+        del self.pid
+
+        if dirty:
+
+            sys.exit(exit.SHUTDOWN_FAILED)
+            return None
+
+        sys.exit(exit.SUCCESS)
+        return None
+
+    def _signal_workers(self, signum):
+        """Send a signal to every worker."""
+        for pid in list(self._children):
+
+            self._signal_worker(pid, signum)
+
+    def _signal_worker(self, pid, signum):
+        """Send a signal to a worker which may have already exited."""
+        try:
+
+            os.kill(pid, signum)
+
+        except OSError as err:
+
+            if err.errno != errno.ESRCH:
+
+                raise
@@ -0,0 +1 @@
+"""Implementations of the watchdog manager interface."""
@@ -0,0 +1,246 @@
+"""Simple watchdog manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import atexit
+import errno
+import logging
+import mmap
+import os
+import signal
+import struct
+import sys
+import threading
+import time
+import traceback
+
+from ..interfaces import watchdog
+
+
+LOG = logging.getLogger(__name__)
+
+# The heartbeat file holds the monotonic time of the last heartbeat followed
+# by the number of heartbeats so far.
+HEARTBEAT = struct.Struct(str("<dQ"))
+
+monotonic = getattr(time, "monotonic", time.time)
+
+
+def heartbeat_path(pidfile, worker_index=None):
+    """Get the heartbeat file of a daemon or one of its workers."""
+    if worker_index is None:
+
+        return "{0}.heartbeat".format(pidfile)
+
+    return "{0}.{1}.heartbeat".format(pidfile, worker_index)
+
+
+def read_heartbeat(path):
+    """Get the time and count of the last heartbeat recorded in a file.
+
+    Returns None if the file does not hold a heartbeat.
+    """
+    try:
+
+        with open(path, "rb") as heartbeat:
+
+            data = heartbeat.read(HEARTBEAT.size)
+
+    except (IOError, OSError):
+
+        return None
+
+    if len(data) < HEARTBEAT.size:
+
+        return None
+
+    return HEARTBEAT.unpack(data)
+
+
+def heartbeat_age(pidfile, worker_index=None):
+    """Get the number of seconds since the last heartbeat of a daemon.
+
+    Heartbeats are recorded with the system wide monotonic clock so this
+    may be called from any process on the same host. Returns None if the
+    daemon has no heartbeat file.
+    """
+    heartbeat = read_heartbeat(heartbeat_path(pidfile, worker_index))
+    if heartbeat is None:
+
+        return None
+
+    return monotonic() - heartbeat[0]
+
+
+def format_stacks():
+    """Get the current stack of every thread in this process."""
+    names = dict(
+        (thread.ident, thread.name) for thread in threading.enumerate()
+    )
+    stacks = []
+    for ident, frame in sys._current_frames().items():
+
+        stacks.append("Thread {0} ({1}):\n{2}".format(
+            names.get(ident, "unknown"),
+            ident,
+            "".join(traceback.format_stack(frame)),
+        ))
+
+    return "\n".join(stacks)
+
+
+class SimpleWatchdogManager(watchdog.WatchdogManager):
+
+    """Watchdog which replaces the daemon when its heartbeat stops.
+
+    This mixin must come before the other daemon bases. Step daemons record
+    a heartbeat after every step. Each heartbeat is written to a small
+    memory mapped file next to the pidfile so that other processes can
+    check it with 'heartbeat_age'. A thread within the daemon checks the
+    heartbeat every 'watchdog_interval' seconds. If there has been no
+    heartbeat for 'watchdog_timeout' seconds the stack of every thread is
+    logged and the 'watchdog_action' is taken:
+
+        restart: replace the process with 'reexec' if the daemon has a
+            reload manager and otherwise kill it.
+        kill: remove the pidfile and kill the process with SIGKILL so that
+            whatever started the daemon, such as a supervisor, replaces it.
+        None: only log the stacks.
+
+    Workers of a supervised daemon are killed rather than re-executed so
+    that the supervisor replaces them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the watchdog with a timeout, interval, and action."""
+        self.watchdog_timeout = kwargs.pop("watchdog_timeout", 60)
+        self.watchdog_interval = kwargs.pop("watchdog_interval", None)
+        self.watchdog_action = kwargs.pop("watchdog_action", "restart")
+        self._beats = 0
+        self._heartbeat = None
+        self._watchdog_pid = None
+        self._watchdog_stop = None
+
+        super(SimpleWatchdogManager, self).__init__(*args, **kwargs)
+
+    @property
+    def heartbeat_file(self):
+        """Get the path of the heartbeat file for this process."""
+        worker_index = getattr(self, "worker_index", None)
+        return heartbeat_path(self.pidfile, worker_index)
+
+    def run(self):
+        """Start the watchdog before running the daemon."""
+        self.start_watchdog()
+        return super(SimpleWatchdogManager, self).run()
+
+    def checkpoint(self):
+        """Record a heartbeat after every step."""
+        self.heartbeat()
+        super(SimpleWatchdogManager, self).checkpoint()
+
+    def heartbeat(self):
+        """Record that the daemon is making progress."""
+        if self._watchdog_pid != os.getpid():
+
+            self.start_watchdog()
+
+        self._beats += 1
+        HEARTBEAT.pack_into(self._heartbeat, 0, monotonic(), self._beats)
+
+    def start_watchdog(self):
+        """Begin watching the heartbeat of the current process.
+
+        This does nothing if the process is already watched.
+        """
+        if self._watchdog_pid == os.getpid():
+
+            return None
+
+        with open(self.heartbeat_file, "w+b") as heartbeat:
+
+            heartbeat.truncate(HEARTBEAT.size)
+            self._heartbeat = mmap.mmap(heartbeat.fileno(), HEARTBEAT.size)
+
+        self._beats = 0
+        HEARTBEAT.pack_into(self._heartbeat, 0, monotonic(), self._beats)
+        self._watchdog_pid = os.getpid()
+        self._watchdog_stop = threading.Event()
+        thread = threading.Thread(target=self._watch, name="watchdog")
+        thread.daemon = True
+        thread.start()
+        atexit.register(self.stop_watchdog)
+
+    def stop_watchdog(self):
+        """Stop watching the heartbeat and remove the heartbeat file."""
+        if self._watchdog_pid != os.getpid():
+
+            return None
+
+        self._watchdog_pid = None
+        self._watchdog_stop.set()
+        try:
+
+            os.remove(self.heartbeat_file)
+
+        except OSError as err:
+
+            if err.errno != errno.ENOENT:
+
+                raise
+
+    def hung(self, age):
+        """Log every stack and take the watchdog_action."""
+        LOG.critical(
+            "No heartbeat for {0:.1f} seconds. Thread stacks:\n{1}".format(
+                age, format_stacks()
+            )
+        )
+        if self.watchdog_action is None:
+
+            return None
+
+        worker = getattr(self, "worker_index", None) is not None
+        if (
+            self.watchdog_action == "restart"
+            and not worker
+            and hasattr(self, "reexec")
+        ):
+
+            LOG.critical("Replacing the hung process.")
+            self.reexec()
+
+        LOG.critical("Killing the hung process.")
+        if not worker and self.pid == os.getpid():
+
+            del self.pid
+
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    def _watch(self):
+        """Check the heartbeat until the watchdog is stopped.
+
+        The action is taken once for each stall of the heartbeat.
+        """
+        stop = self._watchdog_stop
+        interval = self.watchdog_interval or self.watchdog_timeout / 4
+        handled = None
+        while not stop.wait(interval):
+
+            last, beats = HEARTBEAT.unpack_from(self._heartbeat, 0)
+            age = monotonic() - last
+            if age < self.watchdog_timeout or beats == handled:
+
+                continue
+
+            handled = beats
+            try:
+
+                self.hung(age)
+
+            except Exception:
+
+                LOG.exception("The watchdog failed to handle a hang.")
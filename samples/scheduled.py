@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+"""Sample daemon which runs jobs on a schedule."""
+
+import logging
+import os
+import sys
+
+from daemons.prefab import scheduled
+
+
+def heartbeat():
+    """Log a message every five seconds."""
+    logging.info("Still running.")
+
+
+def report():
+    """Log a message at the start of every hour."""
+    logging.info("Another hour has passed.")
+
+
+if __name__ == "__main__":
+
+    action = sys.argv[1]
+
+    logging.basicConfig(filename="daemon.log", level=logging.DEBUG)
+    pidfile = os.path.join(os.getcwd(), "daemon.pid")
+    d = scheduled.ScheduledDaemon(pidfile=pidfile)
+    d.every(5, heartbeat)
+    d.cron("0 * * * *", report)
+
+    if action == "start":
+
+        d.start()
+
+    elif action == "stop":
+
+        d.stop()
+
+    elif action == "restart":
+
+        d.restart()
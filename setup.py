@@ -16,4 +16,9 @@ setup(
     classifiers=[],
     packages=find_packages(exclude=["tests", "build", "dist", "docs"]),
     install_requires=[],
+    entry_points={
+        "console_scripts": [
+            "daemons=daemons.fleet:main",
+        ],
+    },
 )
@@ -0,0 +1,56 @@
+"""Fixtures shared by the test suites which run real daemons."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import time
+
+import pytest
+
+
+# The checkout which daemon scripts add to their path to import daemons.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def write_script(tmpdir):
+    """Get a function which writes a daemon script from a template.
+
+    The template is formatted with the given fields along with 'root', the
+    directory the script must add to its path to import daemons. Returns
+    the path of the script.
+    """
+
+    def write_script(template, **fields):
+
+        script = tmpdir.join("daemon.py")
+        script.write(template.format(root=ROOT, **fields))
+        return str(script)
+
+    return write_script
+
+
+@pytest.fixture
+def wait_for():
+    """Get a function which polls until a predicate is true.
+
+    The test fails if the predicate is still false after the timeout.
+    """
+
+    def wait_for(predicate, timeout=10):
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+
+            if predicate():
+
+                return None
+
+            time.sleep(0.01)
+
+        pytest.fail("Timed out waiting for the condition.")
+
+    return wait_for
@@ -0,0 +1,116 @@
+"""Test suite for the simple control manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from daemons.control import simple as simple_control
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+
+
+DAEMON = """
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.control import simple as control
+from daemons.prefab import threadd
+
+
+class Daemon(control.SimpleControlManager, threadd.ThreadPoolDaemon):
+
+    def get_message(self):
+        return 1
+
+    def handle_message(self, message):
+        time.sleep(0.01)
+
+
+Daemon(pidfile={pidfile!r}, pool_size=4, idle_time=0.05).start()
+"""
+
+
+@pytest.fixture
+def daemon(tmpdir, write_script):
+    """Start a daemon with a control socket and stop it after the test."""
+    pidfile = str(tmpdir.join("test.pid"))
+    script = write_script(DAEMON, pidfile=pidfile)
+    assert subprocess.call([sys.executable, script]) == exit.SUCCESS
+    yield pidfile, simple_control.control_path(pidfile)
+    Controller(pidfile=pidfile, stop_timeout=2).stop()
+
+
+def test_status_and_stats(daemon):
+    """Test that the daemon reports its identity and counters."""
+    pidfile, path = daemon
+    status = simple_control.request(path, "status")
+    assert status["pid"] == Controller(pidfile=pidfile).pid
+    assert status["pidfile"] == pidfile
+    assert status["draining"] is False
+
+    stats = simple_control.request(path, "stats")
+    assert stats["pool_size"] == 4
+    assert stats["messages_dispatched"] >= stats["messages_completed"]
+
+
+def test_set_changes_settings(daemon):
+    """Test that the pool size and idle time change at runtime."""
+    _, path = daemon
+    result = simple_control.request(path, "set", pool_size=8, idle_time=0.5)
+    assert result == {"pool_size": 8, "idle_time": 0.5}
+    assert simple_control.request(path, "stats")["pool_size"] == 8
+
+    with pytest.raises(RuntimeError):
+
+        simple_control.request(path, "set", pool_size=0)
+
+    with pytest.raises(RuntimeError):
+
+        simple_control.request(path, "set", batch_size=2)
+
+    assert simple_control.request(path, "stats")["pool_size"] == 8
+
+
+def test_drain_and_stacks(daemon):
+    """Test that the daemon drains on request and dumps its stacks."""
+    _, path = daemon
+    assert "_serve_control" in simple_control.request(path, "stacks")
+    assert simple_control.request(path, "drain") is True
+    assert simple_control.request(path, "status")["draining"] is True
+    stats = simple_control.request(path, "stats")
+    assert stats["messages_inflight"] == 0
+
+
+def test_rejects_unknown_requests(daemon):
+    """Test that bad requests get an error rather than closing the socket."""
+    _, path = daemon
+    with pytest.raises(RuntimeError) as err:
+
+        simple_control.request(path, "launch")
+
+    assert "Unknown command" in "{0}".format(err.value)
+
+
+def test_command_line(daemon, capsys):
+    """Test that a command can be sent from the command line."""
+    pidfile, _ = daemon
+    assert simple_control.main([pidfile, "set", "pool_size=6"]) == 0
+    assert json.loads(capsys.readouterr().out)["pool_size"] == 6
+
+
+def test_socket_removed_on_stop(daemon):
+    """Test that the control socket is removed when the daemon stops."""
+    pidfile, path = daemon
+    assert os.path.exists(path)
+    Controller(pidfile=pidfile, stop_timeout=2).stop()
+    assert not os.path.exists(path)
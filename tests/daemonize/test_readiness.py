@@ -0,0 +1,127 @@
+"""Test suite for readiness notification by the daemonize managers."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from daemons.daemonize import noop
+from daemons.daemonize import notify
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+from daemons.pid import simple as simple_pid
+
+
+DAEMON = """
+import os
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import step
+
+
+class Daemon(step.StepDaemon):
+
+    warm = False
+
+    def step(self):
+        if not self.warm:
+            self.warm = True
+            time.sleep({delay!r})
+            if {fail!r}:
+                raise RuntimeError("Failed to warm up.")
+            open({marker!r}, "w").close()
+            self.notify_ready()
+        time.sleep(0.05)
+
+
+Daemon(
+    pidfile={pidfile!r}, manual_ready=True, ready_timeout={timeout!r}
+).start()
+"""
+
+
+class NoopTest(simple_pid.SimplePidManager, noop.NoopDaemonizeManager):
+
+    """Daemon which reports ready without daemonizing."""
+
+
+@pytest.fixture
+def start(tmpdir, write_script):
+    """Get a function which starts a daemon and returns its exit code."""
+    pidfile = str(tmpdir.join("test.pid"))
+    marker = str(tmpdir.join("ready"))
+
+    def start(delay=0.2, fail=False, timeout=None, env=None):
+
+        script = write_script(
+            DAEMON,
+            delay=delay,
+            fail=fail,
+            marker=marker,
+            pidfile=pidfile,
+            timeout=timeout,
+        )
+        return subprocess.call([sys.executable, script], env=env)
+
+    start.marker = marker
+    yield start
+    Controller(pidfile=pidfile).stop()
+
+
+def test_start_waits_for_ready(start):
+    """Test that the original process exits once the daemon is ready."""
+    started = time.time()
+    assert start(delay=0.3) == exit.SUCCESS
+    assert time.time() - started >= 0.3
+    assert os.path.exists(start.marker)
+
+
+def test_start_fails_if_daemon_exits(start):
+    """Test that a daemon which dies while warming up fails the start."""
+    assert start(fail=True) == exit.READY_FAILED
+    assert not os.path.exists(start.marker)
+
+
+def test_start_times_out(start):
+    """Test that the start fails if the daemon is not ready in time."""
+    assert start(delay=2, timeout=0.2) == exit.READY_TIMEOUT
+
+
+def test_notifies_systemd(start, tmpdir):
+    """Test that readiness is sent to the NOTIFY_SOCKET."""
+    address = str(tmpdir.join("notify.sock"))
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    listener.bind(address)
+    listener.settimeout(5)
+    env = dict(os.environ)
+    env[notify.NOTIFY_SOCKET_ENV] = address
+    assert start(env=env) == exit.SUCCESS
+    message = listener.recv(1024).decode("utf-8")
+    listener.close()
+    lines = message.split("\n")
+    assert lines[0] == "READY=1"
+    assert lines[1].startswith("MAINPID=")
+
+
+def test_notifies_abstract_socket(tmpdir, monkeypatch):
+    """Test that an '@' address is sent to the abstract namespace."""
+    name = "daemons-test-{0}".format(os.getpid())
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    listener.bind("\0" + name)
+    listener.settimeout(5)
+    monkeypatch.setenv(notify.NOTIFY_SOCKET_ENV, "@" + name)
+    NoopTest(pidfile=str(tmpdir.join("test.pid"))).daemonize()
+    message = listener.recv(1024).decode("utf-8")
+    listener.close()
+    assert message == "READY=1\nMAINPID={0}".format(os.getpid())
@@ -0,0 +1,139 @@
+"""Test suite for the affinity, priority, and resource limit settings."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import os
+import platform
+import resource
+import struct
+import subprocess
+import sys
+import time
+
+import pytest
+
+from daemons.daemonize import resources
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+
+
+DAEMON = """
+import json
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.daemonize import resources
+from daemons.prefab import step
+
+
+class Daemon(step.StepDaemon):
+
+    def step(self):
+        if not os.path.exists({state!r}):
+            with open({state!r} + ".tmp", "w") as state:
+                json.dump({{
+                    "affinity": sorted(os.sched_getaffinity(0)),
+                    "nice": os.getpriority(os.PRIO_PROCESS, 0),
+                    "ioprio": resources.get_ioprio(),
+                    "nofile": resource.getrlimit(resource.RLIMIT_NOFILE)[0],
+                }}, state)
+            os.rename({state!r} + ".tmp", {state!r})
+        time.sleep(0.05)
+
+
+Daemon(pidfile={pidfile!r}, **{settings!r}).start()
+"""
+
+
+@pytest.fixture
+def start(tmpdir, write_script):
+    """Get a function which starts a daemon with some settings."""
+    pidfile = str(tmpdir.join("test.pid"))
+    state = str(tmpdir.join("state.json"))
+
+    def start(**settings):
+
+        script = write_script(
+            DAEMON,
+            pidfile=pidfile,
+            settings=settings,
+            state=state,
+        )
+        return subprocess.call([sys.executable, script])
+
+    def read():
+
+        deadline = time.time() + 5
+        while not os.path.exists(state) and time.time() < deadline:
+
+            time.sleep(0.05)
+
+        with open(state) as applied:
+
+            return json.load(applied)
+
+    start.read = read
+    yield start
+    Controller(pidfile=pidfile).stop()
+
+
+def test_applies_settings(start):
+    """Test that the daemon applies its settings once detached."""
+    cpu = min(os.sched_getaffinity(0))
+    nofile = resource.getrlimit(resource.RLIMIT_NOFILE)[0] - 1
+    assert start(
+        cpu_affinity=[cpu],
+        nice=os.getpriority(os.PRIO_PROCESS, 0) + 5,
+        ioprio=["best-effort", 6],
+        rlimits={"nofile": nofile},
+    ) == exit.SUCCESS
+    applied = start.read()
+    assert applied["affinity"] == [cpu]
+    assert applied["nice"] == os.getpriority(os.PRIO_PROCESS, 0) + 5
+    assert applied["ioprio"] == ["best-effort", 6]
+    assert applied["nofile"] == nofile
+
+
+def test_fails_on_bad_settings(start):
+    """Test that a daemon which cannot apply its settings is not ready."""
+    assert start(rlimits={"bogus": 1}) == exit.READY_FAILED
+
+
+def test_spreads_cpus(monkeypatch):
+    """Test that workers take the available CPUs in turn."""
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {5, 1, 3})
+    assert [resources.spread_cpus(index) for index in range(4)] == [
+        [1], [3], [5], [1]
+    ]
+
+
+def test_rejects_bad_ioprio():
+    """Test that unknown io classes and levels are refused."""
+    with pytest.raises(ValueError):
+
+        resources.set_ioprio("fastest")
+
+    with pytest.raises(ValueError):
+
+        resources.set_ioprio("best-effort", 8)
+
+
+@pytest.mark.parametrize("pointer,numbers", [(8, (251, 252)), (4, (289, 290))])
+def test_ioprio_syscalls_follow_the_interpreter(monkeypatch, pointer, numbers):
+    """Test that a 32-bit interpreter on a 64-bit kernel gets its own calls."""
+    calcsize = struct.calcsize
+    monkeypatch.setattr(platform, "machine", lambda: "x86_64")
+    monkeypatch.setattr(
+        struct,
+        "calcsize",
+        lambda fmt: pointer if fmt == "P" else calcsize(fmt),
+    )
+    assert resources.ioprio_syscalls() == numbers
@@ -0,0 +1,79 @@
+"""Test suite for the spawn daemonize manager."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+
+
+DAEMON = """
+import os
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.daemonize import spawn
+from daemons.pid import simple as simple_pid
+from daemons.signal import simple as simple_signal
+from daemons.startstop import simple as simple_startstop
+
+
+class Daemon(
+    simple_pid.SimplePidManager,
+    simple_signal.SimpleSignalManager,
+    spawn.SpawnDaemonizeManager,
+    simple_startstop.SimpleStartStopStepManager,
+):
+
+    def step(self):
+        time.sleep(0.05)
+
+
+with open({launches!r}, "a") as launches:
+    launches.write("{{0}}\\n".format(os.getpid()))
+
+Daemon(pidfile={pidfile!r}).start()
+"""
+
+
+@pytest.fixture
+def paths(tmpdir, write_script):
+    """Write the daemon script and stop the daemon after the test."""
+    pidfile = str(tmpdir.join("test.pid"))
+    launches = str(tmpdir.join("launches"))
+    script = write_script(DAEMON, launches=launches, pidfile=pidfile)
+    yield script, pidfile, launches
+    Controller(pidfile=pidfile).stop()
+
+
+def test_spawns_daemon_in_new_session(paths):
+    """Test that the daemon is a new interpreter in its own session."""
+    script, pidfile, launches = paths
+    assert subprocess.call([sys.executable, script]) == exit.SUCCESS
+    pid = Controller(pidfile=pidfile).pid
+    assert pid is not None
+    assert os.getsid(pid) == pid
+    with open(launches) as f:
+
+        launcher, daemon = [int(line) for line in f.read().split()]
+
+    assert daemon == pid
+    assert launcher != pid
+
+
+def test_stops_spawned_daemon(paths):
+    """Test that a spawned daemon handles signals and removes its pidfile."""
+    script, pidfile, _ = paths
+    assert subprocess.call([sys.executable, script]) == exit.SUCCESS
+    Controller(pidfile=pidfile).stop()
+    assert not os.path.exists(pidfile)
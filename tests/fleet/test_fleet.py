@@ -0,0 +1,98 @@
+"""Test suite for controlling many daemons at once."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import os
+import sys
+
+import pytest
+
+from daemons import fleet
+
+
+DAEMON = """
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import step
+
+
+class Daemon(step.StepDaemon):
+
+    def step(self):
+        time.sleep(0.05)
+
+
+Daemon(pidfile=sys.argv[1]).start()
+"""
+
+
+@pytest.fixture
+def daemons(tmpdir, write_script):
+    """Get a fleet of three daemons and stop them after the test."""
+    path = tmpdir.mkdir("run")
+    script = write_script(DAEMON)
+    pidfiles = [str(path.join("{0}.pid".format(i))) for i in range(3)]
+    f = fleet.Fleet(
+        pidfiles,
+        command="{0} {1} {{pidfile}}".format(sys.executable, script),
+    )
+    yield f
+    f.stop()
+
+
+def test_finds_pidfiles_in_directories(tmpdir):
+    """Test that directories are expanded into the pidfiles they contain."""
+    for name in ("a.pid", "b.pid", ".a.pid.tmp", "c.log"):
+
+        tmpdir.join(name).write("1\n")
+
+    assert fleet.find_pidfiles([str(tmpdir), str(tmpdir.join("a.pid"))]) == [
+        str(tmpdir.join("a.pid")), str(tmpdir.join("b.pid"))
+    ]
+
+
+def test_starts_and_stops_all_daemons(daemons):
+    """Test that every daemon is started and stopped."""
+    started = daemons.start()
+    assert sorted(r["pidfile"] for r in started) == daemons.pidfiles
+    assert all(r["ok"] and r["pid"] for r in started)
+
+    status = dict((r["pidfile"], r["pid"]) for r in daemons.status())
+    assert status == dict((r["pidfile"], r["pid"]) for r in started)
+
+    stopped = daemons.stop()
+    assert all(r["ok"] and r["pid"] is None for r in stopped)
+    assert not any(os.path.exists(pidfile) for pidfile in daemons.pidfiles)
+
+
+def test_restart_replaces_daemons(daemons):
+    """Test that a restart leaves new processes running."""
+    before = dict((r["pidfile"], r["pid"]) for r in daemons.start())
+    after = dict((r["pidfile"], r["pid"]) for r in daemons.restart())
+    assert all(after.values())
+    assert all(after[pidfile] != before[pidfile] for pidfile in before)
+
+
+def test_start_without_command_fails(tmpdir):
+    """Test that starting a daemon without a command reports an error."""
+    results = fleet.Fleet([str(tmpdir.join("a.pid"))]).start()
+    assert len(results) == 1
+    assert not results[0]["ok"]
+    assert "command" in results[0]["error"]
+
+
+def test_command_prints_json(daemons, capsys):
+    """Test that the command prints one JSON result per daemon."""
+    daemons.start()
+    code = fleet.main(["status"] + daemons.pidfiles)
+    lines = capsys.readouterr().out.splitlines()
+    assert code == 0
+    assert len(lines) == 3
+    assert all(json.loads(line)["pid"] for line in lines)
@@ -0,0 +1,161 @@
+"""Test suite for the simple log manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+from daemons.interfaces import startstop
+from daemons.log import simple as simple_log
+from daemons.signal import simple as simple_signal
+
+
+DAEMON = """
+import logging
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.log import simple as simple_log
+from daemons.prefab import step
+
+
+class Daemon(simple_log.SimpleLogManager, step.StepDaemon):
+
+    def step(self):
+        logging.info("Logged a step.")
+        print("Printed a step.")
+        sys.stdout.flush()
+        time.sleep(0.05)
+
+
+logging.basicConfig(filename={logfile!r}, level=logging.INFO)
+Daemon(pidfile={pidfile!r}, stdout={outfile!r}).start()
+"""
+
+
+class LogTest(
+    simple_log.SimpleLogManager,
+    simple_signal.SimpleSignalManager,
+    startstop.StartStopStepManager,
+):
+
+    """Log manager for testing."""
+
+
+class Blocked(logging.Handler):
+
+    """Handler which holds every record until it is released."""
+
+    def __init__(self):
+        """Initialize the handler closed."""
+        logging.Handler.__init__(self)
+        self.records = []
+        self.released = False
+
+    def emit(self, record):
+        """Wait to be released and then keep the record."""
+        while not self.released:
+
+            time.sleep(0.01)
+
+        self.records.append(record.getMessage())
+
+
+@pytest.fixture
+def logger():
+    """Get the root logger with a blocked handler and restore it after."""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    handler = Blocked()
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+    hup = signal.getsignal(signal.SIGHUP)
+    yield handler
+    handler.released = True
+    root.handlers = handlers
+    root.setLevel(level)
+    signal.signal(signal.SIGHUP, hup)
+
+
+def contains(path, text):
+    """Check whether a file exists and contains some text."""
+    return os.path.exists(path) and text in open(path).read()
+
+
+def test_drops_records_when_full(logger):
+    """Test that records are dropped and then flushed on stop."""
+    manager = LogTest(log_queue_size=2)
+    manager.start_logging()
+    assert logger not in logging.getLogger().handlers
+    for index in range(10):
+
+        logging.info("Record %s.", index)
+
+    assert manager.log_dropped >= 7
+    logger.released = True
+    manager.stop_logging()
+    assert logger in logging.getLogger().handlers
+    assert manager._log_handler not in logging.getLogger().handlers
+    assert len(logger.records) == 11 - manager.log_dropped
+    assert logger.records[0] == "Record 0."
+    assert logger.records[-1].startswith("Dropped")
+
+
+def test_rejects_unknown_policy(logger):
+    """Test that only the known policies are accepted."""
+    with pytest.raises(ValueError):
+
+        LogTest(log_policy="sometimes")
+
+
+def test_reopens_at_checkpoint(logger, tmpdir):
+    """Test that the reopen signal only reopens the files at a checkpoint."""
+    path = str(tmpdir.join("test.log"))
+    handler = logging.FileHandler(path)
+    logging.getLogger().addHandler(handler)
+    manager = LogTest()
+    os.rename(path, path + ".1")
+    os.kill(os.getpid(), signal.SIGHUP)
+    assert not os.path.exists(path)
+
+    manager.checkpoint()
+    handler.close()
+    assert os.path.exists(path)
+
+
+def test_reopens_rotated_files(tmpdir, write_script, wait_for):
+    """Test that the daemon writes to new files after a reopen signal."""
+    pidfile = str(tmpdir.join("test.pid"))
+    logfile = str(tmpdir.join("test.log"))
+    outfile = str(tmpdir.join("test.out"))
+    script = write_script(
+        DAEMON, logfile=logfile, outfile=outfile, pidfile=pidfile
+    )
+    assert subprocess.call([sys.executable, script]) == exit.SUCCESS
+    controller = Controller(pidfile=pidfile, stop_timeout=5)
+    try:
+
+        wait_for(lambda: contains(logfile, "Logged a step."))
+        wait_for(lambda: contains(outfile, "Printed a step."))
+        os.rename(logfile, logfile + ".1")
+        os.rename(outfile, outfile + ".1")
+        os.kill(controller.pid, signal.SIGHUP)
+        wait_for(lambda: contains(logfile, "Logged a step."))
+        wait_for(lambda: contains(outfile, "Printed a step."))
+
+    finally:
+
+        controller.stop()
@@ -0,0 +1,111 @@
+"""Test suite for the asyncio message manager."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import asyncio
+import os
+import signal
+
+from daemons.message import asyncio as asynciod
+from daemons.signal import asyncio as asyncio_signal
+
+
+class AsyncioTest(
+    asyncio_signal.AsyncioSignalManager,
+    asynciod.AsyncioMessageManager,
+):
+
+    """Asyncio manager for testing."""
+
+    def __init__(self, messages, *args, **kwargs):
+        """Initialize with a list of messages to hand out."""
+        super(AsyncioTest, self).__init__(*args, **kwargs)
+        self.messages = list(messages)
+        self.handled = []
+        self.running = 0
+        self.peak = 0
+
+    async def get_message(self):
+        """Pop the next message."""
+        return self.messages.pop(0) if self.messages else None
+
+    async def handle_message(self, message):
+        """Record the message and the peak concurrency."""
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        self.handled.append(message)
+
+
+def test_handles_messages_with_bounded_concurrency():
+    """Test that handlers run concurrently up to the pool_size."""
+    m = AsyncioTest(range(10), pool_size=3, idle_time=0.05)
+    while len(m.handled) < 10:
+
+        m.step()
+
+    assert sorted(m.handled) == list(range(10))
+    assert m.peak == 3
+    m.loop.close()
+
+
+def test_signals_run_on_the_loop():
+    """Test that signal handlers are delivered by the event loop."""
+    m = AsyncioTest([], idle_time=0.01)
+    triggered = {"value": False}
+
+    def flip_bit():
+
+        triggered["value"] = True
+
+    m.handle(signal.SIGUSR1, flip_bit)
+    m.loop
+    os.kill(os.getpid(), signal.SIGUSR1)
+    assert triggered["value"] is False
+
+    m.step()
+    assert triggered["value"] is True
+    m.loop.remove_signal_handler(signal.SIGUSR1)
+    for sig in m.kill_signals:
+
+        m.loop.remove_signal_handler(sig)
+
+    m.loop.close()
+
+
+def test_drain_waits_for_handlers():
+    """Test that draining runs the loop until handlers finish."""
+    m = AsyncioTest(range(3), pool_size=3, idle_time=0)
+    for _ in range(3):
+
+        m.step()
+
+    assert m.drain(timeout=5) is True
+    assert sorted(m.handled) == [0, 1, 2]
+    assert m.messages_completed == 3
+    m.loop.close()
+
+
+def test_resize_pool_changes_concurrency():
+    """Test that resizing the pool changes how many handlers run at once."""
+    m = AsyncioTest(range(10), pool_size=4, idle_time=0.05)
+    m.pool
+    m.resize_pool(1)
+    while len(m.handled) < 10:
+
+        m.step()
+
+    assert m.peak == 1
+
+    m.messages, m.peak = list(range(10)), 0
+    m.resize_pool(3)
+    while len(m.handled) < 20:
+
+        m.step()
+
+    assert m.peak == 3
+    m.loop.close()
@@ -0,0 +1,109 @@
+"""Test suite for the pool controllers."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import time
+
+import pytest
+
+from daemons.message import autoscale
+
+
+def decide(controller, size, now, finished=10, latency=0.01, failed=0, peak=0):
+    """Feed the controller one interval of measurements and get its size."""
+    for index in range(finished):
+
+        controller.record(latency, failed=index < failed)
+
+    controller.sample(peak)
+    return controller.resize(size, now=now)
+
+
+def test_grows_when_saturated():
+    """Test that a saturated and healthy pool grows by the increase."""
+    controller = autoscale.AIMDController(increase=2)
+    assert controller.resize(10, now=0) == 10
+    assert decide(controller, 10, 1, peak=10) == 12
+    assert decide(controller, 12, 2, peak=5) == 12
+
+
+def test_waits_for_interval():
+    """Test that no decision is made before the interval passes."""
+    controller = autoscale.AIMDController(interval=5)
+    controller.resize(10, now=0)
+    assert decide(controller, 10, 1, peak=10) == 10
+    assert controller.resize(10, now=5) == 11
+
+
+def test_shrinks_on_latency():
+    """Test that latency over the baseline tolerance shrinks the pool."""
+    controller = autoscale.AIMDController(decrease=0.5)
+    controller.resize(20, now=0)
+    assert decide(controller, 20, 1, latency=0.01, peak=20) == 21
+    assert decide(controller, 21, 2, latency=0.05, peak=21) == 10
+
+
+def test_shrinks_on_target_latency():
+    """Test that a target latency replaces the baseline."""
+    controller = autoscale.AIMDController(target_latency=0.1, decrease=0.5)
+    controller.resize(20, now=0)
+    assert decide(controller, 20, 1, latency=0.2, peak=20) == 10
+
+
+def test_shrinks_on_errors():
+    """Test that failing handlers shrink the pool."""
+    controller = autoscale.AIMDController(max_error_rate=0.1, decrease=0.5)
+    controller.resize(20, now=0)
+    assert decide(controller, 20, 1, failed=1, peak=20) == 21
+    assert decide(controller, 21, 2, failed=5, peak=21) == 10
+
+
+def test_clamps_size():
+    """Test that the size stays within the minimum and maximum."""
+    controller = autoscale.AIMDController(min_size=4, max_size=8)
+    assert controller.resize(100, now=0) == 8
+    assert decide(controller, 8, 1, peak=8) == 8
+    assert decide(controller, 4, 2, failed=10) == 4
+
+
+def test_resizes_green_pool():
+    """Test that a gevent daemon grows its pool and then shrinks it."""
+    gevent = pytest.importorskip("gevent")
+    from daemons.message import gevent as geventd
+
+    class Daemon(geventd.GeventMessageManager):
+
+        failing = False
+
+        def get_message(self):
+
+            return 1
+
+        def handle_message(self, message):
+
+            gevent.sleep(0.001)
+            if self.failing:
+
+                raise ValueError("Downstream is unavailable.")
+
+    daemon = Daemon(
+        pool_size=1,
+        pool_controller=autoscale.AIMDController(max_size=6, interval=0.01),
+    )
+    deadline = time.time() + 5
+    while daemon.pool_size < 6 and time.time() < deadline:
+
+        daemon.step()
+
+    assert daemon.pool_size == 6
+
+    daemon.failing = True
+    deadline = time.time() + 5
+    while daemon.pool_size > 1 and time.time() < deadline:
+
+        daemon.step()
+
+    assert daemon.pool_size == 1
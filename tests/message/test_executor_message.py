@@ -0,0 +1,152 @@
+"""Test suite for the concurrent.futures message managers."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import threading
+import time
+
+from daemons.message import executor
+
+
+class ThreadTest(executor.ThreadPoolMessageManager):
+
+    """Thread pool manager for testing."""
+
+    def __init__(self, messages, *args, **kwargs):
+        """Initialize with a list of messages to hand out."""
+        super(ThreadTest, self).__init__(*args, **kwargs)
+        self.messages = list(messages)
+        self.fetched = 0
+        self.handled = []
+        self.gate = threading.Event()
+
+    def get_message(self):
+        """Pop the next message."""
+        self.fetched += 1
+        return self.messages.pop(0) if self.messages else None
+
+    def handle_message(self, message):
+        """Record the message once the gate opens."""
+        self.gate.wait()
+        self.handled.append(message)
+
+
+class ProcessTest(executor.ProcessPoolMessageManager):
+
+    """Process pool manager for testing."""
+
+    def __init__(self, path, *args, **kwargs):
+        """Initialize with a directory to write handled messages into."""
+        super(ProcessTest, self).__init__(*args, **kwargs)
+        self.path = path
+
+    def handle_message(self, message):
+        """Record the message and the pid which handled it."""
+        with open(os.path.join(self.path, message), "w") as f:
+
+            f.write("{0}".format(os.getpid()))
+
+
+def test_thread_pool_handles_messages():
+    """Test that messages are handled by the thread pool."""
+    m = ThreadTest(range(5), pool_size=2, idle_time=0)
+    m.gate.set()
+    for _ in range(5):
+
+        m.step()
+
+    m.pool.shutdown(wait=True)
+    assert sorted(m.handled) == list(range(5))
+
+
+def test_thread_pool_applies_backpressure():
+    """Test that get_message is not called while the pool is saturated."""
+    m = ThreadTest(range(10), pool_size=2, max_pending=3, idle_time=0)
+    for _ in range(3):
+
+        m.step()
+
+    stepper = threading.Thread(target=m.step)
+    stepper.start()
+    time.sleep(0.1)
+    assert m.fetched == 3
+    assert stepper.is_alive()
+
+    m.gate.set()
+    stepper.join(1)
+    assert not stepper.is_alive()
+    assert m.fetched == 4
+    m.pool.shutdown(wait=True)
+
+
+def test_process_pool_handles_messages(tmpdir):
+    """Test that messages are handled in worker processes."""
+    m = ProcessTest(str(tmpdir), pool_size=2)
+    for name in ("a", "b", "c"):
+
+        m.dispatch(name)
+
+    m.pool.shutdown(wait=True)
+    assert sorted(os.listdir(str(tmpdir))) == ["a", "b", "c"]
+    assert str(os.getpid()) != tmpdir.join("a").read()
+
+
+def test_drain_waits_for_messages():
+    """Test that draining waits for in flight messages to finish."""
+    m = ThreadTest(range(3), pool_size=3, idle_time=0)
+    for _ in range(3):
+
+        m.step()
+
+    threading.Timer(0.05, m.gate.set).start()
+    assert m.drain(timeout=5) is True
+    assert m.messages_completed == 3
+    assert m.messages_abandoned == 0
+
+    m.step()
+    assert m.fetched == 3
+
+
+def test_drain_abandons_messages_after_timeout():
+    """Test that messages still in flight after the timeout are abandoned."""
+    m = ThreadTest(range(3), pool_size=1, max_pending=3, idle_time=0)
+    for _ in range(3):
+
+        m.step()
+
+    assert m.drain(timeout=0.05) is False
+    assert m.messages_completed == 0
+    assert m.messages_abandoned == 3
+    m.gate.set()
+
+
+def test_thread_pool_resizes():
+    """Test that resizing the pool changes how many handlers run at once."""
+    m = ThreadTest(range(10), pool_size=3, idle_time=0)
+    m.pool
+    m.resize_pool(1)
+    assert m.pending_limit == 2
+    m.step()
+    m.step()
+    time.sleep(0.05)
+    assert m._running == 1
+
+    m.resize_pool(3)
+    assert m.pending_limit == 6
+    for _ in range(4):
+
+        m.step()
+
+    deadline = time.time() + 5
+    while m._running < 3 and time.time() < deadline:
+
+        time.sleep(0.01)
+
+    assert m._running == 3
+    m.gate.set()
+    m.pool.shutdown(wait=True)
+    assert len(m.handled) == 6
@@ -0,0 +1,117 @@
+"""Test suite for the green-thread message managers."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+
+def build(module, sleep):
+    """Get a manager class for a green-thread backend."""
+
+    class GreenTest(module):
+
+        """Green-thread manager which records its peak concurrency."""
+
+        def __init__(self, messages, *args, **kwargs):
+            """Initialize with a list of messages to hand out."""
+            super(GreenTest, self).__init__(*args, **kwargs)
+            self.messages = list(messages)
+            self.handled = []
+            self.running = 0
+            self.peak = 0
+
+        def get_message(self):
+            """Pop the next message."""
+            return self.messages.pop(0) if self.messages else None
+
+        def handle_message(self, message):
+            """Record the message and the peak concurrency."""
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            sleep(0.01)
+            self.running -= 1
+            self.handled.append(message)
+
+    return GreenTest
+
+
+def gevent_manager():
+    """Get the gevent manager class."""
+    gevent = pytest.importorskip("gevent")
+    from daemons.message import gevent as geventd
+    return build(geventd.GeventMessageManager, gevent.sleep)
+
+
+def eventlet_manager():
+    """Get the eventlet manager class."""
+    eventlet = pytest.importorskip("eventlet")
+    from daemons.message import eventlet as eventletd
+    return build(eventletd.EventletMessageManager, eventlet.sleep)
+
+
+@pytest.mark.parametrize("manager", [gevent_manager, eventlet_manager])
+def test_resize_pool_changes_concurrency(manager):
+    """Test that resizing the pool changes how many handlers run at once."""
+    m = manager()(range(10), pool_size=4, idle_time=0.01)
+    m.pool
+    m.resize_pool(1)
+    while len(m.handled) < 10:
+
+        m.step()
+
+    assert m.peak == 1
+
+    m.messages, m.peak = list(range(10)), 0
+    m.resize_pool(3)
+    while len(m.handled) < 20:
+
+        m.step()
+
+    assert m.peak == 3
+
+
+@pytest.mark.parametrize(
+    "library, manager",
+    [("gevent", gevent_manager), ("eventlet", eventlet_manager)],
+)
+def test_growing_pool_wakes_waiting_dispatch(library, manager):
+    """Test that a dispatch blocked on a full pool runs once it grows."""
+
+    class BlockingTest(manager()):
+
+        released = False
+
+        def handle_message(self, message):
+
+            while message == "block" and not self.released:
+
+                self.sleep(0.01)
+
+            self.handled.append(message)
+
+    spawn = pytest.importorskip(library).spawn
+    m = BlockingTest([], pool_size=2)
+    m.pool
+    m.resize_pool(1)
+    m.dispatch("block")
+    waiting = spawn(m.dispatch, "waiting")
+    m.sleep(0.05)
+    assert m.handled == []
+
+    m.resize_pool(2)
+    for _ in range(100):
+
+        if m.handled:
+
+            break
+
+        m.sleep(0.01)
+
+    assert m.handled == ["waiting"]
+    m.released = True
+    waiting.wait() if library == "eventlet" else waiting.join()
+    assert m.wait_drained(5)
+    assert m.handled == ["waiting", "block"]
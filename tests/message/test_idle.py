@@ -0,0 +1,89 @@
+"""Test suite for the message manager idle strategies."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from daemons.interfaces import message
+from daemons.message import idle
+
+
+class IdleTest(message.MessageManager):
+
+    """Message manager which records its idle waits."""
+
+    def __init__(self, messages, *args, **kwargs):
+        """Initialize with a list of messages to hand out."""
+        super(IdleTest, self).__init__(*args, **kwargs)
+        self.messages = list(messages)
+        self.waits = []
+
+    def idle(self, seconds):
+        """Record the wait rather than waiting."""
+        self.waits.append(seconds)
+
+    def dispatch(self, message):
+        """Drop the message."""
+        return None
+
+    def get_message(self):
+        """Pop the next message."""
+        return self.messages.pop(0) if self.messages else None
+
+
+def test_backoff_grows_to_maximum():
+    """Test that the backoff grows exponentially up to its maximum."""
+    strategy = idle.BackoffIdle(maximum=0.4, jitter=0)
+    delays = [strategy.delay(0.1) for _ in range(5)]
+    assert delays == [0.1, 0.2, 0.4, 0.4, 0.4]
+
+
+def test_backoff_starts_from_minimum():
+    """Test that an idle_time of zero or None still backs off."""
+    for idle_time in (0, None):
+
+        strategy = idle.BackoffIdle(maximum=0.04, jitter=0, minimum=0.01)
+        delays = [strategy.delay(idle_time) for _ in range(4)]
+        assert delays == [0.01, 0.02, 0.04, 0.04]
+
+
+def test_backoff_jitter_shortens_waits():
+    """Test that jitter never lengthens a wait."""
+    strategy = idle.BackoffIdle(maximum=1, jitter=0.5)
+    for _ in range(20):
+
+        assert 0.5 <= strategy.delay(1) <= 1
+
+
+def test_backoff_resets_on_message():
+    """Test that finding a message resets the backoff."""
+    m = IdleTest(
+        [None, None, 1, None],
+        idle_time=0.1,
+        idle_strategy=idle.BackoffIdle(jitter=0),
+    )
+    for _ in range(4):
+
+        m.step()
+
+    assert m.waits == [0.1, 0.2, 0.1]
+
+
+def test_wakeup_ends_idle_early():
+    """Test that setting the wakeup ends an idle wait."""
+    wakeup = idle.Wakeup()
+    m = message.MessageManager(wakeup=wakeup)
+    threading.Timer(0.05, wakeup.set).start()
+
+    start = time.time()
+    m.idle(None)
+    assert time.time() - start < 1
+
+    start = time.time()
+    m.idle(0.05)
+    assert time.time() - start >= 0.05
+    wakeup.close()
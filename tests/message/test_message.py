@@ -0,0 +1,87 @@
+"""Test suite for the message manager interface."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from daemons.interfaces import message
+
+
+class MessageTest(message.MessageManager):
+
+    """Synchronous message manager for testing."""
+
+    def __init__(self, messages, *args, **kwargs):
+        """Initialize with a list of messages to hand out."""
+        super(MessageTest, self).__init__(*args, **kwargs)
+        self.messages = list(messages)
+        self.handled = []
+        self.batches = []
+        self.slept = []
+
+    def sleep(self, seconds):
+        """Record sleeps instead of sleeping."""
+        self.slept.append(seconds)
+
+    def dispatch(self, message):
+        """Handle the message inline."""
+        self.handle_message(message)
+
+    def dispatch_batch(self, messages):
+        """Handle the batch inline."""
+        self.batches.append(messages)
+        self.handle_batch(messages)
+
+    def get_message(self):
+        """Pop the next message."""
+        return self.messages.pop(0) if self.messages else None
+
+    def handle_message(self, message):
+        """Record the message."""
+        if message == "bad":
+
+            raise ValueError(message)
+
+        self.handled.append(message)
+
+
+def test_step_dispatches_single_messages():
+    """Test that the default batch size dispatches one message per step."""
+    m = MessageTest([1, 2])
+    m.step()
+    assert m.handled == [1]
+    assert m.batches == []
+
+
+def test_step_dispatches_batches():
+    """Test that messages are dispatched as batches of batch_size."""
+    m = MessageTest(range(5), batch_size=2)
+    m.step()
+    m.step()
+    m.step()
+    assert m.batches == [[0, 1], [2, 3], [4]]
+    assert m.handled == list(range(5))
+
+
+def test_step_idles_on_empty_batch():
+    """Test that an empty batch sleeps for the idle_time."""
+    m = MessageTest([], batch_size=10, idle_time=0.5)
+    m.step()
+    assert m.batches == []
+    assert m.slept == [0.5]
+
+
+def test_get_messages_lingers_for_partial_batch():
+    """Test that a partial batch waits up to batch_linger to fill."""
+    m = MessageTest([1], batch_size=10, batch_linger=0.05, idle_time=0.01)
+    m.sleep = lambda seconds: (m.slept.append(seconds), m.messages.append(2))
+    assert m.get_messages(2) == [1, 2]
+    assert len(m.slept) == 1
+
+
+def test_handle_batch_isolates_failures():
+    """Test that one failed message does not stop the rest of a batch."""
+    m = MessageTest([])
+    m.handle_batch([1, "bad", 2])
+    assert m.handled == [1, 2]
@@ -0,0 +1,118 @@
+"""Test suite for cancelling handlers on every backend which can."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import asyncio
+
+import pytest
+
+
+class Timeouts(object):
+
+    """Manager which handles each message by sleeping for its value.
+
+    The message 0.2 is given a longer timeout than the others.
+    """
+
+    def __init__(self, messages, *args, **kwargs):
+        """Initialize with a list of messages to hand out."""
+        super(Timeouts, self).__init__(*args, **kwargs)
+        self.messages = list(messages)
+        self.handled = []
+        self.cancelled = None
+
+    def timeout_for(self, message):
+        """Allow the message 0.2 to run for a second."""
+        if message == 0.2:
+
+            return 1
+
+        return super(Timeouts, self).timeout_for(message)
+
+    def handle_timeout(self, payload):
+        """Record the message which was cancelled."""
+        self.cancelled = payload
+
+
+def green_manager(library):
+    """Get a manager class for a green-thread backend."""
+    pytest.importorskip(library)
+    if library == "gevent":
+
+        from daemons.message import gevent as green
+        base = green.GeventMessageManager
+
+    else:
+
+        from daemons.message import eventlet as green
+        base = green.EventletMessageManager
+
+    class GreenTimeouts(Timeouts, base):
+
+        """Green-thread manager whose handlers may time out."""
+
+        def get_message(self):
+            """Pop the next message."""
+            return self.messages.pop(0) if self.messages else None
+
+        def handle_message(self, message):
+            """Sleep for the message and then record it."""
+            self.sleep(message)
+            self.handled.append(message)
+
+    return GreenTimeouts
+
+
+def gevent_manager():
+    """Get the gevent manager class."""
+    return green_manager("gevent")
+
+
+def eventlet_manager():
+    """Get the eventlet manager class."""
+    return green_manager("eventlet")
+
+
+def asyncio_manager():
+    """Get the asyncio manager class."""
+    from daemons.message import asyncio as asynciod
+
+    class AsyncioTimeouts(Timeouts, asynciod.AsyncioMessageManager):
+
+        """Asyncio manager whose handlers may time out."""
+
+        async def get_message(self):
+            """Pop the next message."""
+            return self.messages.pop(0) if self.messages else None
+
+        async def handle_message(self, message):
+            """Sleep for the message and then record it."""
+            await asyncio.sleep(message)
+            self.handled.append(message)
+
+    return AsyncioTimeouts
+
+
+@pytest.mark.parametrize(
+    "manager", [gevent_manager, eventlet_manager, asyncio_manager]
+)
+def test_cancels_handlers_past_their_timeout(manager):
+    """Test that stuck handlers are cancelled and counted."""
+    m = manager()([10, 0.01, 0.2], message_timeout=0.1, idle_time=0.01)
+    while m.messages:
+
+        m.step()
+
+    assert m.drain(timeout=5) is True
+    assert sorted(m.handled) == [0.01, 0.2]
+    assert m.cancelled == 10
+    assert m.messages_timed_out == 1
+    assert m.messages_failed == 1
+    assert m.messages_completed == 2
+    loop = getattr(m, "loop", None)
+    if loop is not None:
+
+        loop.close()
@@ -0,0 +1,188 @@
+"""Test suite for the metrics sinks."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import signal
+import socket
+import time
+
+import pytest
+
+from daemons.interfaces import message
+from daemons.interfaces import startstop
+from daemons.metrics import memory
+from daemons.metrics import prometheus
+from daemons.metrics import statsd
+from daemons.signal import simple as simple_signal
+
+
+class MessageTest(message.MessageManager):
+
+    """Synchronous message manager which handles messages inline."""
+
+    def __init__(self, messages, *args, **kwargs):
+        """Initialize with a list of messages to hand out."""
+        super(MessageTest, self).__init__(*args, **kwargs)
+        self.messages = list(messages)
+
+    def sleep(self, seconds):
+        """Do not sleep."""
+        return None
+
+    def dispatch(self, message):
+        """Handle the message inline."""
+        self.consume(self.handle_message, message, 1)
+
+    def get_message(self):
+        """Pop the next message."""
+        return self.messages.pop(0) if self.messages else None
+
+    def handle_message(self, message):
+        """Fail on the message 'bad'."""
+        if message == "bad":
+
+            raise ValueError(message)
+
+
+def test_histogram_quantiles():
+    """Test that quantiles report the bound of the containing bucket."""
+    histogram = memory.Histogram(buckets=(1, 2, 3))
+    for value in (0.5, 1.5, 1.5, 2.5, 10):
+
+        histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.sum == 16
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(1) == float("inf")
+    assert histogram.cumulative()[-1] == (float("inf"), 5)
+
+
+def test_message_loop_is_measured():
+    """Test that the message loop reports to the metrics sink."""
+    sink = memory.MemoryMetrics()
+    m = MessageTest([1, "bad", 2], metrics=sink)
+    for _ in range(4):
+
+        m.step()
+
+    snapshot = sink.snapshot()
+    assert snapshot["counters"] == {
+        "messages.dispatched": 3,
+        "messages.completed": 2,
+        "messages.failed": 1,
+        "errors": 1,
+    }
+    assert snapshot["timings"]["get_message"]["count"] == 4
+    assert snapshot["timings"]["handle_message"]["count"] == 3
+    assert snapshot["timings"]["idle"]["count"] == 1
+    assert snapshot["gauges"]["pool.size"] == 100
+
+
+def test_statsd_batches_lines():
+    """Test that StatsD lines are buffered into a single packet."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(5)
+    sink = statsd.StatsdMetrics(port=server.getsockname()[1])
+    sink.increment("messages.completed", 2)
+    sink.gauge("pool.inflight", 3)
+    sink.timing("step", 0.25)
+    sink.flush()
+    lines = server.recv(4096).decode("utf-8").split("\n")
+    server.close()
+    assert lines == [
+        "daemons.messages.completed:2|c",
+        "daemons.pool.inflight:3|g",
+        "daemons.step:250.000|ms",
+    ]
+
+
+@pytest.fixture
+def server():
+    """Get a UDP socket which receives StatsD packets."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    yield sock
+    sock.close()
+
+
+def test_statsd_sends_due_lines_between_steps(server):
+    """Test that an idle daemon sends its last lines at a checkpoint."""
+
+    class StepTest(startstop.StartStopStepManager):
+
+        """Step manager with a metrics sink."""
+
+        metrics = statsd.StatsdMetrics(
+            port=server.getsockname()[1], flush_interval=0.05
+        )
+
+    daemon = StepTest()
+    daemon.metrics.increment("messages.completed")
+    daemon.checkpoint()
+    server.settimeout(0.01)
+    with pytest.raises(socket.timeout):
+
+        server.recv(4096)
+
+    time.sleep(0.05)
+    daemon.checkpoint()
+    server.settimeout(5)
+    assert server.recv(4096) == b"daemons.messages.completed:1|c"
+
+
+def test_statsd_flushes_on_shutdown(server):
+    """Test that buffered lines are sent when the daemon shuts down."""
+    signums = simple_signal.SimpleSignalManager.kill_signals
+    handlers = dict((signum, signal.getsignal(signum)) for signum in signums)
+    manager = simple_signal.SimpleSignalManager()
+    manager.pid = None
+    manager.metrics = statsd.StatsdMetrics(
+        port=server.getsockname()[1], flush_interval=60
+    )
+    manager.metrics.increment("messages.completed")
+    try:
+
+        with pytest.raises(SystemExit):
+
+            manager.shutdown(signal.SIGTERM)
+
+    finally:
+
+        for signum, handler in handlers.items():
+
+            signal.signal(signum, handler)
+
+    server.settimeout(5)
+    assert server.recv(4096) == b"daemons.messages.completed:1|c"
+
+
+def test_prometheus_serves_text_format():
+    """Test that the Prometheus sink serves its metrics over HTTP."""
+    sink = prometheus.PrometheusMetrics(address=("127.0.0.1", 0))
+    sink.increment("messages.completed")
+    sink.timing("step", 0.003)
+    client = socket.create_connection(sink.serve().server_address, 5)
+    client.sendall(b"GET /metrics HTTP/1.0\r\n\r\n")
+    response = b""
+    while True:
+
+        chunk = client.recv(4096)
+        if not chunk:
+
+            break
+
+        response += chunk
+
+    client.close()
+    sink.close()
+    response = response.decode("utf-8")
+    assert response.startswith("HTTP/1.0 200 OK")
+    assert "daemons_messages_completed_total 1.0\n" in response
+    assert 'daemons_step_seconds_bucket{le="0.0025"} 0\n' in response
+    assert 'daemons_step_seconds_bucket{le="0.005"} 1\n' in response
+    assert "daemons_step_seconds_count 1\n" in response
@@ -0,0 +1,132 @@
+"""Test suite for the lock based pid manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import fcntl
+import os
+import subprocess
+import sys
+
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+from daemons.pid import lock
+
+
+DAEMON = """
+import os
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.pid import lock
+from daemons.prefab import run
+
+
+class Daemon(lock.LockPidManager, run.RunDaemon):
+
+    def daemonize(self):
+        # Give the other daemon time to pass the check in start() too.
+        time.sleep(0.5)
+        super(Daemon, self).daemonize()
+
+    def run(self):
+        open(os.path.join({path!r}, str(os.getpid())), "w").close()
+        while True:
+            time.sleep(1)
+
+
+Daemon(pidfile={pidfile!r}).start()
+"""
+
+
+def test_empty_pid_when_not_exist(tmpdir):
+    """Test that the pid is None when the file does not exist."""
+    m = lock.LockPidManager(pidfile=str(tmpdir.join("test.pid")))
+    assert m.pid is None
+
+
+def test_writes_locked_pidfile(tmpdir):
+    """Test that a written pid is reported by any manager."""
+    pidfile = str(tmpdir.join("test.pid"))
+    m = lock.LockPidManager(pidfile=pidfile)
+    m.pid = os.getpid()
+    assert m.pid == os.getpid()
+    assert lock.LockPidManager(pidfile=pidfile).pid == os.getpid()
+    assert os.listdir(str(tmpdir)) == ["test.pid"]
+    with open(pidfile) as f:
+
+        lines = f.read().split()
+
+    assert lines == [
+        str(os.getpid()), str(lock.process_start_time(os.getpid()))
+    ]
+
+
+def test_unlocked_pidfile_is_stale(tmpdir):
+    """Test that a pidfile nobody has locked is not running.
+
+    The pid is that of a live process, as it would be after pid reuse.
+    """
+    pidfile = str(tmpdir.join("test.pid"))
+    with open(pidfile, "w+") as f:
+
+        f.write("{0}\n".format(os.getpid()))
+
+    m = lock.LockPidManager(pidfile=pidfile)
+    assert m.pid is None
+
+
+def test_start_time_mismatch_is_stale(tmpdir):
+    """Test that a locked pidfile for a recycled pid is not running."""
+    pidfile = str(tmpdir.join("test.pid"))
+    with open(pidfile, "w+") as f:
+
+        f.write("{0}\n1\n".format(os.getpid()))
+        f.flush()
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        m = lock.LockPidManager(pidfile=pidfile)
+        assert m.pid is None
+
+
+def test_deletes_pid_and_releases_lock(tmpdir):
+    """Test that deleting the pid removes the file and releases the lock."""
+    pidfile = str(tmpdir.join("test.pid"))
+    m = lock.LockPidManager(pidfile=pidfile)
+    m.pid = os.getpid()
+    del m.pid
+    assert not tmpdir.join("test.pid").check()
+    assert m.pid is None
+    assert m._lockfd is None
+
+
+def test_replaced_pidfile_is_not_owned(tmpdir):
+    """Test that the lock holder notices when its pidfile is replaced."""
+    pidfile = str(tmpdir.join("test.pid"))
+    m = lock.LockPidManager(pidfile=pidfile)
+    m.pid = os.getpid()
+    lock.LockPidManager(pidfile=pidfile).pid = os.getppid()
+    assert m.pid is None
+
+
+def test_only_one_of_two_daemons_starts(tmpdir, write_script):
+    """Test that daemons started at the same time cannot both run."""
+    path = tmpdir.mkdir("running")
+    pidfile = str(tmpdir.join("test.pid"))
+    script = write_script(DAEMON, path=str(path), pidfile=pidfile)
+    starts = [subprocess.Popen([sys.executable, script]) for _ in range(2)]
+    try:
+
+        codes = sorted(start.wait() for start in starts)
+        pid = Controller(pidfile=pidfile).pid
+        assert codes[0] == exit.SUCCESS
+        assert codes[1] != exit.SUCCESS
+        assert path.listdir() == [path.join(str(pid))]
+        assert lock.LockPidManager(pidfile=pidfile).pid == pid
+
+    finally:
+
+        Controller(pidfile=pidfile, stop_timeout=2).stop()
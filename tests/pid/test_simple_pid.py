@@ -65,3 +65,16 @@ def test_handle_stale_pid(tmpdir):
 
     m = simple.SimplePidManager(pidfile=pidfile)
     assert m.pid is None
+
+
+def test_writes_pid_atomically(tmpdir):
+    """Test that setting the pid replaces the pidfile without leftovers."""
+    pidfile = str(tmpdir.join("test.pid"))
+    with open(pidfile, "w+") as f:
+
+        f.write("garbage\n")
+
+    m = simple.SimplePidManager(pidfile=pidfile)
+    m.pid = os.getpid()
+    assert m.pid == os.getpid()
+    assert os.listdir(str(tmpdir)) == ["test.pid"]
@@ -0,0 +1,180 @@
+"""Test suite for the pre-built message daemons."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import importlib
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+from daemons.prefab import asynciod
+from daemons.prefab import processd
+from daemons.prefab import threadd
+
+
+GREEN_DAEMON = """
+import os
+import sys
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import {library}d as prefab
+
+
+class Daemon(prefab.{name}):
+
+    messages = ["a"]
+
+    def get_message(self):
+        return self.messages.pop() if self.messages else None
+
+    def handle_message(self, message):
+        open(os.path.join({path!r}, "started"), "w").close()
+        self.sleep(0.5)
+        open(os.path.join({path!r}, "handled"), "w").close()
+
+
+Daemon(pidfile={pidfile!r}, idle_time=60).start()
+"""
+
+
+def build(base):
+    """Get a prefab daemon which records messages as files."""
+
+    class PrefabTest(base):
+
+        """Prefab daemon for testing."""
+
+        def __init__(self, path, messages, *args, **kwargs):
+            """Initialize with a directory and the messages to hand out."""
+            super(PrefabTest, self).__init__(*args, **kwargs)
+            self.path = path
+            self.messages = list(messages)
+
+        def get_message(self):
+            """Pop the next message."""
+            return self.messages.pop(0) if self.messages else None
+
+        def handle_message(self, message):
+            """Record the message as a file."""
+            open(os.path.join(self.path, message), "w").close()
+
+    return PrefabTest
+
+
+@pytest.fixture
+def handlers():
+    """Restore the signal handlers replaced by the daemon."""
+    signums = (signal.SIGINT, signal.SIGQUIT, signal.SIGABRT, signal.SIGTERM)
+    saved = dict((signum, signal.getsignal(signum)) for signum in signums)
+    yield
+    for signum, handler in saved.items():
+
+        signal.signal(signum, handler)
+
+
+@pytest.mark.parametrize(
+    "base", [threadd.ThreadPoolDaemon, processd.ProcessPoolDaemon]
+)
+def test_step_handles_messages(base, tmpdir, handlers):
+    """Test that a step of the prefab fetches and handles a message."""
+    daemon = build(base)(
+        str(tmpdir), ["a", "b"], pidfile=str(tmpdir.join("test.pid"))
+    )
+    daemon.step()
+    daemon.step()
+    daemon.pool.shutdown(wait=True)
+    assert sorted(os.listdir(str(tmpdir))) == ["a", "b"]
+
+
+def test_asyncio_step_handles_messages(handlers):
+    """Test that a step of the asyncio prefab handles a message."""
+
+    class AsyncioTest(asynciod.AsyncioDaemon):
+
+        """Asyncio prefab daemon for testing."""
+
+        handled = []
+
+        async def get_message(self):
+            """Get the same message every time."""
+            return "a"
+
+        async def handle_message(self, message):
+            """Record the message."""
+            self.handled.append(message)
+
+    daemon = AsyncioTest(pidfile="unused.pid")
+    daemon.step()
+    daemon.step()
+    for signum in daemon.kill_signals:
+
+        daemon.loop.remove_signal_handler(signum)
+
+    daemon.loop.close()
+    assert daemon.handled == ["a", "a"]
+
+
+@pytest.mark.parametrize(
+    "library, name",
+    [("gevent", "GeventDaemon"), ("eventlet", "EventletDaemon")],
+)
+def test_green_step_handles_messages(library, name, tmpdir, handlers):
+    """Test that a step of the green prefabs handles a message."""
+    pytest.importorskip(library)
+    prefab = importlib.import_module("daemons.prefab.{0}d".format(library))
+    base = getattr(prefab, name)
+    daemon = build(base)(
+        str(tmpdir), ["a", "b"], pidfile=str(tmpdir.join("test.pid"))
+    )
+    daemon.step()
+    daemon.step()
+    assert daemon.wait_drained(5)
+    assert sorted(os.listdir(str(tmpdir))) == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "library, name",
+    [("gevent", "GeventDaemon"), ("eventlet", "EventletDaemon")],
+)
+def test_green_daemon_drains_on_signal(
+    library, name, tmpdir, write_script, wait_for
+):
+    """Test that an idle green daemon drains and exits on SIGTERM.
+
+    The signal arrives while the loop waits within the hub, where the
+    in-flight handler cannot be waited on.
+    """
+    pytest.importorskip(library)
+    path = tmpdir.mkdir("out")
+    pidfile = str(tmpdir.join("test.pid"))
+    script = write_script(
+        GREEN_DAEMON,
+        library=library,
+        name=name,
+        path=str(path),
+        pidfile=pidfile,
+    )
+    assert subprocess.call([sys.executable, script]) == exit.SUCCESS
+    controller = Controller(pidfile=pidfile)
+    pid = controller.pid
+    try:
+
+        wait_for(lambda: path.join("started").check())
+        os.kill(pid, signal.SIGTERM)
+        wait_for(lambda: not os.path.exists("/proc/{0}".format(pid)))
+
+    finally:
+
+        controller.stop()
+
+    assert path.join("handled").check()
+    assert not os.path.exists(pidfile)
@@ -0,0 +1,130 @@
+"""Test suite for the simple profiler manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import pstats
+import signal
+import sys
+import threading
+
+import pytest
+
+from daemons.pid import simple as simple_pid
+from daemons.profiler import simple as simple_profiler
+from daemons.signal import simple as simple_signal
+from daemons.startstop import simple as simple_startstop
+
+
+class ProfilerTest(
+    simple_profiler.SimpleProfilerManager,
+    simple_pid.SimplePidManager,
+    simple_signal.SimpleSignalManager,
+    simple_startstop.SimpleStartStopStepManager,
+):
+
+    """Profiler manager for testing."""
+
+
+@pytest.fixture
+def manager(tmpdir):
+    """Get a profiler manager and restore the signal handlers."""
+    signums = ProfilerTest.kill_signals + (ProfilerTest.profile_signal,)
+    handlers = dict((signum, signal.getsignal(signum)) for signum in signums)
+    yield ProfilerTest(
+        pidfile=str(tmpdir.join("test.pid")),
+        profile_duration=0.3,
+        profile_interval=0.005,
+    )
+    for signum, handler in handlers.items():
+
+        signal.signal(signum, handler)
+
+
+def spin(stop):
+    """Keep busy until stopped."""
+    while not stop.is_set():
+
+        sum(range(100))
+
+
+def test_collapses_stack():
+    """Test that stacks run from the root to the innermost frame."""
+    stack = simple_profiler.collapse_stack("main", sys._getframe())
+    frames = stack.split(";")
+    assert frames[0] == "main"
+    assert frames[-1].startswith("test_collapses_stack (")
+
+
+def test_samples_threads(manager):
+    """Test that the signal samples the stacks of other threads."""
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,))
+    thread.start()
+    try:
+
+        os.kill(os.getpid(), signal.SIGUSR1)
+        manager.checkpoint()
+        path = manager._sample_path
+        assert manager.profile() == path
+        manager._sampler.join(5)
+
+    finally:
+
+        stop.set()
+        thread.join()
+
+    assert os.path.dirname(path) == os.path.dirname(manager.pidfile)
+    with open(path) as samples:
+
+        lines = samples.read().splitlines()
+
+    assert any(";spin (" in line for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+def test_signal_waits_for_checkpoint(manager):
+    """Test that the signal does not take the lock held by the loop."""
+    with manager._profile_lock:
+
+        os.kill(os.getpid(), signal.SIGUSR1)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert manager._sampler is None
+
+    manager.checkpoint()
+    assert manager._sampler.is_alive()
+    manager._sampler.join(5)
+    assert os.path.exists(manager._sample_path)
+
+
+def test_toggles_cprofile(manager):
+    """Test that cProfile runs between two requests at a checkpoint."""
+    path = manager.profile(mode="cprofile")
+    manager.checkpoint()
+    sum(range(100))
+    assert manager.profile(mode="cprofile") == path
+    assert not os.path.exists(path)
+    manager.checkpoint()
+    stats = pstats.Stats(path)
+    assert any(func[2] == "checkpoint" for func in stats.stats)
+
+
+def test_samples_greenlets(manager):
+    """Test that greenlets waiting in a gevent pool are found."""
+    gevent = pytest.importorskip("gevent")
+    from gevent import pool as gevent_pool
+
+    pool = gevent_pool.Pool(2)
+    pool.spawn(gevent.sleep, 1)
+    gevent.sleep(0)
+    manager._pool = pool
+    frames = manager.task_frames()
+    pool.kill()
+    assert frames
+    assert any(
+        "gevent" in simple_profiler.collapse_stack("greenlet", frame)
+        for frame in frames
+    )
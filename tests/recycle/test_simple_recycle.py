@@ -0,0 +1,161 @@
+"""Test suite for the simple recycle manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+from daemons.recycle import simple as simple_recycle
+
+
+DAEMON = """
+import os
+import sys
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import threadd
+from daemons.recycle import simple as recycle
+from daemons.reload import simple as reload
+
+
+class Daemon(recycle.SimpleRecycleManager, reload.SimpleReloadManager,
+             threadd.ThreadPoolDaemon):
+
+    def get_message(self):
+        return os.getpid()
+
+    def handle_message(self, message):
+        with open({handled!r}, "a") as handled:
+            handled.write("{{0}}\\n".format(message))
+
+
+with open({starts!r}, "a") as starts:
+    starts.write("{{0}}\\n".format(os.getpid()))
+
+Daemon(
+    pidfile={pidfile!r},
+    pool_size=2,
+    idle_time=0.01,
+    recycle_messages=20,
+    recycle_jitter=0,
+).start()
+"""
+
+
+class Step(object):
+
+    """Step loop which does nothing between steps."""
+
+    def checkpoint(self):
+        """Do nothing."""
+
+
+class Stepped(simple_recycle.SimpleRecycleManager, Step):
+
+    """Records why it would recycle rather than exiting."""
+
+    reason = None
+
+    def recycle(self, reason):
+        """Record the reason."""
+        self.reason = reason
+
+
+class Counted(simple_recycle.SimpleRecycleManager):
+
+    """Handles a fixed number of messages."""
+
+    messages_completed = 0
+    messages_failed = 0
+
+
+def read_lines(path):
+    """Get the lines of a file or nothing if it does not exist."""
+    if not os.path.exists(path):
+
+        return []
+
+    with open(path) as f:
+
+        return f.read().splitlines()
+
+
+def test_resident_memory():
+    """Test that the resident memory of this process can be read."""
+    if not os.path.exists("/proc/self/statm"):
+
+        pytest.skip("No /proc/self/statm on this platform.")
+
+    assert simple_recycle.resident_memory() > 0
+
+
+def test_recycle_reasons():
+    """Test that each limit is reported once it is reached."""
+    counted = Counted(recycle_messages=10, recycle_jitter=0)
+    assert counted.recycle_reason() is None
+    counted.messages_completed, counted.messages_failed = 8, 2
+    assert "10 messages" in counted.recycle_reason()
+
+    aged = Counted(recycle_age=0.1, recycle_jitter=0)
+    assert aged.recycle_reason() is None
+    time.sleep(0.15)
+    assert "seconds" in aged.recycle_reason()
+
+    large = Counted(recycle_rss=1, recycle_check_interval=0)
+    if simple_recycle.resident_memory() is not None:
+
+        assert "resident memory" in large.recycle_reason()
+
+
+def test_recycles_after_exactly_the_step_limit():
+    """Test that the first step counts towards the limit."""
+    stepped = Stepped(recycle_messages=3, recycle_jitter=0)
+    stepped.checkpoint()
+    stepped.checkpoint()
+    assert stepped.reason is None
+    stepped.checkpoint()
+    assert stepped.reason == "handled 3 messages"
+
+
+def test_jitter_lowers_limits():
+    """Test that limits are lowered by no more than the jitter."""
+    counted = Counted(recycle_messages=1000, recycle_jitter=0.5)
+    counted.recycle_reason()
+    limit = counted._recycle_limits[0]
+    assert 500 <= limit <= 1000
+
+
+def test_recycles_in_place(tmpdir, write_script, wait_for):
+    """Test that a daemon re-executes itself and keeps handling messages."""
+    pidfile = str(tmpdir.join("test.pid"))
+    handled = str(tmpdir.join("handled"))
+    starts = str(tmpdir.join("starts"))
+    script = write_script(
+        DAEMON,
+        handled=handled,
+        starts=starts,
+        pidfile=pidfile,
+    )
+    try:
+
+        assert subprocess.call([sys.executable, script]) == exit.SUCCESS
+        pid = Controller(pidfile=pidfile).pid
+
+        wait_for(lambda: len(read_lines(handled)) >= 60)
+        assert set(read_lines(handled)) == set([str(pid)])
+        assert len(read_lines(starts)) >= 3
+        assert Controller(pidfile=pidfile).pid == pid
+
+    finally:
+
+        Controller(pidfile=pidfile, stop_timeout=2).stop()
@@ -0,0 +1,99 @@
+"""Test suite for the simple reload manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from daemons.fleet import Controller
+
+
+DAEMON = """
+import os
+import sys
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import run
+from daemons.reload import simple as reload
+
+
+class Daemon(reload.SimpleReloadManager, run.RunDaemon):
+
+    def run(self):
+        sock = self.listen(({host!r}, {port}))
+        while True:
+            conn, _ = sock.accept()
+            conn.sendall("{{0}}".format(os.getpid()).encode("ascii"))
+            conn.close()
+
+
+Daemon(pidfile={pidfile!r}).start()
+"""
+
+
+def free_port():
+    """Find a port which is not in use."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def ask(port):
+    """Connect to the daemon and read the pid of the generation serving."""
+    conn = socket.create_connection(("127.0.0.1", port))
+    try:
+
+        return int(conn.recv(64))
+
+    finally:
+
+        conn.close()
+
+
+@pytest.fixture(params=["127.0.0.1", "", "localhost"])
+def daemon(request, tmpdir, write_script, wait_for):
+    """Start a reloadable daemon and stop it after the test.
+
+    The daemon listens on each form of host that an inherited socket must
+    be matched against.
+    """
+    port = free_port()
+    pidfile = str(tmpdir.join("test.pid"))
+    script = write_script(
+        DAEMON,
+        host=request.param,
+        port=port,
+        pidfile=pidfile,
+    )
+    subprocess.check_call([sys.executable, script])
+    controller = Controller(pidfile=pidfile)
+    wait_for(lambda: controller.pid is not None)
+
+    yield controller, port
+    controller.stop()
+
+
+def test_reload_replaces_generation(daemon, wait_for):
+    """Test that a reload hands the pidfile and socket to a new process."""
+    controller, port = daemon
+    old = controller.pid
+    wait_for(lambda: ask(port) == old)
+
+    os.kill(old, signal.SIGUSR2)
+    wait_for(lambda: controller.pid not in (None, old))
+    new = controller.pid
+    wait_for(lambda: not os.path.exists("/proc/{0}".format(old)))
+
+    assert ask(port) == new
+    assert controller.pid == new
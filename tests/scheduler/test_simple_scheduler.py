@@ -0,0 +1,173 @@
+"""Test suite for the simple scheduler manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import threading
+
+import pytest
+
+from daemons.scheduler import simple as simple_scheduler
+
+
+class Scheduler(simple_scheduler.SimpleSchedulerManager):
+
+    """Scheduler driven by a fake clock."""
+
+    def __init__(self, *args, **kwargs):
+        """Start the fake clock at zero."""
+        self.now = 0.0
+        self.sleeps = []
+        super(Scheduler, self).__init__(*args, **kwargs)
+
+    def clock(self):
+        """Get the fake time."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Record the wait and move the fake clock on."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_interval_jobs_do_not_drift():
+    """Test that slow runs do not delay later runs."""
+    scheduler = Scheduler()
+    times = []
+
+    def slow():
+
+        times.append(scheduler.now)
+        scheduler.now += 0.3
+
+    scheduler.every(1, slow)
+    for _ in range(8):
+
+        scheduler.step()
+
+    assert times[:4] == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_jobs_run_in_order():
+    """Test that several jobs run when each is due."""
+    scheduler = Scheduler()
+    runs = []
+    scheduler.every(2, lambda: runs.append("a"), name="a")
+    scheduler.every(3, lambda: runs.append("b"), name="b")
+    while scheduler.now <= 6:
+
+        scheduler.step()
+
+    assert runs == ["a", "b", "a", "b", "a"]
+    assert scheduler.sleeps and max(scheduler.sleeps) <= 1.0
+
+
+@pytest.mark.parametrize("policy,runs,missed", [
+    ("catchup", 5, 0),
+    ("coalesce", 1, 4),
+    ("skip", 1, 4),
+])
+def test_missed_run_policies(policy, runs, missed):
+    """Test how each policy handles a job which fell behind."""
+    scheduler = Scheduler()
+    job = scheduler.every(1, lambda: None, policy=policy)
+    scheduler.now = 5.5
+    scheduler.sleep = lambda seconds: None
+    scheduler.step()
+    assert job.runs == runs
+    assert job.missed == missed
+    assert job.due == 6.0
+
+
+def test_skip_runs_a_job_which_is_always_late():
+    """Test that a job which keeps falling behind still runs every step."""
+    scheduler = Scheduler()
+    job = scheduler.every(1, lambda: None, policy="skip")
+    scheduler.sleep = lambda seconds: None
+    for now in (2.5, 5.5, 8.5):
+
+        scheduler.now = now
+        scheduler.step()
+
+    assert job.runs == 3
+    assert job.missed == 5
+
+
+def test_cancelled_jobs_do_not_run():
+    """Test that a cancelled job is dropped from the schedule."""
+    scheduler = Scheduler()
+    job = scheduler.every(1, lambda: None)
+    scheduler.cancel(job)
+    scheduler.step()
+    scheduler.step()
+    assert job.runs == 0
+    assert scheduler.jobs == []
+
+
+def test_jobs_run_on_pool():
+    """Test that jobs run on the pool without overlapping."""
+    scheduler = Scheduler(job_pool_size=2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocked():
+
+        started.set()
+        release.wait(5)
+
+    job = scheduler.every(1, blocked, delay=0)
+    scheduler.step()
+    assert started.wait(5)
+    scheduler.step()
+    assert job.missed == 1
+    release.set()
+    scheduler.job_pool.shutdown(wait=True)
+    assert job.runs == 1
+    assert not job.running
+
+
+def test_cron_schedule():
+    """Test that cron expressions find the next matching minute."""
+    after = datetime.datetime(2021, 1, 1, 12, 30, 15)
+    cron = simple_scheduler.CronSchedule
+    assert cron("*/15 * * * *").next(after) == after.replace(
+        minute=45, second=0
+    )
+    assert cron("0 9 * * 1-5").next(after) == datetime.datetime(
+        2021, 1, 4, 9, 0
+    )
+    assert cron("0 0 29 2 *").next(after) == datetime.datetime(
+        2024, 2, 29, 0, 0
+    )
+    assert cron("0 0 13 * 5").next(after) == datetime.datetime(
+        2021, 1, 8, 0, 0
+    )
+    assert cron("0 0 * * 7").next(after) == datetime.datetime(
+        2021, 1, 3, 0, 0
+    )
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "5-1 * * * *",
+])
+def test_invalid_cron_expressions(expression):
+    """Test that malformed expressions are rejected."""
+    with pytest.raises(ValueError):
+
+        simple_scheduler.CronSchedule(expression)
+
+
+def test_impossible_cron_expression():
+    """Test that an expression which never matches is rejected."""
+    with pytest.raises(ValueError):
+
+        simple_scheduler.CronSchedule("0 0 31 2 *").next(
+            datetime.datetime(2021, 1, 1)
+        )
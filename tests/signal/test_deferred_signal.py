@@ -0,0 +1,98 @@
+"""Test suite for the deferred signal manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import select
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+from daemons.signal import deferred
+
+
+DAEMON = """
+import sys
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import threadd
+from daemons.signal import deferred
+
+
+class Daemon(deferred.DeferredSignalManager, threadd.ThreadPoolDaemon):
+
+    def get_message(self):
+        return None
+
+
+Daemon(pidfile={pidfile!r}, idle_time=None).start()
+"""
+
+
+@pytest.fixture
+def manager():
+    """Get a deferred signal manager and restore the signal handlers."""
+    signums = deferred.DeferredSignalManager.kill_signals + (signal.SIGUSR1,)
+    handlers = dict((signum, signal.getsignal(signum)) for signum in signums)
+    m = deferred.DeferredSignalManager()
+    m.pid = os.getpid()
+    yield m
+    for signum, handler in handlers.items():
+
+        signal.signal(signum, handler)
+
+
+def readable(wakeup):
+    """Check whether a wakeup has been set."""
+    return bool(select.select([wakeup], [], [], 0)[0])
+
+
+def test_handlers_run_when_processed(manager):
+    """Test that handlers wait for process_signals and run once."""
+    calls = []
+    manager.handle(signal.SIGUSR1, lambda: calls.append(1))
+    os.kill(os.getpid(), signal.SIGUSR1)
+    os.kill(os.getpid(), signal.SIGUSR1)
+    assert calls == []
+    assert readable(manager.signal_wakeup)
+
+    manager.process_signals()
+    assert calls == [1]
+    assert not readable(manager.signal_wakeup)
+
+    manager.process_signals()
+    assert calls == [1]
+
+
+def test_shutdown_is_deferred(manager, monkeypatch):
+    """Test that one shutdown signal waits and a second acts at once."""
+    codes = []
+    monkeypatch.setattr(sys, "exit", codes.append)
+    manager.pid = None
+    os.kill(os.getpid(), signal.SIGTERM)
+    assert codes == []
+
+    os.kill(os.getpid(), signal.SIGINT)
+    assert codes == [exit.SUCCESS]
+
+
+def test_idle_daemon_stops_promptly(tmpdir, write_script):
+    """Test that a daemon waiting without a timeout stops on a signal."""
+    pidfile = str(tmpdir.join("test.pid"))
+    script = write_script(DAEMON, pidfile=pidfile)
+    assert subprocess.call([sys.executable, script]) == exit.SUCCESS
+    controller = Controller(pidfile=pidfile, stop_timeout=5)
+    assert controller.pid is not None
+    started = time.time()
+    controller.stop()
+    assert time.time() - started < 2
+    assert not os.path.exists(pidfile)
@@ -0,0 +1,107 @@
+"""Test suite for the simple start/stop manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from daemons.pid import simple as simple_pid
+from daemons.startstop import simple
+
+
+class DaemonTest(simple_pid.SimplePidManager, simple.SimpleStartStopManager):
+
+    """Daemon for testing."""
+
+
+CHILD = """
+import signal, sys, time
+def term(signum, frame):
+    time.sleep({delay})
+    sys.exit(0)
+signal.signal(signal.SIGTERM, {handler})
+sys.stdout.write("ready\\n")
+sys.stdout.flush()
+while True:
+    time.sleep(1)
+"""
+
+
+def spawn(pidfile, delay=0.0, ignore=False):
+    """Start a child process and record it in the pidfile."""
+    handler = "signal.SIG_IGN" if ignore else "term"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", CHILD.format(delay=delay, handler=handler)],
+        stdout=subprocess.PIPE,
+    )
+    proc.stdout.readline()
+    with open(pidfile, "w+") as f:
+
+        f.write("{0}\n".format(proc.pid))
+
+    return proc
+
+
+@pytest.fixture
+def pidfile(tmpdir):
+    """Get a pidfile in tmp space."""
+    return str(tmpdir.join("test.pid"))
+
+
+def test_stop_without_process_is_noop(pidfile):
+    """Test that stopping a daemon which is not running succeeds."""
+    DaemonTest(pidfile=pidfile).stop()
+
+
+def test_stop_waits_for_exit(pidfile):
+    """Test that stop returns once the process has shut down."""
+    proc = spawn(pidfile, delay=0.2)
+    start = time.time()
+    DaemonTest(pidfile=pidfile).stop()
+    elapsed = time.time() - start
+
+    assert proc.poll() is not None
+    assert 0.2 <= elapsed < 1.0
+
+
+def test_stop_falls_back_to_polling(pidfile, monkeypatch):
+    """Test that stop works without pidfd support."""
+    monkeypatch.delattr(os, "pidfd_open", raising=False)
+    proc = spawn(pidfile)
+    watcher = simple.ExitWatcher(proc.pid)
+    assert watcher._fd is None
+
+    DaemonTest(pidfile=pidfile).stop()
+    assert watcher.wait(0)
+
+
+def test_stop_escalates_to_kill(pidfile):
+    """Test that a process ignoring SIGTERM is killed after the timeout."""
+    spawn(pidfile, ignore=True)
+    d = DaemonTest(pidfile=pidfile, stop_timeout=0.2)
+    d.stop()
+
+    assert not os.path.exists(pidfile)
+    assert d.pid is None
+
+
+def test_watcher_times_out(pidfile):
+    """Test that waiting on a live process respects the timeout."""
+    proc = spawn(pidfile)
+    watcher = simple.ExitWatcher(proc.pid)
+    try:
+
+        assert watcher.wait(0.05) is False
+
+    finally:
+
+        watcher.close()
+        proc.kill()
+        proc.wait()
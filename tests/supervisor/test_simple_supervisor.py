@@ -0,0 +1,182 @@
+"""Test suite for the simple supervisor manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import errno
+import gc
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from daemons.fleet import Controller
+from daemons.prefab import supervisor
+from daemons.startstop import simple as simple_startstop
+
+
+DAEMON = """
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import supervisor
+
+
+class Daemon(supervisor.SupervisedStepDaemon):
+
+    preloaded = None
+
+    def preload(self):
+        self.preloaded = os.getpid()
+
+    def step(self):
+        name = "{{0}}-{{1}}".format(self.worker_index, os.getpid())
+        path = os.path.join({path!r}, name)
+        if not os.path.exists(path):
+            partial = os.path.join(os.path.dirname({path!r}), name)
+            with open(partial, "w") as state:
+                state.write("{{0}} {{1}} {{2}} {{3}}".format(
+                    self.preloaded,
+                    gc.get_freeze_count(),
+                    gc.get_threshold()[0],
+                    int(gc.isenabled()),
+                ))
+            os.rename(partial, path)
+        time.sleep(0.05)
+
+
+Daemon(
+    pidfile={pidfile!r}, workers=2, worker_gc_threshold=(5000, 20)
+).start()
+"""
+
+
+def workers(path):
+    """Get the worker slot and pid of every worker that has run."""
+    return sorted(
+        tuple(int(part) for part in name.split("-"))
+        for name in os.listdir(path)
+    )
+
+
+@pytest.fixture
+def daemon(tmpdir, write_script, wait_for):
+    """Start a supervised daemon and stop it after the test."""
+    path = tmpdir.mkdir("workers")
+    pidfile = str(tmpdir.join("test.pid"))
+    script = write_script(DAEMON, path=str(path), pidfile=pidfile)
+    subprocess.check_call([sys.executable, script])
+    wait_for(lambda: len(os.listdir(str(path))) == 2)
+
+    controller = Controller(pidfile=pidfile)
+    yield controller, str(path)
+    controller.stop()
+
+
+def test_forks_workers_under_one_pidfile(daemon):
+    """Test that workers are forked by the process in the pidfile."""
+    controller, path = daemon
+    supervisor_pid = controller.pid
+    assert [index for index, _ in workers(path)] == [0, 1]
+    for _, pid in workers(path):
+
+        assert pid != supervisor_pid
+        with open("/proc/{0}/stat".format(pid)) as stat:
+
+            assert int(stat.read().rsplit(")", 1)[1].split()[1]) == (
+                supervisor_pid
+            )
+
+
+def test_preloads_before_forking(daemon):
+    """Test that workers share preloaded and frozen state."""
+    controller, path = daemon
+    for index, pid in workers(path):
+
+        with open(os.path.join(path, "{0}-{1}".format(index, pid))) as state:
+
+            preloaded, frozen, threshold, enabled = state.read().split()
+
+        assert int(preloaded) == controller.pid
+        assert int(frozen) > 0
+        assert int(threshold) == 5000
+        assert int(enabled) == 1
+
+
+def test_respawns_crashed_worker(daemon, wait_for):
+    """Test that a worker killed by a signal is replaced."""
+    controller, path = daemon
+    _, pid = workers(path)[0]
+    os.kill(pid, signal.SIGKILL)
+    wait_for(lambda: len(os.listdir(path)) == 3)
+
+    assert [index for index, _ in workers(path)] == [0, 0, 1]
+    for index, pid in workers(path):
+
+        with open(os.path.join(path, "{0}-{1}".format(index, pid))) as state:
+
+            _, frozen, _, enabled = state.read().split()
+
+        assert int(frozen) > 0
+        assert int(enabled) == 1
+
+
+def test_stop_stops_workers(daemon):
+    """Test that stopping the supervisor stops every worker."""
+    controller, path = daemon
+    controller.stop()
+
+    assert controller.pid is None
+    for _, pid in workers(path):
+
+        assert not os.path.exists("/proc/{0}".format(pid))
+
+
+def test_retries_failed_fork(tmpdir, monkeypatch):
+    """Test that a slot whose fork fails is retried within its limits."""
+
+    def fail():
+
+        raise OSError(errno.EAGAIN, "Resource temporarily unavailable")
+
+    monkeypatch.setattr(os, "fork", fail)
+    manager = supervisor.SupervisedRunDaemon(
+        pidfile=str(tmpdir.join("test.pid")), workers=1, respawn_limit=2
+    )
+
+    assert manager.spawn_worker(0) is None
+    assert manager._delayed[0] <= simple_startstop.monotonic()
+    assert manager.spawn_worker(0) is None
+    assert manager._delayed[0] > simple_startstop.monotonic() + 50
+
+
+def test_freezes_only_while_forking(tmpdir, monkeypatch):
+    """Test that the heap is frozen for the fork and thawed afterwards."""
+    if not hasattr(gc, "freeze"):
+
+        pytest.skip("No gc.freeze in this version of Python.")
+
+    frozen = []
+
+    def fork():
+
+        frozen.append(gc.get_freeze_count())
+        return 2 ** 22 + 1
+
+    monkeypatch.setattr(os, "fork", fork)
+    manager = supervisor.SupervisedRunDaemon(
+        pidfile=str(tmpdir.join("test.pid")), workers=1
+    )
+
+    assert manager.spawn_worker(0) == 2 ** 22 + 1
+    assert frozen[0] > 0
+    assert gc.get_freeze_count() == 0
+    assert gc.isenabled()
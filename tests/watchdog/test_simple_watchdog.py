@@ -0,0 +1,165 @@
+"""Test suite for the simple watchdog manager implementation."""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from daemons.fleet import Controller
+from daemons.interfaces import exit
+from daemons.pid import simple as simple_pid
+from daemons.watchdog import simple as simple_watchdog
+
+
+DAEMON = """
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, {root!r})
+
+from daemons.prefab import step
+from daemons.reload import simple as reload
+from daemons.watchdog import simple as watchdog
+
+
+logging.basicConfig(filename={log!r}, level=logging.INFO)
+
+
+class Daemon(watchdog.SimpleWatchdogManager, reload.SimpleReloadManager,
+             step.StepDaemon):
+
+    steps = 0
+
+    def step(self):
+        self.steps += 1
+        if self.steps == 1:
+            with open({generations!r}, "a") as generations:
+                generations.write("{{0}}\\n".format(os.getpid()))
+        if self.steps == 5 and os.environ.get("HANG_ONCE") != "done":
+            os.environ["HANG_ONCE"] = "done"
+            self.wedged()
+        time.sleep(0.02)
+
+    def wedged(self):
+        time.sleep(3600)
+
+
+Daemon(
+    pidfile={pidfile!r},
+    watchdog_timeout=0.5,
+    watchdog_action=sys.argv[1],
+).start()
+"""
+
+
+class Watched(
+    simple_watchdog.SimpleWatchdogManager, simple_pid.SimplePidManager
+):
+
+    """Records hangs rather than acting on them."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the list of hangs."""
+        self.hangs = []
+        super(Watched, self).__init__(*args, **kwargs)
+
+    def hung(self, age):
+        """Record the age of the heartbeat."""
+        self.hangs.append(age)
+
+
+@pytest.fixture
+def paths(tmpdir, write_script):
+    """Write the daemon script and stop the daemon after the test."""
+    pidfile = str(tmpdir.join("test.pid"))
+    log = str(tmpdir.join("daemon.log"))
+    generations = str(tmpdir.join("generations"))
+    script = write_script(
+        DAEMON,
+        log=log,
+        generations=generations,
+        pidfile=pidfile,
+    )
+    yield script, pidfile, log, generations
+    Controller(pidfile=pidfile, stop_timeout=2).stop()
+
+
+def read_lines(path):
+    """Get the lines of a file or nothing if it does not exist."""
+    if not os.path.exists(path):
+
+        return []
+
+    with open(path) as f:
+
+        return f.read().splitlines()
+
+
+def test_heartbeat_updates_file(tmpdir):
+    """Test that each heartbeat is visible to other processes."""
+    pidfile = str(tmpdir.join("test.pid"))
+    watched = Watched(pidfile=pidfile, watchdog_timeout=60)
+    assert simple_watchdog.heartbeat_age(pidfile) is None
+    watched.heartbeat()
+    watched.heartbeat()
+    _, beats = simple_watchdog.read_heartbeat(watched.heartbeat_file)
+    assert beats == 2
+    assert 0 <= simple_watchdog.heartbeat_age(pidfile) < 5
+    watched.stop_watchdog()
+    assert not os.path.exists(watched.heartbeat_file)
+
+
+def test_hang_is_handled_once(tmpdir, wait_for):
+    """Test that a stalled heartbeat is handled once until it resumes."""
+    watched = Watched(
+        pidfile=str(tmpdir.join("test.pid")),
+        watchdog_timeout=0.2,
+        watchdog_interval=0.05,
+    )
+    watched.start_watchdog()
+    wait_for(lambda: watched.hangs)
+    time.sleep(0.3)
+    assert len(watched.hangs) == 1
+    assert watched.hangs[0] >= 0.2
+    watched.heartbeat()
+    wait_for(lambda: len(watched.hangs) == 2)
+    watched.stop_watchdog()
+
+
+def test_kills_hung_daemon(paths, wait_for):
+    """Test that a hung daemon logs its stacks and is killed."""
+    script, pidfile, log, generations = paths
+    assert subprocess.call([sys.executable, script, "kill"]) == exit.SUCCESS
+    pid = Controller(pidfile=pidfile).pid
+    assert pid is not None
+    wait_for(lambda: not os.path.exists(pidfile))
+    wait_for(lambda: not os.path.exists("/proc/{0}".format(pid)))
+    with open(log) as f:
+
+        output = f.read()
+
+    assert "No heartbeat" in output
+    assert "in wedged" in output
+    assert len(read_lines(generations)) == 1
+
+
+def test_restarts_hung_daemon(paths, wait_for):
+    """Test that a hung daemon with a reload manager replaces itself."""
+    script, pidfile, log, generations = paths
+    assert subprocess.call([sys.executable, script, "restart"]) == exit.SUCCESS
+    pid = Controller(pidfile=pidfile).pid
+    wait_for(lambda: len(read_lines(generations)) == 2)
+    assert read_lines(generations) == [str(pid), str(pid)]
+    assert Controller(pidfile=pidfile).pid == pid
+    wait_for(lambda: simple_watchdog.heartbeat_age(pidfile) is not None)
+    time.sleep(0.6)
+    assert simple_watchdog.heartbeat_age(pidfile) < 0.5